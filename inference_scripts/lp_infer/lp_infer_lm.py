@@ -31,12 +31,14 @@ from graphstorm.dataloading import BUILTIN_LP_JOINT_NEG_SAMPLER
 
 def main(args):
     config = GSConfig(args)
-    gs.initialize(ip_config=config.ip_config, backend=config.backend)
+    gs.initialize(ip_config=config.ip_config, backend=config.backend,
+                  num_samplers=config.num_samplers)
 
     infer_data = GSgnnEdgeInferData(config.graph_name,
                                     config.part_config,
                                     eval_etypes=config.eval_etype,
-                                    node_feat_field=config.feat_name)
+                                    node_feat_field=config.feat_name,
+                                    cache_split=config.cache_split)
     model = gs.create_builtin_lp_model(infer_data.g, config, train_task=False)
     model.restore_model(config.restore_model_path)
     # TODO(zhengda) we should use a different way to get rank.
@@ -67,12 +69,18 @@ def main(args):
 
     dataloader = test_dataloader_cls(infer_data, infer_data.test_idxs,
                                      batch_size=config.eval_batch_size,
-                                     num_negative_edges=config.num_negative_edges)
+                                     num_negative_edges=config.num_negative_edges,
+                                     fixed_negatives=config.fixed_eval_negatives,
+                                     negative_cache_path=config.eval_negative_cache_path)
     # Preparing input layer for training or inference.
     # The input layer can pre-compute node features in the preparing step if needed.
     # For example pre-compute all BERT embeddings
     model.prepare_input_encoder(infer_data)
-    infer.infer(infer_data, dataloader, save_embed_path=config.save_embed_path)
+    infer.infer(infer_data, dataloader, save_embed_path=config.save_embed_path,
+                double_buffer=config.double_buffer_infer,
+                reuse_blocks=config.reuse_infer_blocks,
+                block_cache_path=config.infer_block_cache_path,
+                emb_dtype=config.emb_dtype)
 
 def generate_parser():
     parser = get_argument_parser()
@@ -47,13 +47,15 @@ def get_evaluator(config): # pylint: disable=unused-argument
 
 def main(args):
     config = GSConfig(args)
-    gs.initialize(ip_config=config.ip_config, backend=config.backend)
+    gs.initialize(ip_config=config.ip_config, backend=config.backend,
+                  num_samplers=config.num_samplers)
 
     infer_data = GSgnnNodeInferData(config.graph_name,
                                     config.part_config,
                                     eval_ntypes=config.predict_ntype,
                                     node_feat_field=config.feat_name,
-                                    label_field=config.label_field)
+                                    label_field=config.label_field,
+                                    cache_split=config.cache_split)
     model = gs.create_builtin_node_gnn_model(infer_data.g, config, train_task=False)
     model.restore_model(config.restore_model_path)
     # TODO(zhengda) we should use a different way to get rank.
@@ -74,9 +76,17 @@ def main(args):
     # The input layer can pre-compute node features in the preparing step if needed.
     # For example pre-compute all BERT embeddings
     model.prepare_input_encoder(infer_data)
+    incremental_changes = th.load(config.incremental_changes) \
+            if config.incremental_changes is not None else None
     infer.infer(dataloader, save_embed_path=config.save_embed_path,
                 save_predict_path=config.save_predict_path,
-                mini_batch_infer=config.mini_batch_infer)
+                mini_batch_infer=config.mini_batch_infer,
+                layer_embed_path=config.layer_embed_path,
+                incremental_changes=incremental_changes,
+                double_buffer=config.double_buffer_infer,
+                reuse_blocks=config.reuse_infer_blocks,
+                block_cache_path=config.infer_block_cache_path,
+                emb_dtype=config.emb_dtype)
 
 def generate_parser():
     parser = get_argument_parser()
@@ -27,6 +27,7 @@ import torch as th
 from .config import BUILTIN_GNN_ENCODER
 from .config import BUILTIN_ENCODER
 from .config import SUPPORTED_BACKEND
+from .config import SUPPORTED_EMB_DTYPES
 from .config import BUILTIN_LP_LOSS_FUNCTION
 from .config import BUILTIN_LP_LOSS_CROSS_ENTROPY
 
@@ -237,6 +238,21 @@ class GSConfig:
         assert False, "GPU is required"
         return 0
 
+    @property
+    def num_samplers(self):
+        """ The number of sampler processes of every trainer.
+
+            The sampler processes are created by DGL when the job is launched
+            with `--num_samplers` of the DGL launch script. 0 means the mini-batches
+            are sampled in the trainer processes.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_num_samplers"):
+            assert self._num_samplers >= 0, \
+                "The number of sampler processes cannot be negative."
+            return self._num_samplers
+        return int(os.environ.get("DGL_NUM_SAMPLER", 0))
+
     @property
     def ip_config(self):
         """ IP config of instances in a cluster
@@ -257,6 +273,17 @@ class GSConfig:
             f"Partition config file {self._part_config} does not exist"
         return self._part_config
 
+    @property
+    def cache_split(self):
+        """ Whether to cache the train, validation and test IDs of every trainer
+            in the partition folder, so later jobs with the same split load them directly.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_cache_split"):
+            assert self._cache_split in [True, False]
+            return self._cache_split
+        return False
+
     @property
     def verbose(self):
         """ verbose for print out more information.Default is False
@@ -481,6 +508,55 @@ class GSConfig:
         # By default, use mini batch inference, which requires less memory
         return True
 
+    @property
+    def double_buffer_infer(self):
+        """ Whether full graph inference reuses two buffers of node embeddings for all
+            GNN layers instead of allocating one buffer per layer.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_double_buffer_infer"):
+            assert self._double_buffer_infer in [True, False], \
+                "Double buffer inference flag must be True or False"
+            return self._double_buffer_infer
+        return False
+
+    @property
+    def reuse_infer_blocks(self):
+        """ Whether full graph inference samples the full-neighbor blocks once and
+            reuses them in all GNN layers.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_reuse_infer_blocks"):
+            assert self._reuse_infer_blocks in [True, False], \
+                "Reuse inference blocks flag must be True or False"
+            return self._reuse_infer_blocks
+        return False
+
+    @property
+    def infer_block_cache_path(self):
+        """ The folder where the reused blocks of full graph inference are saved.
+            If it's None, the blocks are kept in memory.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_infer_block_cache_path"):
+            assert self.reuse_infer_blocks, \
+                "infer_block_cache_path only works with reuse_infer_blocks."
+            return self._infer_block_cache_path
+        return None
+
+    @property
+    def emb_dtype(self):
+        """ The data type that stores the node embeddings of full graph inference
+            and the saved embeddings. The embeddings are computed in float32.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_emb_dtype"):
+            assert self._emb_dtype in SUPPORTED_EMB_DTYPES, \
+                f"Embedding data type must be one of {SUPPORTED_EMB_DTYPES}, " \
+                f"but got {self._emb_dtype}"
+            return getattr(th, self._emb_dtype)
+        return th.float32
+
     ###################### I/O related ######################
     ### Restore model ###
     @property
@@ -512,6 +588,31 @@ class GSConfig:
             return self._save_embed_path
         return None
 
+    @property
+    def layer_embed_path(self):
+        """ Path to save the embeddings of every GNN layer in full-graph inference.
+            They are used to refresh the embeddings incrementally.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_layer_embed_path"):
+            return self._layer_embed_path
+        return None
+
+    @property
+    def incremental_changes(self):
+        """ The file of the IDs of the changed nodes and edges since the embeddings
+            in `layer_embed_path` were saved. If it's provided, inference only refreshes
+            the embeddings affected by the changes.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_incremental_changes"):
+            assert self.layer_embed_path is not None, \
+                "Incremental inference requires the per-layer embeddings in layer_embed_path."
+            assert os.path.isfile(self._incremental_changes), \
+                f"The file of changes {self._incremental_changes} doesn't exist."
+            return self._incremental_changes
+        return None
+
     @property
     def save_model_path(self):
         """ Path to save the model.
@@ -648,6 +749,114 @@ class GSConfig:
         assert self._batch_size > 0
         return self._batch_size
 
+    @property
+    def num_prefetch_batches(self):
+        """ The number of mini-batches whose node features and labels are
+            fetched in the background during training.
+
+            0 means no prefetching.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_num_prefetch_batches"):
+            assert self._num_prefetch_batches >= 0, \
+                "The number of prefetched mini-batches cannot be negative."
+            return self._num_prefetch_batches
+        return 0
+
+    @property
+    def sample_cache_variants(self):
+        """ The number of epochs of sampled mini-batches that are cached and
+            replayed in later epochs during training.
+
+            0 means the mini-batches are sampled in every epoch. Link prediction
+            doesn't support it because the negative edges would be replayed.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_sample_cache_variants"):
+            assert self._sample_cache_variants >= 0, \
+                "The number of cached sampled variants cannot be negative."
+            return self._sample_cache_variants
+        return 0
+
+    @property
+    def sample_cache_refresh(self):
+        """ The number of epochs after which the cached mini-batches are sampled again.
+
+            0 means they are never sampled again.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_sample_cache_refresh"):
+            assert self._sample_cache_refresh >= 0, \
+                "The refresh interval of the sample cache cannot be negative."
+            return self._sample_cache_refresh
+        return 0
+
+    @property
+    def sample_cache_path(self):
+        """ The folder where the cached mini-batches are saved.
+
+            If it's None, they are kept in memory.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_sample_cache_path"):
+            return self._sample_cache_path
+        return None
+
+    @property
+    def feat_cache_size(self):
+        """ The memory budget in MB of the cache of remote node features
+            in every trainer process.
+
+            0 means no cache.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_feat_cache_size"):
+            assert self._feat_cache_size >= 0, \
+                "The size of the feature cache cannot be negative."
+            return self._feat_cache_size
+        return 0
+
+    @property
+    def feat_cache_policy(self):
+        """ The policy of selecting the nodes in the feature cache.
+
+            "degree" caches the remote nodes with the most edges to the local partition.
+            "frequency" caches the remote nodes accessed most often in the first
+            mini-batches.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_feat_cache_policy"):
+            assert self._feat_cache_policy in ["degree", "frequency"], \
+                "The policy of the feature cache can only be degree or frequency."
+            return self._feat_cache_policy
+        return "degree"
+
+    @property
+    def fuse_node_feats(self):
+        """ Whether to fuse the multiple feature fields of a node type into
+            one distributed tensor before training.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_fuse_node_feats"):
+            assert self._fuse_node_feats in [True, False]
+            return self._fuse_node_feats
+        return False
+
+    @property
+    def node_feat_dtype(self):
+        """ The data type of the fused node features: float32, float16 or bfloat16.
+
+            It's only used when fuse_node_feats is true. None keeps the data type
+            of the node features.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_node_feat_dtype"):
+            dtypes = {"float32": th.float32, "float16": th.float16, "bfloat16": th.bfloat16}
+            assert self._node_feat_dtype in dtypes, \
+                "The data type of node features can only be float32, float16 or bfloat16."
+            return dtypes[self._node_feat_dtype]
+        return None
+
     @property
     def sparse_lr(self): # pylint: disable=invalid-name
         """ Sparse optimizer learning rate
@@ -1086,6 +1295,28 @@ class GSConfig:
         # Set default value to 1000.
         return 1000
 
+    @property
+    def fixed_eval_negatives(self):
+        """ Whether to generate the negative edges of evaluation once with a fixed
+            random seed and reuse them in every evaluation.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_fixed_eval_negatives"):
+            assert self._fixed_eval_negatives in [True, False]
+            return self._fixed_eval_negatives
+        return False
+
+    @property
+    def eval_negative_cache_path(self):
+        """ The folder where the fixed negative edges of evaluation are memory-mapped.
+
+            If it's None, they are kept in memory.
+        """
+        # pylint: disable=no-member
+        if hasattr(self, "_eval_negative_cache_path"):
+            return self._eval_negative_cache_path
+        return None
+
     @property
     def use_dot_product(self):
         """ Whether use the dot product loss function instead of distmult
@@ -1319,8 +1550,16 @@ def _add_gsgnn_basic_args(parser):
             help="number of GPUs")
     group.add_argument('--ip-config', type=str, default=argparse.SUPPRESS,
             help='The file for IP configuration')
+    group.add_argument("--num-samplers", type=int, default=argparse.SUPPRESS,
+            help="The number of sampler processes of every trainer. It has to match "
+                 "--num_samplers of the DGL launch script.")
     group.add_argument('--part-config', type=str, default=argparse.SUPPRESS,
             help='The path to the partition config file')
+    group.add_argument("--cache-split",
+            type=lambda x: (str(x).lower() in ['true', '1']),
+            default=argparse.SUPPRESS,
+            help="Whether to cache the train, validation and test IDs of every trainer "
+                 "in the partition folder.")
     group.add_argument("--debug",
             type=lambda x: (str(x).lower() in ['true', '1']),
             default=argparse.SUPPRESS,
@@ -1359,6 +1598,26 @@ def _add_gnn_args(parser):
             type=lambda x: (str(x).lower() in ['true', '1']),
             default=argparse.SUPPRESS
     )
+    parser.add_argument(
+            "--double-buffer-infer",
+            help="Whether full graph inference reuses two buffers of node embeddings "
+                 "for all GNN layers to reduce memory.",
+            type=lambda x: (str(x).lower() in ['true', '1']),
+            default=argparse.SUPPRESS
+    )
+    parser.add_argument("--emb-dtype", type=str, default=argparse.SUPPRESS,
+            help="The data type that stores the node embeddings of full graph inference "
+                 f"and the saved embeddings. It can be one of {SUPPORTED_EMB_DTYPES}.")
+    parser.add_argument(
+            "--reuse-infer-blocks",
+            help="Whether full graph inference samples the full-neighbor blocks once "
+                 "and reuses them in all GNN layers.",
+            type=lambda x: (str(x).lower() in ['true', '1']),
+            default=argparse.SUPPRESS
+    )
+    parser.add_argument("--infer-block-cache-path", type=str, default=argparse.SUPPRESS,
+            help="The folder where the reused blocks of full graph inference are saved. "
+                 "By default, they are kept in memory.")
 
     return parser
 
@@ -1375,6 +1634,13 @@ def _add_output_args(parser):
     group.add_argument("--save-embed-path", type=str, default=argparse.SUPPRESS,
             help="Save the embddings in the specified directory. "
                  "Use none to turn off embedding saveing")
+    group.add_argument("--layer-embed-path", type=str, default=argparse.SUPPRESS,
+            help="Save the embeddings of every GNN layer in the specified directory "
+                 "for refreshing the embeddings incrementally.")
+    group.add_argument("--incremental-changes", type=str, default=argparse.SUPPRESS,
+            help="The file of the IDs of the changed nodes and edges. If it's provided, "
+                 "inference only refreshes the embeddings in --layer-embed-path "
+                 "affected by the changes.")
     group.add_argument('--save-model-per-iters', type=int, default=argparse.SUPPRESS,
             help='Save the model every N iterations.')
     group.add_argument('--save-model-path', type=str, default=argparse.SUPPRESS,
@@ -1407,6 +1673,32 @@ def _add_hyperparam_args(parser):
             help="number of training epochs")
     group.add_argument("--batch-size", type=int, default=argparse.SUPPRESS,
             help="Mini-batch size. Must be larger than 0")
+    group.add_argument("--num-prefetch-batches", type=int, default=argparse.SUPPRESS,
+            help="The number of mini-batches whose node features and labels are "
+                 "fetched by a background thread during training. 0 disables prefetching.")
+    group.add_argument("--sample-cache-variants", type=int, default=argparse.SUPPRESS,
+            help="The number of epochs of sampled mini-batches that are cached and "
+                 "replayed in later epochs. 0 samples mini-batches in every epoch. "
+                 "It isn't supported by link prediction.")
+    group.add_argument("--sample-cache-refresh", type=int, default=argparse.SUPPRESS,
+            help="The number of epochs after which the cached mini-batches are sampled "
+                 "again. 0 never samples them again.")
+    group.add_argument("--sample-cache-path", type=str, default=argparse.SUPPRESS,
+            help="The folder where the cached mini-batches are saved. "
+                 "By default, they are kept in memory without a size limit.")
+    group.add_argument("--feat-cache-size", type=float, default=argparse.SUPPRESS,
+            help="The memory budget in MB of the cache of remote node features "
+                 "in every trainer. 0 disables the cache.")
+    group.add_argument("--feat-cache-policy", type=str, default=argparse.SUPPRESS,
+            help="The policy of selecting the cached nodes: degree or frequency.")
+    group.add_argument(
+            "--fuse-node-feats",
+            type=lambda x: (str(x).lower() in ['true', '1']),
+            default=argparse.SUPPRESS,
+            help="Whether to fuse the feature fields of a node type into one tensor "
+                 "before training, so a mini-batch gathers one tensor per node type.")
+    group.add_argument("--node-feat-dtype", type=str, default=argparse.SUPPRESS,
+            help="The data type of the fused node features: float32, float16 or bfloat16.")
     group.add_argument("--sparse-lr", type=float, default=argparse.SUPPRESS,
             help="sparse optimizer learning rate")
     group.add_argument(
@@ -1543,8 +1835,20 @@ def _add_link_prediction_args(parser):
                  "batch of edges for the model evaluation. "
                  "If the MRR saturates at high values or has "
                  "large variance increase this number.")
+    group.add_argument(
+            "--fixed-eval-negatives",
+            type=lambda x: (str(x).lower() in ['true', '1']),
+            default=argparse.SUPPRESS,
+            help="Whether to generate the negative edges of evaluation once with a fixed "
+                 "random seed, so the metrics of different evaluations are comparable.")
+    group.add_argument("--eval-negative-cache-path", type=str, default=argparse.SUPPRESS,
+            help="The folder where the fixed negative edges of evaluation are "
+                 "memory-mapped. By default, they are kept in memory.")
     group.add_argument("--negative-sampler", type=str, default=argparse.SUPPRESS,
-            help="The algorithm of sampling negative edges for link prediction.")
+            help="The algorithm of sampling negative edges for link prediction. "
+                 "'localdegree' and 'joint_localdegree' sample the nodes in the local "
+                 "partition with probabilities proportional to degree^0.75. 'inbatch' "
+                 "uses the destination nodes of the other edges in a mini-batch.")
     group.add_argument("--test-negative-sampler", type=str, default=argparse.SUPPRESS,
             help="The algorithm of sampling negative edges for link prediction testing")
     group.add_argument('--eval-etype', nargs='+', type=str, default=argparse.SUPPRESS)
@@ -19,6 +19,8 @@
 BUILTIN_GNN_ENCODER = ["rgat", "rgcn"]
 BUILTIN_ENCODER = ["lm", "mlp"] + ["rgat", "rgcn"]
 SUPPORTED_BACKEND = ["gloo", "nccl"]
+# The data types of the node embeddings stored in distributed tensors and saved files.
+SUPPORTED_EMB_DTYPES = ["float32", "float16", "bfloat16"]
 
 BUILTIN_LP_LOSS_CROSS_ENTROPY = "cross_entropy"
 BUILTIN_LP_LOSS_LOGSIGMOID_RANKING = "logsigmoid"
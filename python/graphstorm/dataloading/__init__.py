@@ -15,9 +15,13 @@
 
     Initial to import dataloading and dataset classes
 """
+from .dataloading import GSgnnDataLoaderBase
 from .dataloading import GSgnnLinkPredictionDataLoader
 from .dataloading import GSgnnLPJointNegDataLoader
 from .dataloading import GSgnnLPLocalUniformNegDataLoader
+from .dataloading import GSgnnLPLocalDegreeNegDataLoader
+from .dataloading import GSgnnLPJointLocalDegreeNegDataLoader
+from .dataloading import GSgnnLPInBatchNegDataLoader
 from .dataloading import GSgnnAllEtypeLPJointNegDataLoader
 from .dataloading import GSgnnAllEtypeLinkPredictionDataLoader
 from .dataloading import GSgnnEdgeDataLoader
@@ -35,3 +39,6 @@ from .dataloading import BUILTIN_LP_JOINT_NEG_SAMPLER
 from .dataloading import BUILTIN_LP_LOCALUNIFORM_NEG_SAMPLER
 from .dataloading import BUILTIN_LP_ALL_ETYPE_UNIFORM_NEG_SAMPLER
 from .dataloading import BUILTIN_LP_ALL_ETYPE_JOINT_NEG_SAMPLER
+from .dataloading import BUILTIN_LP_LOCALDEGREE_NEG_SAMPLER
+from .dataloading import BUILTIN_LP_JOINT_LOCALDEGREE_NEG_SAMPLER
+from .dataloading import BUILTIN_LP_INBATCH_NEG_SAMPLER
@@ -15,21 +15,262 @@
 
     Various dataloaders for the GSF
 """
+import os
 import math
+import time
+import queue
 import inspect
+import threading
+import numpy as np
 import torch as th
 
 import dgl
 from dgl.dataloading import DistDataLoader
-from dgl.dataloading import EdgeCollator
+from dgl.dataloading import EdgeCollator, find_exclude_eids
 from dgl.dataloading.dist_dataloader import _remove_kwargs_dist
+from dgl.utils import prepare_tensor_or_dict
 
 from .sampler import LocalUniform, JointUniform, GlobalUniform
+from .sampler import LocalDegree, JointLocalDegree, InBatch
 from .utils import trim_data, modify_fanout_for_target_etype
+from .sample_cache import SampleCache
+from ..utils import get_rank
+
+################ Background prefetching #######################
+
+def _prefetch_worker(batch_iter, fetch_fn, batch_queue, lock, stop_event):
+    """ Sample mini-batches and fetch their data in a background thread.
+
+    The worker doesn't hold a reference to the prefetching iterator, so that
+    the iterator can be garbage collected and stop the worker when it's no longer used.
+    """
+    try:
+        while not stop_event.is_set():
+            with lock:
+                try:
+                    batch = next(batch_iter)
+                except StopIteration:
+                    break
+                batch_data = fetch_fn(batch)
+            batch_queue.put((tuple(batch), batch_data))
+    except Exception as err: # pylint: disable=broad-except
+        batch_queue.put(err)
+        return
+    batch_queue.put(None)
+
+class _PrefetchIterator():
+    """ The iterator that prefetches the data of the next mini-batches.
+
+    A background thread samples the mini-batches and fetches their data (e.g., node
+    features and labels) ahead of the training loop, so the data pulled from the
+    remote machines are ready when a mini-batch is consumed. The iterator returns
+    the sampled mini-batch with the fetched data appended as the last element.
+
+    Only one thread is used because the RPC client of DGL isn't thread-safe.
+    The thread holds `lock` while it sends RPC requests.
+
+    Parameters
+    ----------
+    batch_iter : iterator
+        The iterator of the sampled mini-batches.
+    fetch_fn : callable
+        The function that fetches the data of a mini-batch.
+    num_prefetch_batches : int
+        The max number of mini-batches prefetched ahead of the training loop.
+    lock : threading.Lock
+        The lock that serializes the RPC requests.
+    """
+    def __init__(self, batch_iter, fetch_fn, num_prefetch_batches, lock):
+        self._queue = queue.Queue(num_prefetch_batches)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=_prefetch_worker,
+                                        args=(batch_iter, fetch_fn, self._queue,
+                                              lock, self._stop_event),
+                                        daemon=True)
+        self._done = False
+        self._thread.start()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._done:
+            raise StopIteration
+        item = self._queue.get()
+        if item is None or isinstance(item, Exception):
+            self._done = True
+            self._thread.join()
+            if item is None:
+                raise StopIteration
+            raise item
+        batch, batch_data = item
+        return batch + (batch_data,)
+
+    def close(self):
+        """ Stop the background thread.
+        """
+        if self._done:
+            return
+        self._stop_event.set()
+        # Unblock the worker and wait for it to finish the current mini-batch.
+        while True:
+            item = self._queue.get()
+            if item is None or isinstance(item, Exception):
+                break
+        self._done = True
+        self._thread.join()
+
+    def __del__(self):
+        self.close()
+
+class _TimedIterator():
+    """ The iterator that measures how long the training loop waits for mini-batches.
+
+    The time spent in getting every mini-batch is added to `wait_times[0]`. When the
+    mini-batches are sampled by sampler processes, it's the time of waiting on
+    the queue of the sampled mini-batches.
+
+    Parameters
+    ----------
+    batch_iter : iterator
+        The iterator of the mini-batches.
+    wait_times : list of float
+        The accumulated waiting time.
+    """
+    def __init__(self, batch_iter, wait_times):
+        self._batch_iter = batch_iter
+        self._wait_times = wait_times
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.time()
+        try:
+            return next(self._batch_iter)
+        finally:
+            self._wait_times[0] += time.time() - start
+
+class GSgnnDataLoaderBase():
+    """ The base class of the minibatch dataloaders for training.
+
+    If `num_prefetch_batches` is larger than 0, the dataloader fetches the data
+    of the next mini-batches (see `_fetch_batch_data`) in a background thread and
+    appends the fetched data to every mini-batch it returns.
+
+    The sampled mini-batches can be cached and replayed in later epochs
+    (see `setup_sample_cache`).
+
+    The mini-batches are sampled in the sampler processes of DGL if the job is
+    launched with `--num_samplers` (see `num_samplers`). The time the training
+    loop waits for mini-batches in an epoch is reported by `wait_time`.
+
+    Parameters
+    ----------
+    dataset: GSgnnData
+        The GraphStorm dataset
+    num_prefetch_batches : int
+        The number of mini-batches prefetched in the background.
+    """
+    def __init__(self, dataset, num_prefetch_batches=0):
+        assert num_prefetch_batches >= 0, \
+                "The number of prefetched mini-batches cannot be negative."
+        self._data = dataset
+        self._num_prefetch_batches = num_prefetch_batches
+        self._prefetch_lock = threading.Lock()
+        self._sample_cache = None
+        self._wait_times = [0.]
+        self.dataloader = None
+
+    def setup_sample_cache(self, num_variants, refresh_epochs=0, cache_path=None):
+        """ Cache the sampled mini-batches and replay them in later epochs.
+
+        The in-memory cache keeps all mini-batches of `num_variants` epochs without
+        any size limit. Use `cache_path` if they don't fit in memory.
+
+        Parameters
+        ----------
+        num_variants : int
+            The number of epochs of mini-batches that are sampled and cached.
+        refresh_epochs : int
+            The number of epochs after which the cached mini-batches are sampled again.
+            0 means they are never sampled again.
+        cache_path : str
+            The folder where the mini-batches are saved. If it's None, the mini-batches
+            are kept in memory.
+        """
+        if cache_path is not None:
+            cache_path = os.path.join(cache_path, str(get_rank()))
+        self._sample_cache = SampleCache(num_variants, refresh_epochs, cache_path)
+
+    def _fetch_batch_data(self, batch):
+        """ Fetch the data of a mini-batch in the background.
+
+        Parameters
+        ----------
+        batch : tuple
+            The mini-batch sampled by the dataloader.
+
+        Returns
+        -------
+        tuple : the data of the mini-batch.
+        """
+        raise NotImplementedError()
+
+    def __iter__(self):
+        if self._sample_cache is not None:
+            batch_iter = self._sample_cache.epoch_iter(self.dataloader)
+        else:
+            batch_iter = self.dataloader.__iter__()
+        if self._num_prefetch_batches > 0:
+            batch_iter = _PrefetchIterator(batch_iter, self._fetch_batch_data,
+                                           self._num_prefetch_batches, self._prefetch_lock)
+        self._wait_times = [0.]
+        return _TimedIterator(batch_iter, self._wait_times)
+
+    def __next__(self):
+        return self.dataloader.__next__()
+
+    @property
+    def num_prefetch_batches(self):
+        """ The number of mini-batches prefetched in the background.
+        """
+        return self._num_prefetch_batches
+
+    @property
+    def num_samplers(self):
+        """ The number of sampler processes that sample the mini-batches.
+
+            0 means the mini-batches are sampled in the trainer process.
+        """
+        return getattr(self.dataloader, "num_workers", 0)
+
+    @property
+    def wait_time(self):
+        """ The time in seconds the training loop has waited for mini-batches
+            in the current or the last epoch.
+        """
+        return self._wait_times[0]
+
+    @property
+    def prefetch_lock(self):
+        """ The lock held by the background thread while it sends RPC requests.
+
+        The RPC client of DGL isn't thread-safe. A caller that sends RPC requests
+        (e.g., pulling sparse embeddings or running evaluation) while iterating
+        over the dataloader has to hold this lock.
+        """
+        return self._prefetch_lock
+
+    @property
+    def data(self):
+        """ The dataset of this dataloader.
+        """
+        return self._data
 
 ################ Minibatch DataLoader (Edge Prediction) #######################
 
-class GSgnnEdgeDataLoader():
+class GSgnnEdgeDataLoader(GSgnnDataLoaderBase):
     """ The minibatch dataloader for edge prediction
 
     Argument
@@ -52,12 +293,17 @@ class GSgnnEdgeDataLoader():
         Whether to exclude training edges during neighbor sampling
     remove_target_edge_type: bool
         Whether we will exclude all edges of the target edge type in message passing.
+    num_prefetch_batches : int
+        The number of mini-batches whose node features and edge labels are fetched
+        in the background. If it's larger than 0, every mini-batch ends with
+        a tuple of the node features and the edge labels.
     """
     def __init__(self, dataset, target_idx, fanout, batch_size, device='cpu',
                  train_task=True, reverse_edge_types_map=None,
                  remove_target_edge_type=True,
-                 exclude_training_targets=False):
-        self._data = dataset
+                 exclude_training_targets=False,
+                 num_prefetch_batches=0):
+        super(GSgnnEdgeDataLoader, self).__init__(dataset, num_prefetch_batches)
         self._device = device
         if remove_target_edge_type:
             assert reverse_edge_types_map is not None, \
@@ -102,17 +348,17 @@ class GSgnnEdgeDataLoader():
                                                     if exclude_training_targets else None)
         return loader
 
-    def __iter__(self):
-        return self.dataloader.__iter__()
-
-    def __next__(self):
-        return self.dataloader.__next__()
-
-    @property
-    def data(self):
-        """ The dataset of this dataloader.
-        """
-        return self._data
+    def _fetch_batch_data(self, batch):
+        input_nodes, batch_graph, _ = batch
+        if not isinstance(input_nodes, dict):
+            assert len(batch_graph.ntypes) == 1
+            input_nodes = {batch_graph.ntypes[0]: input_nodes}
+        input_feats = self._data.get_node_feats(input_nodes, self._device)
+        assert len(batch_graph.etypes) == 1
+        predict_etype = batch_graph.canonical_etypes[0]
+        seeds = batch_graph.edges[predict_etype[1]].data[dgl.EID]
+        lbl = self._data.get_labels({predict_etype: seeds}, self._device)
+        return input_feats, lbl
 
 
 ################ Minibatch DataLoader (Link Prediction) #######################
@@ -122,8 +368,11 @@ BUILTIN_LP_JOINT_NEG_SAMPLER = 'joint'
 BUILTIN_LP_LOCALUNIFORM_NEG_SAMPLER = 'localuniform'
 BUILTIN_LP_ALL_ETYPE_UNIFORM_NEG_SAMPLER = 'all_etype_uniform'
 BUILTIN_LP_ALL_ETYPE_JOINT_NEG_SAMPLER = 'all_etype_joint'
+BUILTIN_LP_LOCALDEGREE_NEG_SAMPLER = 'localdegree'
+BUILTIN_LP_JOINT_LOCALDEGREE_NEG_SAMPLER = 'joint_localdegree'
+BUILTIN_LP_INBATCH_NEG_SAMPLER = 'inbatch'
 
-class GSgnnLinkPredictionDataLoader():
+class GSgnnLinkPredictionDataLoader(GSgnnDataLoaderBase):
     """ Link prediction minibatch dataloader
 
     The negative edges are sampled uniformly.
@@ -152,11 +401,15 @@ class GSgnnLinkPredictionDataLoader():
         The mask that indicates the edges used for computing GNN embeddings. By default,
         the dataloader uses the edges in the training graphs to compute GNN embeddings to
         avoid information leak for link prediction.
+    num_prefetch_batches : int
+        The number of mini-batches whose node features are fetched in the background.
+        If it's larger than 0, every mini-batch ends with a tuple of the node features.
     """
     def __init__(self, dataset, target_idx, fanout, batch_size, num_negative_edges, device='cpu',
                  train_task=True, reverse_edge_types_map=None, exclude_training_targets=False,
-                 edge_mask_for_gnn_embeddings='train_mask'):
-        self._data = dataset
+                 edge_mask_for_gnn_embeddings='train_mask', num_prefetch_batches=0):
+        super(GSgnnLinkPredictionDataLoader, self).__init__(dataset, num_prefetch_batches)
+        self._device = device
         for etype in target_idx:
             assert etype in dataset.g.canonical_etypes, \
                     "edge type {} does not exist in the graph".format(etype)
@@ -168,6 +421,16 @@ class GSgnnLinkPredictionDataLoader():
                 reverse_edge_types_map=reverse_edge_types_map,
                 edge_mask_for_gnn_embeddings=edge_mask_for_gnn_embeddings)
 
+    def setup_sample_cache(self, num_variants, refresh_epochs=0, cache_path=None):
+        """ The sampled mini-batches of link prediction cannot be cached.
+
+        The neighborhoods of the nodes of the negative edges are sampled together
+        with the positive edges, so a replayed mini-batch would train on the same
+        negative edges in every epoch.
+        """
+        raise NotImplementedError("Link prediction doesn't support caching "
+                                  "the sampled mini-batches.")
+
     def _prepare_negative_sampler(self, num_negative_edges):
         # the default negative sampler is uniform sampler
         negative_sampler = dgl.dataloading.negative_sampler.Uniform(num_negative_edges)
@@ -212,17 +475,12 @@ class GSgnnLinkPredictionDataLoader():
                                                     reverse_etypes=reverse_etypes)
         return loader
 
-    def __iter__(self):
-        return self.dataloader.__iter__()
-
-    def __next__(self):
-        return self.dataloader.__next__()
-
-    @property
-    def data(self):
-        """ The dataset of this dataloader.
-        """
-        return self._data
+    def _fetch_batch_data(self, batch):
+        input_nodes, pos_graph, _, _ = batch
+        if not isinstance(input_nodes, dict):
+            assert len(pos_graph.ntypes) == 1
+            input_nodes = {pos_graph.ntypes[0]: input_nodes}
+        return (self._data.get_node_feats(input_nodes, self._device),)
 
 class GSgnnLPJointNegDataLoader(GSgnnLinkPredictionDataLoader):
     """ Link prediction dataloader with joint negative sampler
@@ -244,8 +502,92 @@ class GSgnnLPLocalUniformNegDataLoader(GSgnnLinkPredictionDataLoader):
         negative_sampler = LocalUniform(num_negative_edges)
         return negative_sampler
 
+class GSgnnLPLocalDegreeNegDataLoader(GSgnnLinkPredictionDataLoader):
+    """ Link prediction dataloader with a negative sampler that samples the nodes
+        in the local partition with probabilities proportional to degree^0.75.
+
+    """
+
+    def _prepare_negative_sampler(self, num_negative_edges):
+        negative_sampler = LocalDegree(num_negative_edges)
+        return negative_sampler
+
+    def _prepare_dataloader(self, g, target_idxs, *args, **kwargs):
+        loader = super()._prepare_dataloader(g, target_idxs, *args, **kwargs)
+        etypes = target_idxs.keys() if isinstance(target_idxs, dict) else g.canonical_etypes
+        # Build the alias tables of the corrupted node types before the first mini-batch.
+        loader.collator.negative_sampler.build_alias_tables(
+            g, {g.to_canonical_etype(etype)[2] for etype in etypes})
+        return loader
+
+class GSgnnLPJointLocalDegreeNegDataLoader(GSgnnLPLocalDegreeNegDataLoader):
+    """ Link prediction dataloader with a joint negative sampler that samples the nodes
+        in the local partition with probabilities proportional to degree^0.75.
+
+    """
+
+    def _prepare_negative_sampler(self, num_negative_edges):
+        negative_sampler = JointLocalDegree(num_negative_edges)
+        return negative_sampler
+
+class GSgnnLPInBatchNegDataLoader(GSgnnLinkPredictionDataLoader):
+    """ Link prediction dataloader that uses the destination nodes of the other
+        edges in a mini-batch as negative nodes.
+
+    """
+
+    def _prepare_negative_sampler(self, num_negative_edges):
+        negative_sampler = InBatch(num_negative_edges)
+        return negative_sampler
+
 ######## Per etype sampler ########
 
+class _GroupedEdgeCollator(EdgeCollator):
+    """ EdgeCollator that takes the edge IDs of a mini-batch grouped by edge types.
+
+        EdgeCollator expects a mini-batch to be a list of edge IDs or (etype, eid)
+        pairs. Here a mini-batch is a dict of the edge ID tensors of the edge types,
+        so the edges are collated without being regrouped.
+    """
+    def collate(self, items):
+        """ Combine the edges of a mini-batch with their neighborhoods.
+
+            Parameters
+            ----------
+            items : dict of Tensors
+                The edge IDs of every edge type.
+
+            Returns
+            -------
+            tuple : (input_nodes, pair_graph, blocks), or (input_nodes, pair_graph,
+            negative_pair_graph, blocks) if negative sampling is enabled.
+        """
+        assert isinstance(items, dict), "The edge IDs have to be grouped by edge types."
+        items = prepare_tensor_or_dict(self.g_sampling, items, "items")
+        if self.negative_sampler is None:
+            pair_graph = self.g.edge_subgraph(items)
+        else:
+            pair_graph = self.g.edge_subgraph(items, relabel_nodes=False)
+            induced_edges = pair_graph.edata[dgl.EID]
+            neg_srcdst = self.negative_sampler(self.g, items)
+            dtype = list(neg_srcdst.values())[0][0].dtype
+            neg_edges = {etype: neg_srcdst.get(etype, (th.tensor([], dtype=dtype),
+                                                       th.tensor([], dtype=dtype))) \
+                         for etype in self.g.canonical_etypes}
+            neg_pair_graph = dgl.heterograph(neg_edges, {ntype: self.g.num_nodes(ntype) \
+                                                         for ntype in self.g.ntypes})
+            pair_graph, neg_pair_graph = dgl.compact_graphs([pair_graph, neg_pair_graph])
+            pair_graph.edata[dgl.EID] = induced_edges
+
+        exclude_eids = find_exclude_eids(self.g_sampling, items, self.exclude,
+                                         reverse_eids=self.reverse_eids,
+                                         reverse_etypes=self.reverse_etypes)
+        input_nodes, _, blocks = self.graph_sampler.sample_blocks(
+            self.g_sampling, pair_graph.ndata[dgl.NID], exclude_eids=exclude_eids)
+        if self.negative_sampler is None:
+            return input_nodes, pair_graph, blocks
+        return input_nodes, pair_graph, neg_pair_graph, blocks
+
 class AllEtypeDistEdgeDataLoader(DistDataLoader):
     """ Distributed edge data sampler that samples at least one
         edge for each edge type in a minibatch
@@ -277,7 +619,7 @@ class AllEtypeDistEdgeDataLoader(DistDataLoader):
             # for the distributed case default to the CPU
             device = 'cpu'
         assert device == 'cpu', 'Only cpu is supported in the case of a DistGraph.'
-        self.collator = EdgeCollator(g, eids, graph_sampler, **collator_kwargs)
+        self.collator = _GroupedEdgeCollator(g, eids, graph_sampler, **collator_kwargs)
         _remove_kwargs_dist(dataloader_kwargs)
         super().__init__(eids,
                          collate_fn=self.collator.collate,
@@ -321,13 +663,29 @@ class AllEtypeDistEdgeDataLoader(DistDataLoader):
         self.bs_per_type = bs_per_type
         self.expected_idxs = max_expected_idxs
 
+        self._reset_epoch()
+
+    def _reset_epoch(self):
+        """ Precompute the edges of all mini-batches of an epoch.
+
+            The edge IDs of every edge type are permuted once per epoch, so
+            a mini-batch only needs to slice them. The random edges that pad
+            the edge types exhausted before the end of the epoch are also
+            generated here.
+        """
         self.current_pos = {etype:0 for etype, _ in self.data_idx.items()}
+        self._epoch_eids = {etype: self.dataset[etype][idxs] \
+            for etype, idxs in self.data_idx.items()}
+        self._pad_eids = {etype: self.dataset[etype][ \
+            th.randint(len(self.dataset[etype]), (self.expected_idxs,))] \
+            for etype in self.dataset}
+        self._num_batches = 0
 
     def __iter__(self):
         if self.shuffle:
             self.data_idx = {etype: th.randperm(len(idxs)) \
                 for etype, idxs in self.data_idx.items()}
-        self.current_pos = {etype:0 for etype, _ in self.data_idx.items()}
+        self._reset_epoch()
         self.recv_idxs = 0
         self.num_pending = 0
         return self
@@ -350,11 +708,7 @@ class AllEtypeDistEdgeDataLoader(DistDataLoader):
                 end_pos = len(self.dataset[etype])
         else:
             end_pos = self.current_pos[etype] + self.bs_per_type[etype]
-        idx = self.data_idx[etype][self.current_pos[etype]:end_pos].tolist()
-        ret = self.dataset[etype][idx]
-
-        # Sharing large number of tensors between processes will consume too many
-        # file descriptors, so let's convert each tensor to scalar value beforehand.
+        ret = self._epoch_eids[etype][self.current_pos[etype]:end_pos]
         self.current_pos[etype] = end_pos
 
         return ret
@@ -362,34 +716,25 @@ class AllEtypeDistEdgeDataLoader(DistDataLoader):
     def _rand_gen(self, etype):
         """ Randomly select one edge for a specific edge type
         """
-        return self.dataset[etype][th.randint(len(self.dataset[etype]), (1,))]
+        return self._pad_eids[etype][self._num_batches:self._num_batches + 1]
 
     def _next_data(self):
         """ Get postive edges for the next iteration
+
+            Return a dict of eid tensors of all edge types. Only a few tensors
+            are sent to the sampler processes for a mini-batch, so the eids are
+            not converted to scalar values.
         """
-        end = True
-        ret = []
-        for etype, _ in self.dataset.items():
-            next_data = self._next_data_etype(etype)
-            # Only if all etypes reach end of iter,
-            # the current iter is done
-            end = (next_data is None) & end
-            ret.append((etype, next_data))
-
-        if end:
+        ret = {etype: self._next_data_etype(etype) for etype in self.dataset}
+        # Only if all etypes reach end of iter,
+        # the current iter is done
+        if all(eids is None for eids in ret.values()):
             return None
-        else:
-            new_ret = []
-            # for i in range(len(ret)):
-            for rel_t in ret:
-                # rel_t is (etype, eids)
-                if rel_t[1] is None:
-                    # if eids is None, randomly generate one more data point
-                    new_ret.append((rel_t[0], self._rand_gen(rel_t[0]).item()))
-                else:
-                    for data in rel_t[1]:
-                        new_ret.append((rel_t[0], data.item()))
-            return new_ret
+        # if eids is None, randomly generate one more data point
+        ret = {etype: self._rand_gen(etype) if eids is None else eids \
+            for etype, eids in ret.items()}
+        self._num_batches += 1
+        return ret
 
 class GSgnnAllEtypeLinkPredictionDataLoader(GSgnnLinkPredictionDataLoader):
     """ Link prediction minibatch dataloader. In each minibatch,
@@ -441,12 +786,6 @@ class GSgnnAllEtypeLinkPredictionDataLoader(GSgnnLinkPredictionDataLoader):
                                                 if exclude_training_targets else None)
         return loader
 
-    def __iter__(self):
-        return self.dataloader.__iter__()
-
-    def __next__(self):
-        return self.dataloader.__next__()
-
 class GSgnnAllEtypeLPJointNegDataLoader(GSgnnAllEtypeLinkPredictionDataLoader):
     """ Link prediction dataloader with joint negative sampler.
         In each minibatch, at least one edge is sampled from each etype.
@@ -458,6 +797,44 @@ class GSgnnAllEtypeLPJointNegDataLoader(GSgnnAllEtypeLinkPredictionDataLoader):
         negative_sampler = JointUniform(num_negative_edges)
         return negative_sampler
 
+class _FixedEvalPairs():
+    """ The positive and negative pairs of all the evaluation mini-batches of an edge type.
+
+    Each of the positive sources, negative sources, positive destinations and negative
+    destinations of all mini-batches is stored in one array, in int32 if the node IDs
+    fit, and can be memory-mapped from the disk.
+
+    Parameters
+    ----------
+    batches : list of tuples
+        The (pos_src, neg_src, pos_dst, neg_dst) tuple of every mini-batch.
+    path : str
+        The folder where the arrays are saved. If it's None, the arrays are kept in memory.
+    """
+    def __init__(self, batches, path=None):
+        self._offsets = []
+        self._data = []
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+        for i in range(4):
+            parts = [batch[i] for batch in batches]
+            self._offsets.append(np.cumsum([0] + [len(part) for part in parts]))
+            data = th.cat(parts)
+            if len(data) == 0 or data.max() < np.iinfo(np.int32).max:
+                data = data.to(th.int32)
+            data = data.numpy()
+            if path is not None:
+                np.save(os.path.join(path, "{}.npy".format(i)), data)
+                data = np.load(os.path.join(path, "{}.npy".format(i)), mmap_mode='r')
+            self._data.append(data)
+
+    def __len__(self):
+        return len(self._offsets[0]) - 1
+
+    def __getitem__(self, idx):
+        return tuple(th.from_numpy(np.array(data[offsets[idx]:offsets[idx + 1]])).long() \
+                for data, offsets in zip(self._data, self._offsets))
+
 class GSgnnLinkPredictionTestDataLoader():
     """ Link prediction minibatch dataloader for validation and test.
     In order to efficiently compute positive and negative scores for
@@ -466,6 +843,11 @@ class GSgnnLinkPredictionTestDataLoader():
 
     The negative edges are sampled uniformly.
 
+    If `fixed_negatives` is True, the positive and negative pairs of all
+    mini-batches are generated once with a fixed random seed and are reused
+    by every evaluation, so the metrics of different evaluations are comparable
+    and the evaluation doesn't sample again.
+
     Argument
     --------
     dataset: GSgnnEdgeData
@@ -476,8 +858,16 @@ class GSgnnLinkPredictionTestDataLoader():
         Batch size
     num_negative_edges: int
         The number of negative edges per positive edge
+    fixed_negatives: bool
+        Whether to generate the negative edges once and reuse them.
+    negative_cache_path: str
+        The folder where the fixed negative edges are memory-mapped. If it's None,
+        they are kept in memory.
+    seed: int
+        The random seed of generating the fixed negative edges.
     """
-    def __init__(self, dataset, target_idx, batch_size, num_negative_edges):
+    def __init__(self, dataset, target_idx, batch_size, num_negative_edges,
+                 fixed_negatives=False, negative_cache_path=None, seed=0):
         self._data = dataset
         for etype in target_idx:
             assert etype in dataset.g.canonical_etypes, \
@@ -485,7 +875,10 @@ class GSgnnLinkPredictionTestDataLoader():
         self._batch_size = batch_size
         self._target_idx = target_idx
         self._negative_sampler = self._prepare_negative_sampler(num_negative_edges)
+        self._fixed_pairs = None
         self._reinit_dataset()
+        if fixed_negatives:
+            self._fixed_pairs = self._prepare_fixed_pairs(negative_cache_path, seed)
 
     def _reinit_dataset(self):
         """ Reinitialize the dataset
@@ -499,6 +892,25 @@ class GSgnnLinkPredictionTestDataLoader():
         negative_sampler = GlobalUniform(num_negative_edges)
         return negative_sampler
 
+    def _prepare_fixed_pairs(self, cache_path, seed):
+        """ Generate the positive and negative pairs of all mini-batches once.
+        """
+        fixed_pairs = {}
+        # Don't change the global random state used by training.
+        with th.random.fork_rng(devices=[]):
+            th.manual_seed(seed + get_rank())
+            for etype in self._target_idx:
+                batches = []
+                end_of_etype = False
+                while not end_of_etype:
+                    pos_neg_tuple, end_of_etype = self._next_data(etype)
+                    batches.append(pos_neg_tuple[etype])
+                path = None if cache_path is None else \
+                        os.path.join(cache_path, str(get_rank()), "-".join(etype))
+                fixed_pairs[etype] = _FixedEvalPairs(batches, path)
+        self._reinit_dataset()
+        return fixed_pairs
+
     def __iter__(self):
         self._reinit_dataset()
         return self
@@ -509,6 +921,10 @@ class GSgnnLinkPredictionTestDataLoader():
         g = self._data.g
         current_pos = self._current_pos[etype]
         end_of_etype = current_pos + self._batch_size >= len(self._target_idx[etype])
+        if self._fixed_pairs is not None:
+            pos_neg_tuple = {etype: self._fixed_pairs[etype][current_pos // self._batch_size]}
+            self._current_pos[etype] += self._batch_size
+            return pos_neg_tuple, end_of_etype
         pos_eids = self._target_idx[etype][current_pos:] if end_of_etype \
             else self._target_idx[etype][current_pos:current_pos+self._batch_size]
         pos_pairs = g.find_edges(pos_eids, etype=etype)
@@ -541,7 +957,7 @@ class GSgnnLinkPredictionJointTestDataLoader(GSgnnLinkPredictionTestDataLoader):
 
 ################ Minibatch DataLoader (Node classification) #######################
 
-class GSgnnNodeDataLoader():
+class GSgnnNodeDataLoader(GSgnnDataLoaderBase):
     """ Minibatch dataloader for node tasks
 
     Parameters
@@ -558,9 +974,15 @@ class GSgnnNodeDataLoader():
         the device trainer is running on.
     train_task : bool
         Whether or not for training.
+    num_prefetch_batches : int
+        The number of mini-batches whose node features and labels are fetched
+        in the background. If it's larger than 0, every mini-batch ends with
+        a tuple of the node features and the labels.
     """
-    def __init__(self, dataset, target_idx, fanout, batch_size, device, train_task=True):
-        self._data = dataset
+    def __init__(self, dataset, target_idx, fanout, batch_size, device, train_task=True,
+                 num_prefetch_batches=0):
+        super(GSgnnNodeDataLoader, self).__init__(dataset, num_prefetch_batches)
+        self._device = device
         assert isinstance(target_idx, dict)
         for ntype in target_idx:
             assert ntype in dataset.g.ntypes, \
@@ -571,6 +993,7 @@ class GSgnnNodeDataLoader():
                                                    batch_size,
                                                    train_task,
                                                    device)
+        self._target_nidx = target_idx
 
     def _prepare_dataloader(self, g, target_idx, fanout, batch_size, train_task, device):
         for ntype in target_idx:
@@ -581,14 +1004,17 @@ class GSgnnNodeDataLoader():
 
         return loader
 
-    def __iter__(self):
-        return self.dataloader.__iter__()
-
-    def __next__(self):
-        return self.dataloader.__next__()
+    def _fetch_batch_data(self, batch):
+        input_nodes, seeds, _ = batch
+        if not isinstance(input_nodes, dict):
+            g = self._data.g
+            assert len(g.ntypes) == 1
+            input_nodes = {g.ntypes[0]: input_nodes}
+        return (self._data.get_node_feats(input_nodes, self._device),
+                self._data.get_labels(seeds, self._device))
 
     @property
-    def data(self):
-        """ The dataset of this dataloader.
+    def target_nidx(self):
+        """ The target nodes of the dataloader.
         """
-        return self._data
+        return self._target_nidx
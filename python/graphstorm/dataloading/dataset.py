@@ -15,27 +15,54 @@
 
     Various datasets for the GSF
 """
+import os
 import abc
+import json
+import functools
+import hashlib
 import torch as th
 import dgl
 
 from ..utils import get_rank
 from ..utils import sys_tracker
-from .utils import dist_sum
+from .utils import dist_sum, dist_all_gather_size, split_local_first
+from .feat_cache import NodeFeatCache
 
-def split_full_edge_list(g, etype, rank):
+# The version of the splits in the split cache. Increase it whenever the split
+# functions change, so that the splits computed by the old functions aren't reused.
+SPLIT_CACHE_VERSION = 1
+
+def split_full_edge_list(g, etype):
     ''' Split the full edge list of a graph.
+
+    Each trainer gets the edges in its own partition first and the remainder
+    is rebalanced, so that the trainers get the same number of edges.
     '''
-    # TODO(zhengda) we need to split the edges to co-locate data and computation.
     # We assume that the number of edges is larger than the number of processes.
     # This should always be true unless a user's training set is extremely small.
     assert g.num_edges(etype) >= th.distributed.get_world_size()
-    start = g.num_edges(etype) // th.distributed.get_world_size() * rank
-    end = g.num_edges(etype) // th.distributed.get_world_size() * (rank + 1)
-    return th.arange(start, end)
+    return split_local_first(g.get_partition_book(), etype=etype)
+
+def get_feat_names(feat_field, ntype):
+    """ Get the names of the features of a node type.
+
+    Parameters
+    ----------
+    feat_field: str or dict of list of str
+        Fields to extract features
+    ntype : str
+        The node type.
+
+    Returns
+    -------
+    list of str : the feature names or None if the node type doesn't have features.
+    """
+    return None if feat_field is None else \
+        [feat_field] if isinstance(feat_field, str) \
+        else feat_field[ntype] if ntype in feat_field else None
 
 def prepare_batch_input(g, input_nodes,
-                        dev='cpu', feat_field='feat'):
+                        dev='cpu', feat_field='feat', feat_cache=None):
     """ Prepare minibatch input features
 
     Note: The output is stored in dev.
@@ -50,24 +77,173 @@ def prepare_batch_input(g, input_nodes,
         Device to put output in.
     feat_field: str or dict of list of str
         Fields to extract features
+    feat_cache: NodeFeatCache
+        The cache of remote node features. It's created with the same feat_field.
 
     Return:
     -------
     Dict of tensors.
         If a node type has features, it will get node features.
     """
+    cached_feat = feat_cache.fetch(input_nodes) if feat_cache is not None else {}
     feat = {}
     for ntype, nid in input_nodes.items():
-        feat_name = None if feat_field is None else \
-            [feat_field] if isinstance(feat_field, str) \
-            else feat_field[ntype] if ntype in feat_field else None
+        feat_name = get_feat_names(feat_field, ntype)
 
-        if feat_name is not None:
+        if ntype in cached_feat:
+            feat[ntype] = cached_feat[ntype].to(dev)
+        elif feat_name is not None:
             # concatenate multiple features together
             feat[ntype] = th.cat([g.nodes[ntype].data[fname][nid].to(dev) \
                 for fname in feat_name], dim=1)
+        # The features stored in half precision are converted on the target device.
+        if ntype in feat and feat[ntype].dtype in (th.float16, th.bfloat16):
+            feat[ntype] = feat[ntype].float()
     return feat
 
+FUSED_FEAT_NAME = "fused_feat"
+
+def fuse_node_feats(g, feat_field, dtype=None, batch_size=65536):
+    """ Fuse the feature fields of each node type into one distributed tensor.
+
+    The fused tensor stores the concatenated features, so a mini-batch gathers one
+    tensor of each node type instead of one tensor per field. The features can also be
+    stored in a lower precision to reduce the bytes sent over the network. Every trainer
+    fills the rows of the nodes in its local partition.
+
+    Parameters
+    ----------
+    g : DistGraph
+        The distributed graph.
+    feat_field : str or dict of list of str
+        Fields to extract features
+    dtype : torch.dtype
+        The data type of the fused features. If it's None, the data type of
+        the concatenated features is used.
+    batch_size : int
+        The number of nodes filled at a time.
+
+    Returns
+    -------
+    dict of list of str : the fields to extract the fused features.
+    """
+    fused_field = {}
+    for ntype in g.ntypes:
+        feat_name = get_feat_names(feat_field, ntype)
+        if feat_name is None:
+            continue
+        feats = [g.nodes[ntype].data[fname] for fname in feat_name]
+        fused_dtype = feats[0].dtype
+        for feat in feats[1:]:
+            fused_dtype = th.promote_types(fused_dtype, feat.dtype)
+        fused_dtype = fused_dtype if dtype is None else dtype
+        # There is nothing to fuse.
+        if len(feats) == 1 and feats[0].dtype == fused_dtype:
+            fused_field[ntype] = feat_name
+            continue
+
+        num_nodes = g.number_of_nodes(ntype)
+        fused = dgl.distributed.DistTensor((num_nodes, sum(feat.shape[1] for feat in feats)),
+                                           dtype=fused_dtype,
+                                           name='{}_{}_{}'.format(ntype, FUSED_FEAT_NAME,
+                                                                  str(fused_dtype)[6:]),
+                                           part_policy=g.get_node_partition_policy(ntype),
+                                           persistent=True)
+        local_nids = dgl.distributed.node_split(th.ones((num_nodes,), dtype=th.bool),
+                                                partition_book=g.get_partition_book(),
+                                                ntype=ntype, force_even=False)
+        for nids in th.split(local_nids, batch_size):
+            fused[nids] = th.cat([feat[nids] for feat in feats], dim=1).to(fused_dtype)
+        g.nodes[ntype].data[FUSED_FEAT_NAME] = fused
+        fused_field[ntype] = [FUSED_FEAT_NAME]
+    th.distributed.barrier()
+    return fused_field
+
+class SplitCache():
+    """ The cache of the train, validation and test IDs of a trainer.
+
+    Computing the IDs from the masks of many node and edge types can take minutes.
+    The cache saves the IDs of every trainer in the partition folder, so later jobs
+    on the same partitions with the same number of trainers load them directly.
+    The cache is invalidated when the partition config or the data files of the
+    local partition change, or when `SPLIT_CACHE_VERSION` changes.
+
+    Parameters
+    ----------
+    part_config : str
+        The path of the partition configuration file.
+    """
+    def __init__(self, part_config):
+        world_size = th.distributed.get_world_size()
+        self._path = os.path.join(os.path.dirname(os.path.abspath(part_config)),
+                                  "split_cache", str(world_size),
+                                  "rank-{}.pt".format(get_rank()))
+        self._fingerprint = self._get_fingerprint(part_config)
+        self._splits = {}
+        self._updated = False
+        if os.path.exists(self._path):
+            cached = th.load(self._path)
+            if cached["fingerprint"] == self._fingerprint:
+                self._splits = cached["splits"]
+        # All trainers have to compute the same splits together, because the splits
+        # exchange data between the trainers. The cache is only used if the trainers
+        # cached the same splits, e.g., it isn't if some trainers failed to save it.
+        key_hash = hashlib.sha256(json.dumps(sorted(str(key) for key in self._splits)) \
+                .encode("utf8")).hexdigest()
+        if len(self._splits) == 0 or len(set(dist_all_gather_size(int(key_hash[:15], 16)))) > 1:
+            self._splits = {}
+
+    @staticmethod
+    def _get_fingerprint(part_config):
+        """ Compute the hash of the partition config and the local partition files.
+        """
+        with open(part_config, "r", encoding="utf8") as f:
+            part_meta = json.load(f)
+        part_dir = os.path.dirname(os.path.abspath(part_config))
+        part_id = th.distributed.get_rank() * part_meta["num_parts"] \
+                // th.distributed.get_world_size()
+        files = [os.path.abspath(part_config)]
+        for key in ["node_feats", "edge_feats"]:
+            if key in part_meta.get("part-{}".format(part_id), {}):
+                files.append(os.path.join(part_dir, part_meta["part-{}".format(part_id)][key]))
+        stats = [(path, os.stat(path).st_size, os.stat(path).st_mtime_ns) \
+                for path in files if os.path.exists(path)]
+        return hashlib.sha256(json.dumps([SPLIT_CACHE_VERSION, stats]).encode("utf8")) \
+                .hexdigest()
+
+    def get(self, key, split_fn):
+        """ Get the IDs of a split from the cache or compute them.
+
+        Parameters
+        ----------
+        key : tuple of str
+            The key of the split, e.g., ("train", ntype).
+        split_fn : callable
+            The function that computes the IDs.
+
+        Returns
+        -------
+        Tensor : the IDs of the split.
+        """
+        if key not in self._splits:
+            self._splits[key] = split_fn()
+            self._updated = True
+        return self._splits[key]
+
+    def save(self):
+        """ Save the computed splits.
+        """
+        if not self._updated:
+            return
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            th.save({"fingerprint": self._fingerprint, "splits": self._splits},
+                    self._path + ".tmp")
+            os.replace(self._path + ".tmp", self._path)
+        except OSError as err:
+            print("WARNING: fail to save the split cache to {}: {}".format(self._path, err))
+        self._updated = False
+
 class GSgnnData():
     """ The GraphStorm data
 
@@ -83,18 +259,25 @@ class GSgnnData():
     edge_feat_field : str or dict of str
         The field of the edge features. It's a dict if different edge types have
         different feature names.
+    cache_split : bool
+        Whether to cache the train, validation and test IDs in the partition folder.
     """
 
-    def __init__(self, graph_name, part_config, node_feat_field, edge_feat_field):
+    def __init__(self, graph_name, part_config, node_feat_field, edge_feat_field,
+                 cache_split=False):
         self._g = dgl.distributed.DistGraph(graph_name, part_config=part_config)
         self._node_feat_field = node_feat_field
         self._edge_feat_field = edge_feat_field
+        self._feat_cache = None
 
         self._train_idxs = {}
         self._val_idxs = {}
         self._test_idxs = {}
 
+        self._split_cache = SplitCache(part_config) if cache_split else None
         self.prepare_data(self._g)
+        if self._split_cache is not None:
+            self._split_cache.save()
         sys_tracker.check('construct training data')
 
     @abc.abstractmethod
@@ -106,6 +289,27 @@ class GSgnnData():
         g: Dist DGLGraph
         """
 
+    def _split(self, key, split_fn, *args, **kwargs):
+        """ Compute the IDs of a split or load them from the split cache.
+
+        Parameters
+        ----------
+        key : tuple of str
+            The key of the split in the cache.
+        split_fn : callable
+            The function that computes the IDs with the rest of the arguments.
+            Its name is part of the key in the cache.
+
+        Returns
+        -------
+        Tensor : the IDs of the split.
+        """
+        key = key + (split_fn.__name__,)
+        split_fn = functools.partial(split_fn, *args, **kwargs)
+        if self._split_cache is None:
+            return split_fn()
+        return self._split_cache.get(key, split_fn)
+
     @property
     def g(self):
         """ The distributed graph.
@@ -117,6 +321,56 @@ class GSgnnData():
         """the field of node feature"""
         return self._node_feat_field
 
+    def fuse_node_feats(self, dtype=None):
+        """ Fuse the feature fields of each node type into one distributed tensor.
+
+        After that, `get_node_feats` gathers one tensor of each node type in a mini-batch.
+        It has to be called before `setup_feat_cache`.
+
+        Parameters
+        ----------
+        dtype : torch.dtype
+            The data type of the fused features, e.g., th.float16 or th.bfloat16 to
+            halve the bytes sent over the network. The features are converted
+            back to float32 on the target device of `get_node_feats`.
+        """
+        assert self._feat_cache is None, \
+                "The node features have to be fused before setting up the feature cache."
+        self._node_feat_field = fuse_node_feats(self._g, self._node_feat_field, dtype)
+        sys_tracker.check('fuse node features')
+
+    @property
+    def feat_cache(self):
+        """ The cache of remote node features or None if it isn't set up.
+        """
+        return self._feat_cache
+
+    def setup_feat_cache(self, cache_size, policy="degree", num_warmup_batches=100):
+        """ Set up the cache of remote node features for `get_node_feats`.
+
+        Parameters
+        ----------
+        cache_size : float
+            The memory budget of the cache in MB.
+        policy : str
+            The policy of selecting the cached nodes: "degree" caches the remote nodes
+            with the most edges to the local partition and "frequency" caches the remote
+            nodes accessed most often in the first mini-batches.
+        num_warmup_batches : int
+            The number of mini-batches whose accesses are counted by the "frequency" policy.
+        """
+        feat_names = {}
+        for ntype in self._g.ntypes:
+            names = get_feat_names(self._node_feat_field, ntype)
+            if names is not None:
+                feat_names[ntype] = names
+        self._feat_cache = NodeFeatCache(self._g, feat_names, cache_size, policy,
+                                         num_warmup_batches)
+        sys_tracker.check('set up feature cache')
+        if get_rank() == 0:
+            print("The feature cache stores {} nodes.".format(
+                self._feat_cache.num_cached_nodes))
+
     @property
     def edge_feat_field(self):
         """the field of edge feature"""
@@ -142,7 +396,8 @@ class GSgnnData():
                     "We don't know the input node type, but the graph has more than one node type."
             input_nodes = {g.ntypes[0]: input_nodes}
         return prepare_batch_input(g, input_nodes, dev=device,
-                                   feat_field=self._node_feat_field)
+                                   feat_field=self._node_feat_field,
+                                   feat_cache=self._feat_cache)
 
 class GSgnnEdgeData(GSgnnData):  # pylint: disable=abstract-method
     """ Data for edge tasks
@@ -161,11 +416,13 @@ class GSgnnEdgeData(GSgnnData):  # pylint: disable=abstract-method
     edge_feat_field : str or dict of str
         The field of the edge features. It's a dict if different edge types have
         different feature names.
+    cache_split : bool
+        Whether to cache the train, validation and test IDs in the partition folder.
     """
     def __init__(self, graph_name, part_config, label_field=None,
-                 node_feat_field=None, edge_feat_field=None):
+                 node_feat_field=None, edge_feat_field=None, cache_split=False):
         super(GSgnnEdgeData, self).__init__(graph_name, part_config,
-                                            node_feat_field, edge_feat_field)
+                                            node_feat_field, edge_feat_field, cache_split)
 
         self._label_field = label_field
         if label_field is not None:
@@ -234,9 +491,12 @@ class GSgnnEdgeTrainData(GSgnnEdgeData):
     edge_feat_field : str or dict of str
         The field of the edge features. It's a dict if different edge types have
         different feature names.
+    cache_split : bool
+        Whether to cache the train, validation and test IDs in the partition folder.
     """
     def __init__(self, graph_name, part_config, train_etypes, eval_etypes=None,
-                 label_field=None, node_feat_field=None, edge_feat_field=None):
+                 label_field=None, node_feat_field=None, edge_feat_field=None,
+                 cache_split=False):
         if train_etypes is not None:
             assert isinstance(train_etypes, (tuple, list)), \
                     "The prediction etypes for training has to be a tuple or a list of tuples."
@@ -256,7 +516,7 @@ class GSgnnEdgeTrainData(GSgnnEdgeData):
             self._eval_etypes = train_etypes
 
         super(GSgnnEdgeTrainData, self).__init__(graph_name, part_config, label_field,
-                                                 node_feat_field, edge_feat_field)
+                                                 node_feat_field, edge_feat_field, cache_split)
 
     def prepare_data(self, g):
         """
@@ -280,14 +540,16 @@ class GSgnnEdgeTrainData(GSgnnEdgeData):
             self._train_etypes = g.canonical_etypes
         for canonical_etype in self.train_etypes:
             if 'train_mask' in g.edges[canonical_etype].data:
-                train_idx = dgl.distributed.edge_split(
-                    g.edges[canonical_etype].data['train_mask'],
-                    pb, etype=canonical_etype, force_even=True)
+                # Keep the training edges in the partitions of the trainers
+                # to make sampling and feature fetching local.
+                train_idx = self._split(("train",) + canonical_etype, split_local_first, pb,
+                                        g.edges[canonical_etype].data['train_mask'],
+                                        etype=canonical_etype)
             else:
                 # If there are no training masks, we assume all edges can be used for training.
                 # Therefore, we use a more memory efficient way to split the edge list.
-                # TODO(zhengda) we need to split the edges properly to increase the data locality.
-                train_idx = split_full_edge_list(g, canonical_etype, get_rank())
+                train_idx = self._split(("train",) + canonical_etype, split_full_edge_list,
+                                        g, canonical_etype)
             num_train += len(train_idx)
             train_idxs[canonical_etype] = train_idx
 
@@ -297,17 +559,17 @@ class GSgnnEdgeTrainData(GSgnnEdgeData):
         for canonical_etype in self.eval_etypes:
             # user must provide validation mask
             if 'val_mask' in g.edges[canonical_etype].data:
-                val_idx = dgl.distributed.edge_split(
-                    g.edges[canonical_etype].data['val_mask'],
-                    pb, etype=canonical_etype, force_even=True)
+                val_idx = self._split(("val",) + canonical_etype, split_local_first, pb,
+                                      g.edges[canonical_etype].data['val_mask'],
+                                      etype=canonical_etype)
                 num_val += len(val_idx)
                 # If there are validation data globally, we should add them to the dict.
                 if dist_sum(len(val_idx)) > 0:
                     val_idxs[canonical_etype] = val_idx
             if 'test_mask' in g.edges[canonical_etype].data:
-                test_idx = dgl.distributed.edge_split(
-                    g.edges[canonical_etype].data['test_mask'],
-                    pb, etype=canonical_etype, force_even=True)
+                test_idx = self._split(("test",) + canonical_etype, split_local_first, pb,
+                                       g.edges[canonical_etype].data['test_mask'],
+                                       etype=canonical_etype)
                 num_test += len(test_idx)
                 # If there are test data globally, we should add them to the dict.
                 if dist_sum(len(test_idx)) > 0:
@@ -348,9 +610,12 @@ class GSgnnEdgeInferData(GSgnnEdgeData):
     edge_feat_field : str or dict of str
         The field of the edge features. It's a dict if different edge types have
         different feature names.
+    cache_split : bool
+        Whether to cache the train, validation and test IDs in the partition folder.
     """
     def __init__(self, graph_name, part_config, eval_etypes,
-                 label_field=None, node_feat_field=None, edge_feat_field=None):
+                 label_field=None, node_feat_field=None, edge_feat_field=None,
+                 cache_split=False):
         if eval_etypes is not None:
             assert isinstance(eval_etypes, (tuple, list)), \
                     "The prediction etypes for evaluation has to be a tuple or a list of tuples."
@@ -361,7 +626,7 @@ class GSgnnEdgeInferData(GSgnnEdgeData):
             self._eval_etypes = None # Test on all edge types
 
         super(GSgnnEdgeInferData, self).__init__(graph_name, part_config, label_field,
-                                                 node_feat_field, edge_feat_field)
+                                                 node_feat_field, edge_feat_field, cache_split)
 
     def prepare_data(self, g):
         """ Prepare the testing edge set if any
@@ -381,9 +646,9 @@ class GSgnnEdgeInferData(GSgnnEdgeData):
         # test_mask exists
         for canonical_etype in self.eval_etypes:
             if 'test_mask' in g.edges[canonical_etype].data:
-                test_idx = dgl.distributed.edge_split(
-                    g.edges[canonical_etype].data['test_mask'],
-                    pb, etype=canonical_etype, force_even=True)
+                test_idx = self._split(("test",) + canonical_etype, split_local_first, pb,
+                                       g.edges[canonical_etype].data['test_mask'],
+                                       etype=canonical_etype)
                 # If there are test data globally, we should add them to the dict.
                 if dist_sum(len(test_idx)) > 0:
                     test_idxs[canonical_etype] = test_idx
@@ -415,11 +680,13 @@ class GSgnnNodeData(GSgnnData):  # pylint: disable=abstract-method
     edge_feat_field : str or dict of str
         The field of the edge features. It's a dict if different edge types have
         different feature names.
+    cache_split : bool
+        Whether to cache the train, validation and test IDs in the partition folder.
     """
     def __init__(self, graph_name, part_config, label_field=None,
-                 node_feat_field=None, edge_feat_field=None):
+                 node_feat_field=None, edge_feat_field=None, cache_split=False):
         super(GSgnnNodeData, self).__init__(graph_name, part_config,
-                                            node_feat_field, edge_feat_field)
+                                            node_feat_field, edge_feat_field, cache_split)
         self._label_field = label_field
         if label_field is not None:
             self._labels = {}
@@ -487,9 +754,12 @@ class GSgnnNodeTrainData(GSgnnNodeData):
     edge_feat_field : str or dict of str
         The field of the edge features. It's a dict if different edge types have
         different feature names.
+    cache_split : bool
+        Whether to cache the train, validation and test IDs in the partition folder.
     """
     def __init__(self, graph_name, part_config, train_ntypes, eval_ntypes=None,
-                 label_field=None, node_feat_field=None, edge_feat_field=None):
+                 label_field=None, node_feat_field=None, edge_feat_field=None,
+                 cache_split=False):
         if isinstance(train_ntypes, str):
             train_ntypes = [train_ntypes]
         assert isinstance(train_ntypes, list), \
@@ -508,7 +778,8 @@ class GSgnnNodeTrainData(GSgnnNodeData):
         super(GSgnnNodeTrainData, self).__init__(graph_name, part_config,
                                                  label_field=label_field,
                                                  node_feat_field=node_feat_field,
-                                                 edge_feat_field=edge_feat_field)
+                                                 edge_feat_field=edge_feat_field,
+                                                 cache_split=cache_split)
 
     def prepare_data(self, g):
         pb = g.get_partition_book()
@@ -522,26 +793,30 @@ class GSgnnNodeTrainData(GSgnnNodeData):
 
             if 'trainer_id' in g.nodes[ntype].data:
                 node_trainer_ids = g.nodes[ntype].data['trainer_id']
-                train_idx = dgl.distributed.node_split(g.nodes[ntype].data['train_mask'],
-                                                       pb, ntype=ntype, force_even=True,
-                                                       node_trainer_ids=node_trainer_ids)
+                train_idx = self._split(("train", "trainer_id", ntype),
+                                        dgl.distributed.node_split,
+                                        g.nodes[ntype].data['train_mask'],
+                                        pb, ntype=ntype, force_even=True,
+                                        node_trainer_ids=node_trainer_ids)
             else:
-                train_idx = dgl.distributed.node_split(g.nodes[ntype].data['train_mask'],
-                                                       pb, ntype=ntype, force_even=True)
+                # Keep the training nodes in the partitions of the trainers
+                # to make sampling and feature fetching local.
+                train_idx = self._split(("train", ntype), split_local_first, pb,
+                                        g.nodes[ntype].data['train_mask'], ntype=ntype)
             num_train += len(train_idx)
             train_idxs[ntype] = train_idx
 
         for ntype in self.eval_ntypes:
             if 'val_mask' in g.nodes[ntype].data:
-                val_idx = dgl.distributed.node_split(g.nodes[ntype].data['val_mask'],
-                                                     pb, ntype=ntype, force_even=True)
+                val_idx = self._split(("val", ntype), split_local_first, pb,
+                                      g.nodes[ntype].data['val_mask'], ntype=ntype)
                 num_val += len(val_idx)
                 # If there are validation data globally, we should add them to the dict.
                 if dist_sum(len(val_idx)) > 0:
                     val_idxs[ntype] = val_idx
             if 'test_mask' in g.nodes[ntype].data:
-                test_idx = dgl.distributed.node_split(g.nodes[ntype].data['test_mask'],
-                                                      pb, ntype=ntype, force_even=True)
+                test_idx = self._split(("test", ntype), split_local_first, pb,
+                                       g.nodes[ntype].data['test_mask'], ntype=ntype)
                 num_test += len(test_idx)
                 # If there are test data globally, we should add them to the dict.
                 if dist_sum(len(test_idx)) > 0:
@@ -583,9 +858,12 @@ class GSgnnNodeInferData(GSgnnNodeData):
     edge_feat_field : str or dict of str
         The field of the edge features. It's a dict if different edge types have
         different feature names.
+    cache_split : bool
+        Whether to cache the train, validation and test IDs in the partition folder.
     """
     def __init__(self, graph_name, part_config, eval_ntypes,
-                 label_field=None, node_feat_field=None, edge_feat_field=None):
+                 label_field=None, node_feat_field=None, edge_feat_field=None,
+                 cache_split=False):
         if isinstance(eval_ntypes, str):
             eval_ntypes = [eval_ntypes]
         assert isinstance(eval_ntypes, list), \
@@ -595,7 +873,8 @@ class GSgnnNodeInferData(GSgnnNodeData):
         super(GSgnnNodeInferData, self).__init__(graph_name, part_config,
                                                  label_field=label_field,
                                                  node_feat_field=node_feat_field,
-                                                 edge_feat_field=edge_feat_field)
+                                                 edge_feat_field=edge_feat_field,
+                                                 cache_split=cache_split)
 
     def prepare_data(self, g):
         """
@@ -613,11 +892,16 @@ class GSgnnNodeInferData(GSgnnNodeData):
         test_idxs = {}
         for ntype in self.eval_ntypes:
             if 'test_mask' in g.nodes[ntype].data:
-                node_trainer_ids = g.nodes[ntype].data['trainer_id'] \
-                        if 'trainer_id' in g.nodes[ntype].data else None
-                test_idx = dgl.distributed.node_split(g.nodes[ntype].data['test_mask'],
-                                                      pb, ntype=ntype, force_even=True,
-                                                      node_trainer_ids=node_trainer_ids)
+                if 'trainer_id' in g.nodes[ntype].data:
+                    node_trainer_ids = g.nodes[ntype].data['trainer_id']
+                    test_idx = self._split(("test", "trainer_id", ntype),
+                                           dgl.distributed.node_split,
+                                           g.nodes[ntype].data['test_mask'],
+                                           pb, ntype=ntype, force_even=True,
+                                           node_trainer_ids=node_trainer_ids)
+                else:
+                    test_idx = self._split(("test", ntype), split_local_first, pb,
+                                           g.nodes[ntype].data['test_mask'], ntype=ntype)
                 # If there are test data globally, we should add them to the dict.
                 if dist_sum(len(test_idx)) > 0:
                     test_idxs[ntype] = test_idx
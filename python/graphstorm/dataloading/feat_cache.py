@@ -0,0 +1,243 @@
+"""
+    Copyright 2023 Contributors
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+
+    The local cache of remote node features.
+"""
+import torch as th
+import dgl
+
+# The number of nodes whose features are pulled in one request when filling the cache.
+FILL_CHUNK_SIZE = 65536
+
+def select_cached_nodes(candidates, row_bytes, cache_size):
+    """ Select the nodes with the highest scores that fit in the memory budget.
+
+    The nodes of all node types compete for the same budget.
+
+    Parameters
+    ----------
+    candidates : dict of tuples
+        The node IDs and their scores (e.g., degrees or access counts) of each node type.
+        Only the nodes with positive scores are selected.
+    row_bytes : dict of int
+        The number of bytes of the features of a node of each node type.
+    cache_size : int
+        The memory budget in bytes.
+
+    Returns
+    -------
+    dict of Tensors : the sorted IDs of the selected nodes of each node type.
+    """
+    ntypes = [ntype for ntype in candidates if len(candidates[ntype][0]) > 0]
+    if len(ntypes) == 0:
+        return {}
+    ids = th.cat([candidates[ntype][0] for ntype in ntypes])
+    scores = th.cat([candidates[ntype][1].to(th.float64) for ntype in ntypes])
+    type_idx = th.cat([th.full((len(candidates[ntype][0]),), i, dtype=th.int64) \
+            for i, ntype in enumerate(ntypes)])
+    sizes = th.tensor([row_bytes[ntype] for ntype in ntypes], dtype=th.int64)[type_idx]
+
+    order = th.argsort(scores, descending=True, stable=True)
+    order = order[scores[order] > 0]
+    num_selected = int(th.searchsorted(th.cumsum(sizes[order], 0),
+                                       th.tensor(cache_size, dtype=th.int64), right=True))
+    selected = order[:num_selected]
+    return {ntype: th.sort(ids[selected][type_idx[selected] == i])[0] \
+            for i, ntype in enumerate(ntypes)}
+
+class NodeFeatCache():
+    """ The cache of the features of remote nodes in a trainer process.
+
+    Pulling node features from other machines dominates the cost of preparing mini-batches.
+    On power-law graphs, a small number of hub nodes appear in most sampled subgraphs, so
+    the cache keeps a local copy of their features. A lookup serves the cached nodes
+    locally and pulls the features of all the other nodes in one request.
+
+    The cached nodes are selected with one of the policies:
+
+    * "degree": the remote nodes with the most edges to the nodes of the local partition.
+      They are the remote nodes sampled most often from the local seed nodes.
+    * "frequency": the remote nodes accessed most often in the first `num_warmup_batches`
+      mini-batches. The cache is filled after the warm-up.
+
+    Parameters
+    ----------
+    g : DistGraph
+        The distributed graph.
+    feat_names : dict of list of str
+        The names of the features of each node type. The features of a node type are
+        concatenated.
+    cache_size : float
+        The memory budget of the cache in MB.
+    policy : str
+        The policy of selecting the cached nodes: "degree" or "frequency".
+    num_warmup_batches : int
+        The number of mini-batches whose accesses are counted by the "frequency" policy.
+    """
+    def __init__(self, g, feat_names, cache_size, policy="degree", num_warmup_batches=100):
+        assert cache_size > 0, "The size of the feature cache has to be positive."
+        assert policy in ("degree", "frequency"), \
+                "The policy of the feature cache can only be 'degree' or 'frequency'."
+        self._g = g
+        self._feat_names = feat_names
+        self._cache_size = int(cache_size * 1024 * 1024)
+        self._policy = policy
+        self._num_warmup_batches = num_warmup_batches
+        self._num_batches = 0
+        self._accessed = {ntype: [] for ntype in feat_names}
+        self._ids = {ntype: th.zeros(0, dtype=th.int64) for ntype in feat_names}
+        self._feats = {ntype: None for ntype in feat_names}
+        self._num_hits = {ntype: 0 for ntype in feat_names}
+        self._num_lookups = {ntype: 0 for ntype in feat_names}
+        if policy == "degree":
+            self.fill(select_cached_nodes(self._get_remote_degrees(), self._get_row_bytes(),
+                                          self._cache_size))
+
+    def __contains__(self, ntype):
+        return ntype in self._feat_names
+
+    def _get_row_bytes(self):
+        """ Get the number of bytes of the features of a node of each node type.
+        """
+        row_bytes = {}
+        for ntype, names in self._feat_names.items():
+            data = [self._g.nodes[ntype].data[name] for name in names]
+            dtype = data[0].dtype
+            for feat in data[1:]:
+                dtype = th.promote_types(dtype, feat.dtype)
+            num_cols = sum(int(th.tensor(feat.shape[1:]).prod()) for feat in data)
+            row_bytes[ntype] = num_cols * th.tensor([], dtype=dtype).element_size()
+        return row_bytes
+
+    def _get_remote_degrees(self):
+        """ Get the remote nodes and their numbers of edges to the local partition.
+
+        The local partition stores the in-edges of the local nodes, so the remote
+        nodes in the partition are the neighbors of the local nodes.
+        """
+        local_g = self._g.local_partition
+        gpb = self._g.get_partition_book()
+        remote = th.nonzero(local_g.ndata['inner_node'] == 0, as_tuple=True)[0]
+        degs = local_g.out_degrees(remote)
+        ntype_ids, type_nids = gpb.map_to_per_ntype(local_g.ndata[dgl.NID][remote])
+        candidates = {}
+        for ntype_id, ntype in enumerate(gpb.ntypes):
+            if ntype in self._feat_names:
+                mask = ntype_ids == ntype_id
+                candidates[ntype] = (type_nids[mask], degs[mask])
+        return candidates
+
+    def _pull(self, ntype, nid):
+        """ Pull the features of nodes from the distributed graph.
+        """
+        return th.cat([self._g.nodes[ntype].data[name][nid] \
+                for name in self._feat_names[ntype]], dim=1)
+
+    def fill(self, node_ids):
+        """ Fill the cache with the features of the nodes.
+
+        Parameters
+        ----------
+        node_ids : dict of Tensors
+            The IDs of the cached nodes of each node type.
+        """
+        for ntype, nid in node_ids.items():
+            assert ntype in self._feat_names, \
+                    "Node type {} doesn't have features.".format(ntype)
+            nid = th.sort(nid)[0]
+            if len(nid) == 0:
+                continue
+            self._ids[ntype] = nid
+            self._feats[ntype] = th.cat([self._pull(ntype, nid[i:i + FILL_CHUNK_SIZE]) \
+                    for i in range(0, len(nid), FILL_CHUNK_SIZE)])
+
+    def _record(self, input_nodes):
+        """ Record the remote nodes accessed in the warm-up of the "frequency" policy.
+        """
+        gpb = self._g.get_partition_book()
+        for ntype, nid in input_nodes.items():
+            if ntype in self._feat_names:
+                self._accessed[ntype].append(nid[gpb.nid2partid(nid, ntype) != gpb.partid])
+        self._num_batches += 1
+        if self._num_batches == self._num_warmup_batches:
+            candidates = {}
+            for ntype, accessed in self._accessed.items():
+                if len(accessed) > 0:
+                    candidates[ntype] = th.unique(th.cat(accessed), return_counts=True)
+            self._accessed = {}
+            self.fill(select_cached_nodes(candidates, self._get_row_bytes(), self._cache_size))
+
+    def _lookup(self, ntype, nid):
+        """ Get the features of the nodes of a node type.
+        """
+        ids = self._ids[ntype]
+        self._num_lookups[ntype] += len(nid)
+        if len(ids) == 0:
+            return self._pull(ntype, nid)
+        pos = th.clamp(th.searchsorted(ids, nid), max=len(ids) - 1)
+        hit = ids[pos] == nid
+        num_hits = int(hit.sum())
+        self._num_hits[ntype] += num_hits
+        if num_hits == len(nid):
+            return self._feats[ntype][pos]
+        elif num_hits == 0:
+            return self._pull(ntype, nid)
+        miss = ~hit
+        miss_feats = self._pull(ntype, nid[miss])
+        feats = th.empty((len(nid),) + miss_feats.shape[1:], dtype=miss_feats.dtype)
+        feats[hit] = self._feats[ntype][pos[hit]].to(miss_feats.dtype)
+        feats[miss] = miss_feats
+        return feats
+
+    def fetch(self, input_nodes):
+        """ Get the features of the input nodes of a mini-batch.
+
+        Parameters
+        ----------
+        input_nodes : dict of Tensors
+            The input nodes of each node type.
+
+        Returns
+        -------
+        dict of Tensors : the features of the node types with features.
+        """
+        if self._policy == "frequency" and self._num_batches < self._num_warmup_batches:
+            self._record(input_nodes)
+        return {ntype: self._lookup(ntype, nid) for ntype, nid in input_nodes.items() \
+                if ntype in self._feat_names}
+
+    @property
+    def num_cached_nodes(self):
+        """ The number of cached nodes of each node type.
+        """
+        return {ntype: len(ids) for ntype, ids in self._ids.items()}
+
+    @property
+    def hit_rates(self):
+        """ The fraction of the looked-up nodes served by the cache for each node type.
+        """
+        return {ntype: self._num_hits[ntype] / self._num_lookups[ntype] \
+                for ntype in self._feat_names if self._num_lookups[ntype] > 0}
+
+    def reset_stats(self):
+        """ Reset the counters of the hit rates.
+        """
+        self._num_hits = {ntype: 0 for ntype in self._feat_names}
+        self._num_lookups = {ntype: 0 for ntype in self._feat_names}
+
+    def __str__(self):
+        return ", ".join("{}: {} cached, hit rate {:.3f}".format(
+            ntype, len(self._ids[ntype]), self._num_hits[ntype] / self._num_lookups[ntype]) \
+                for ntype in self._feat_names if self._num_lookups[ntype] > 0)
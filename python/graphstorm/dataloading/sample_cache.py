@@ -0,0 +1,206 @@
+"""
+    Copyright 2023 Contributors
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+
+    The cache of sampled mini-batches that are replayed in later epochs.
+"""
+import os
+import pickle
+
+import torch as th
+import dgl
+
+class _PackedGraph():
+    """ The compact form of a sampled graph or block.
+
+    Only the CSC arrays of every edge type and the node and edge data
+    (e.g., the original node and edge IDs) are kept.
+    """
+    def __init__(self, g):
+        self.is_block = g.is_block
+        self.adj = {etype: g.adj_tensors('csc', etype) for etype in g.canonical_etypes}
+        self.edata = {etype: dict(g.edges[etype].data) for etype in g.canonical_etypes}
+        if g.is_block:
+            self.num_nodes = ({ntype: g.num_src_nodes(ntype) for ntype in g.srctypes},
+                              {ntype: g.num_dst_nodes(ntype) for ntype in g.dsttypes})
+            self.ndata = ({ntype: dict(g.srcnodes[ntype].data) for ntype in g.srctypes},
+                          {ntype: dict(g.dstnodes[ntype].data) for ntype in g.dsttypes})
+        else:
+            self.num_nodes = {ntype: g.num_nodes(ntype) for ntype in g.ntypes}
+            self.ndata = {ntype: dict(g.nodes[ntype].data) for ntype in g.ntypes}
+
+    def unpack(self):
+        """ Rebuild the graph or block.
+        """
+        data_dict = {etype: ('csc', adj) for etype, adj in self.adj.items()}
+        if self.is_block:
+            g = dgl.create_block(data_dict, num_src_nodes=self.num_nodes[0],
+                                 num_dst_nodes=self.num_nodes[1])
+            for ntype, data in self.ndata[0].items():
+                g.srcnodes[ntype].data.update(data)
+            for ntype, data in self.ndata[1].items():
+                g.dstnodes[ntype].data.update(data)
+        else:
+            g = dgl.heterograph(data_dict, self.num_nodes)
+            for ntype, data in self.ndata.items():
+                g.nodes[ntype].data.update(data)
+        for etype, data in self.edata.items():
+            g.edges[etype].data.update(data)
+        return g
+
+def pack_batch(batch):
+    """ Convert the graphs and blocks in a mini-batch to their compact form.
+
+    Parameters
+    ----------
+    batch : tuple
+        The mini-batch returned by a DGL dataloader. It can contain tensors,
+        graphs, blocks and the lists, tuples and dicts of them.
+
+    Returns
+    -------
+    the packed mini-batch with the same structure.
+    """
+    if isinstance(batch, dgl.DGLGraph):
+        return _PackedGraph(batch)
+    elif isinstance(batch, (tuple, list)):
+        return type(batch)(pack_batch(val) for val in batch)
+    elif isinstance(batch, dict):
+        return {key: pack_batch(val) for key, val in batch.items()}
+    else:
+        return batch
+
+def unpack_batch(batch):
+    """ Rebuild a mini-batch packed by `pack_batch`.
+
+    Parameters
+    ----------
+    batch : tuple
+        The packed mini-batch.
+
+    Returns
+    -------
+    the mini-batch.
+    """
+    if isinstance(batch, _PackedGraph):
+        return batch.unpack()
+    elif isinstance(batch, (tuple, list)):
+        return type(batch)(unpack_batch(val) for val in batch)
+    elif isinstance(batch, dict):
+        return {key: unpack_batch(val) for key, val in batch.items()}
+    else:
+        return batch
+
+class SampleCache():
+    """ The cache of the sampled mini-batches of a training dataloader.
+
+    Sampling the multi-layer neighborhoods through RPCs can cost as much as the
+    forward and backward pass. The cache records the mini-batches of the first
+    `num_variants` epochs as different variants of the sampled neighborhoods of
+    the seeds. The later epochs replay one of the variants in a random order
+    instead of sampling again. A variant is sampled again once it's older than
+    `refresh_epochs` epochs.
+
+    Parameters
+    ----------
+    num_variants : int
+        The number of sampled variants of the mini-batches.
+    refresh_epochs : int
+        The number of epochs after which a variant is sampled again.
+        0 means the variants are never sampled again.
+    cache_path : str
+        The folder where the mini-batches are saved. If it's None, the mini-batches
+        are kept in memory. The memory isn't bounded: it holds `num_variants` epochs
+        of sampled blocks, so a large number of variants should be saved on the disk.
+    shuffle : bool
+        Whether to replay the mini-batches in a random order. Otherwise, they are
+        replayed in the order they were sampled.
+    """
+    def __init__(self, num_variants, refresh_epochs=0, cache_path=None, shuffle=True):
+        assert num_variants > 0, "The number of sampled variants has to be positive."
+        assert refresh_epochs >= 0, "The refresh interval cannot be negative."
+        self._num_variants = num_variants
+        self._refresh_epochs = refresh_epochs
+        self._cache_path = cache_path
+        self._shuffle = shuffle
+        self._variants = [None] * num_variants
+        self._sampled_epochs = [None] * num_variants
+        self._epoch = 0
+
+    def _needs_sampling(self, slot, epoch):
+        """ Whether the variant has to be sampled in the epoch.
+        """
+        if self._variants[slot] is None:
+            return True
+        return self._refresh_epochs > 0 and \
+                epoch - self._sampled_epochs[slot] >= self._refresh_epochs
+
+    def _store(self, slot, idx, batch):
+        """ Store a mini-batch of a variant.
+        """
+        batch = pack_batch(batch)
+        if self._cache_path is None:
+            return batch
+        path = os.path.join(self._cache_path, str(slot), "{}.pkl".format(idx))
+        with open(path, "wb") as f:
+            pickle.dump(batch, f)
+        return path
+
+    def _load(self, batch):
+        """ Load a stored mini-batch.
+        """
+        if self._cache_path is not None:
+            with open(batch, "rb") as f:
+                batch = pickle.load(f)
+        return unpack_batch(batch)
+
+    def _record(self, batch_iter, slot, epoch):
+        """ Sample the mini-batches of a variant and store them.
+        """
+        if self._cache_path is not None:
+            os.makedirs(os.path.join(self._cache_path, str(slot)), exist_ok=True)
+        batches = []
+        for batch in batch_iter:
+            batches.append(self._store(slot, len(batches), batch))
+            yield batch
+        # Only a variant of a complete epoch is kept.
+        self._variants[slot] = batches
+        self._sampled_epochs[slot] = epoch
+
+    def _replay(self, slot):
+        """ Replay the mini-batches of a variant.
+        """
+        batches = self._variants[slot]
+        order = th.randperm(len(batches)).tolist() if self._shuffle else range(len(batches))
+        for idx in order:
+            yield self._load(batches[idx])
+
+    def epoch_iter(self, dataloader):
+        """ Get the iterator of the mini-batches of an epoch.
+
+        Parameters
+        ----------
+        dataloader : DGL dataloader
+            The dataloader that samples the mini-batches.
+
+        Returns
+        -------
+        iterator : the iterator of the mini-batches.
+        """
+        epoch = self._epoch
+        slot = epoch % self._num_variants
+        self._epoch += 1
+        if self._needs_sampling(slot, epoch):
+            return self._record(iter(dataloader), slot, epoch)
+        return self._replay(slot)
@@ -18,6 +18,7 @@
 from collections.abc import Mapping
 import torch as th
 import numpy as np
+import dgl
 from dgl import backend as F
 from dgl.distributed import node_split
 from dgl.dataloading.negative_sampler import Uniform
@@ -210,3 +211,221 @@ class JointUniform(object):
             pos_neg_tuple = _gen_neg_pair(pos_pairs,
                 g.canonical_etypes[0][0], g.canonical_etypes[0][2])
         return pos_neg_tuple
+
+def build_alias_table(weights):
+    """ Build the alias table of a discrete distribution.
+
+    The table is built with a vectorized version of Vose's algorithm. In every round,
+    the deficits of all the entries whose probabilities are smaller than the average
+    are filled by the entries whose probabilities are larger than the average.
+    An entry that is drained below the average is filled in the next round.
+
+    Parameters
+    ----------
+    weights : Tensor
+        The non-negative weights of the entries.
+
+    Returns
+    -------
+    tuple of Tensors : the probability of keeping an entry and the alias of the entry.
+    """
+    weights = weights.to(th.float64)
+    assert th.all(weights >= 0), "The weights of the alias table have to be non-negative."
+    num = len(weights)
+    total = weights.sum()
+    prob = weights * num / total if total > 0 else th.ones(num, dtype=th.float64)
+    alias = th.arange(num)
+    small = th.nonzero(prob < 1, as_tuple=True)[0]
+    large = th.nonzero(prob >= 1, as_tuple=True)[0]
+    while len(small) > 0 and len(large) > 0:
+        # Assign every small entry to the large entry whose surplus covers
+        # the start of its deficit.
+        deficit = 1 - prob[small]
+        start = th.cumsum(deficit, 0) - deficit
+        surplus_end = th.cumsum(prob[large] - 1, 0)
+        assigned = start < surplus_end[-1]
+        owner = th.searchsorted(surplus_end, start[assigned], right=True)
+        alias[small[assigned]] = large[owner]
+        prob[large] -= th.zeros(len(large), dtype=th.float64).index_add_(
+            0, owner, deficit[assigned])
+        drained = prob[large] < 1
+        small = th.cat([small[~assigned], large[drained]])
+        large = large[~drained]
+        if not th.any(assigned):
+            break
+    # The remaining entries only differ from the average by rounding errors.
+    prob[small] = 1
+    prob[large] = 1
+    return prob.to(th.float32), alias
+
+def sample_alias_table(prob, alias, num):
+    """ Draw samples from the distribution of an alias table in O(1) time per sample.
+
+    Parameters
+    ----------
+    prob : Tensor
+        The probability of keeping an entry.
+    alias : Tensor
+        The alias of an entry.
+    num : int
+        The number of samples.
+
+    Returns
+    -------
+    Tensor : the indices of the sampled entries.
+    """
+    idx = th.randint(len(prob), (num,))
+    keep = th.rand(num) < prob[idx]
+    return th.where(keep, idx, alias[idx])
+
+class _EdgeNegativeSampler(object):
+    """The base class of the negative samplers that corrupt every edge type
+    of a mini-batch separately with `_generate`.
+
+    Parameters
+    ----------
+    k : int
+        The number of negative examples per edge.
+    """
+    def __init__(self, k):
+        self.k = k
+
+    def _generate(self, g, eids, canonical_etype):
+        raise NotImplementedError()
+
+    def __call__(self, g, eids):
+        """Returns negative examples.
+
+        Parameters
+        ----------
+        g : DistGraph
+            The graph.
+        eids : Tensor or dict[etype, Tensor]
+            The sampled edges in the minibatch.
+
+        Returns
+        -------
+        tuple[Tensor, Tensor] or dict[etype, tuple[Tensor, Tensor]]
+            The returned source-destination pairs as negative examples.
+        """
+        if isinstance(eids, Mapping):
+            eids = {g.to_canonical_etype(k): v for k, v in eids.items()}
+            neg_pair = {k: self._generate(g, v, k) for k, v in eids.items()}
+        else:
+            assert len(g.canonical_etypes) == 1, \
+                'please specify a dict of etypes and ids for graphs with multiple edge types'
+            neg_pair = self._generate(g, eids, g.canonical_etypes[0])
+
+        return neg_pair
+
+class LocalDegree(_EdgeNegativeSampler):
+    """Negative sampler that chooses negative destination nodes from the local
+    partition with probabilities proportional to the powers of their degrees.
+
+    For each edge ``(u, v)`` of type ``(srctype, etype, dsttype)``, it generates
+    :attr:`k` pairs of negative edges ``(u, v')``, where ``v'`` is a node of type
+    ``dsttype`` in the local partition chosen with the probability proportional to
+    ``deg(v') ** exponent``. ``deg(v')`` is the number of in-edges of ``v'`` of
+    all edge types. Popular nodes are harder negatives than uniformly sampled nodes.
+
+    The alias tables of the node types are built once by `build_alias_tables`,
+    so sampling a negative node takes O(1) time. The table of a node type that isn't
+    built in advance is built when the node type is first corrupted.
+
+    Parameters
+    ----------
+    k : int
+        The number of negative examples per edge.
+    exponent : float
+        The exponent of the degrees.
+    """
+    def __init__(self, k, exponent=0.75):
+        super(LocalDegree, self).__init__(k)
+        self._exponent = exponent
+        self._alias_tables = {}
+
+    def build_alias_tables(self, g, ntypes):
+        """ Build the alias tables of the local nodes of the node types.
+
+        Parameters
+        ----------
+        g : DistGraph
+            The graph.
+        ntypes : list of str
+            The node types whose nodes are sampled as negative nodes.
+        """
+        ntypes = [ntype for ntype in ntypes if ntype not in self._alias_tables]
+        if len(ntypes) == 0:
+            return
+        local_g = g.local_partition
+        gpb = g.get_partition_book()
+        inner = th.nonzero(local_g.ndata['inner_node'] != 0, as_tuple=True)[0]
+        ntype_ids, type_nids = gpb.map_to_per_ntype(local_g.ndata[dgl.NID][inner])
+        for ntype in ntypes:
+            mask = ntype_ids == gpb.ntypes.index(ntype)
+            degs = local_g.in_degrees(inner[mask]).to(th.float64)
+            prob, alias = build_alias_table(degs ** self._exponent)
+            self._alias_tables[ntype] = (type_nids[mask], prob, alias)
+
+    def _get_alias_table(self, g, vtype):
+        """ Get the local nodes of a node type and their alias table.
+        """
+        self.build_alias_tables(g, [vtype])
+        return self._alias_tables[vtype]
+
+    def _sample_nodes(self, g, vtype, num, dtype):
+        """ Sample nodes of a node type from the local partition.
+        """
+        nids, prob, alias = self._get_alias_table(g, vtype)
+        return nids[sample_alias_table(prob, alias, num)].to(dtype)
+
+    def _generate(self, g, eids, canonical_etype):
+        _, _, vtype = canonical_etype
+        src, _ = g.find_edges(eids, etype=canonical_etype)
+        src = th.repeat_interleave(src, self.k)
+        dst = self._sample_nodes(g, vtype, len(src), src.dtype)
+        return src, dst
+
+class JointLocalDegree(LocalDegree):
+    """Negative sampler that jointly corrupts a group of edges with the nodes
+    chosen by `LocalDegree`.
+
+    Like `JointUniform`, the sampled nodes are shared by all edges of an edge type
+    in a mini-batch, which reduces the number of nodes in a mini-batch.
+
+    Parameters
+    ----------
+    k : int
+        The number of negative examples per edge.
+    exponent : float
+        The exponent of the degrees.
+    """
+    def _generate(self, g, eids, canonical_etype):
+        _, _, vtype = canonical_etype
+        src, _ = g.find_edges(eids, etype=canonical_etype)
+        dst = self._sample_nodes(g, vtype, len(src), src.dtype)
+        return th.repeat_interleave(src, self.k), dst.repeat(self.k)
+
+class InBatch(_EdgeNegativeSampler):
+    """Negative sampler that corrupts the edges of a mini-batch with the destination
+    nodes of the other edges of the same edge type in the mini-batch.
+
+    The negative edges only connect the nodes that are already in the mini-batch,
+    so no extra nodes are sampled and no extra node features are fetched.
+    An edge type with a single edge in the mini-batch gets no negative edges.
+
+    Parameters
+    ----------
+    k : int
+        The number of negative examples per edge.
+    """
+    def _generate(self, g, eids, canonical_etype):
+        src, dst = g.find_edges(eids, etype=canonical_etype)
+        num_edges = len(dst)
+        if num_edges < 2:
+            # There are no other edges, so there are no negative edges.
+            return src[:0], dst[:0]
+        src_idx = th.arange(num_edges).repeat_interleave(self.k)
+        # Shift the index by [1, num_edges) to skip the destination of the edge itself.
+        dst_idx = (src_idx + th.randint(1, num_edges, (len(src_idx),))) % num_edges
+        return src[src_idx], dst[dst_idx]
@@ -15,8 +15,10 @@
 
     Utils for data loading.
 """
+import numpy as np
 import torch as th
 import torch.distributed as dist
+from dgl.distributed import DistTensor
 
 def trim_data(nids, device):
     """ In distributed traning scenario, we need to make sure that
@@ -68,6 +70,208 @@ def dist_sum(size):
     dist.all_reduce(size, dist.ReduceOp.SUM)
     return int(size.cpu())
 
+def dist_all_gather_size(size):
+    """ Gather the sizes from all processes.
+
+    Parameters
+    ----------
+    size : int
+        The size in the local process
+
+    Returns
+    -------
+    list of int : the sizes of all processes ordered by their ranks.
+    """
+    # NCCL backend only supports GPU tensors.
+    if dist.get_backend() == "nccl":
+        dev = th.device(th.cuda.current_device())
+    else:
+        dev = th.device("cpu")
+    sizes = [th.zeros((1,), dtype=th.int64, device=dev) for _ in range(dist.get_world_size())]
+    dist.all_gather(sizes, th.tensor([size], dtype=th.int64, device=dev))
+    return [int(size) for size in sizes]
+
+def _split_in_part(num, num_trainers_per_part):
+    """ Get the number of local targets of each trainer in a partition.
+
+    The targets of a partition are split into contiguous chunks and the last
+    trainer gets the remainder, which is the same as DGL's local split.
+    """
+    sizes = np.full((num_trainers_per_part,), num // num_trainers_per_part, dtype=np.int64)
+    sizes[-1] += num % num_trainers_per_part
+    return sizes
+
+def get_local_first_plan(part_sizes, num_trainers_per_part):
+    """ Plan a split of targets that keeps the data locality and balances the workloads.
+
+    Every trainer first takes the targets in its own partition, split evenly with
+    the other trainers of the partition. Then the trainers with more targets than
+    the even share hand over the remainder, in the order of their ranks, to the
+    trainers with fewer targets. Every trainer gets `total // num_trainers` targets,
+    so that all trainers run the same number of mini-batches, and the last
+    `total % num_trainers` targets are dropped.
+
+    The trainers of a partition have contiguous ranks.
+
+    Parameters
+    ----------
+    part_sizes : list of int
+        The number of targets in each partition.
+    num_trainers_per_part : int
+        The number of trainers of a partition.
+
+    Returns
+    -------
+    list of lists : for each trainer, the list of (rank, start, end), which means
+    that the trainer takes the slice [start, end) of the local targets of the trainer
+    with the rank.
+    """
+    local_sizes = np.concatenate([_split_in_part(num, num_trainers_per_part) \
+            for num in part_sizes])
+    num_trainers = len(local_sizes)
+    total = int(np.sum(local_sizes))
+    even_sizes = np.full((num_trainers,), total // num_trainers, dtype=np.int64)
+    keep = np.minimum(local_sizes, even_sizes)
+    surplus_end = np.cumsum(local_sizes - keep)
+    surplus_start = surplus_end - (local_sizes - keep)
+    deficit_end = np.cumsum(even_sizes - keep)
+    deficit_start = deficit_end - (even_sizes - keep)
+
+    plan = []
+    for rank in range(num_trainers):
+        slices = [(rank, 0, int(keep[rank]))] if keep[rank] > 0 else []
+        if deficit_end[rank] > deficit_start[rank]:
+            # The trainers whose surplus overlaps the deficit of the trainer.
+            start = np.maximum(surplus_start, deficit_start[rank])
+            end = np.minimum(surplus_end, deficit_end[rank])
+            for src in np.nonzero(end > start)[0]:
+                offset = keep[src] - surplus_start[src]
+                slices.append((int(src), int(start[src] + offset), int(end[src] + offset)))
+        plan.append(slices)
+    return plan
+
+def get_part_targets(partition_book, part_id, mask=None, ntype=None, etype=None):
+    """ Get the target nodes or edges in a partition.
+
+    The masks of the local partition are read directly from the local shard of
+    the distributed tensor and the targets are extracted with one `nonzero`.
+    The shard stores the rows of the nodes or edges of the partition in the order
+    of their IDs. The masks of the other partitions are pulled from the servers.
+
+    Parameters
+    ----------
+    partition_book : GraphPartitionBook
+        The graph partition book.
+    part_id : int
+        The partition ID.
+    mask : 1D tensor or DistTensor
+        The mask that indicates the targets. If it's None, all nodes or edges of
+        the type in the partition are the targets.
+    ntype : str
+        The node type of the targets.
+    etype : tuple of str
+        The edge type of the targets.
+
+    Returns
+    -------
+    Tensor : the sorted IDs of the targets.
+    """
+    assert (ntype is None) != (etype is None), "Either ntype or etype has to be provided."
+    if ntype is not None:
+        ids = partition_book.partid2nids(part_id, ntype)
+    else:
+        ids = partition_book.partid2eids(part_id, etype)
+    if mask is None:
+        return ids
+    local_mask = mask.local_partition if isinstance(mask, DistTensor) \
+            and part_id == partition_book.partid else None
+    if local_mask is not None and len(local_mask) == len(ids):
+        return ids[th.nonzero(local_mask, as_tuple=True)[0]]
+    return ids[th.nonzero(mask[ids], as_tuple=True)[0]]
+
+def _all_gather_ids(ids):
+    """ Gather the ID tensors of different sizes from all processes.
+
+    Parameters
+    ----------
+    ids : Tensor
+        The IDs in the local process.
+
+    Returns
+    -------
+    list of Tensors : the IDs of all processes ordered by their ranks.
+    """
+    sizes = dist_all_gather_size(len(ids))
+    if max(sizes) == 0:
+        return [ids[:0] for _ in sizes]
+    # NCCL backend only supports GPU tensors.
+    if dist.get_backend() == "nccl":
+        dev = th.device(th.cuda.current_device())
+    else:
+        dev = th.device("cpu")
+    padded = th.zeros((max(sizes),), dtype=ids.dtype, device=dev)
+    padded[:len(ids)] = ids.to(dev)
+    gathered = [th.zeros_like(padded) for _ in sizes]
+    dist.all_gather(gathered, padded)
+    return [data[:size].cpu() for data, size in zip(gathered, sizes)]
+
+def split_local_first(partition_book, mask=None, ntype=None, etype=None):
+    """ Split the target nodes or edges to the trainers with the data locality.
+
+    Each trainer gets the targets in its own partition first, so that most of
+    the sampling and feature fetching is local. Only the remainder is moved to
+    the trainers of the partitions with fewer targets to balance the workloads.
+    Every trainer only reads the mask of its own partition and the moved targets
+    are exchanged with an all_gather. See `get_local_first_plan` for the details.
+
+    Parameters
+    ----------
+    partition_book : GraphPartitionBook
+        The graph partition book.
+    mask : 1D tensor or DistTensor
+        The mask that indicates the targets. If it's None, all nodes or edges of
+        the type are the targets.
+    ntype : str
+        The node type of the targets.
+    etype : tuple of str
+        The edge type of the targets.
+
+    Returns
+    -------
+    Tensor : the IDs of the targets of the local trainer.
+    """
+    assert (ntype is None) != (etype is None), "Either ntype or etype has to be provided."
+    rank = dist.get_rank()
+    num_parts = partition_book.num_partitions()
+    assert dist.get_world_size() % num_parts == 0, \
+            "The total number of trainers should be multiple of the number of partitions."
+    num_trainers_per_part = dist.get_world_size() // num_parts
+    assert partition_book.partid == rank // num_trainers_per_part, \
+            "The trainers of a partition should have contiguous ranks."
+
+    part_targets = get_part_targets(partition_book, partition_book.partid, mask, ntype, etype)
+    part_sizes = dist_all_gather_size(len(part_targets))[::num_trainers_per_part]
+    local_sizes = np.concatenate([_split_in_part(num, num_trainers_per_part) \
+            for num in part_sizes])
+    offset = int(np.sum(local_sizes[rank - rank % num_trainers_per_part:rank]))
+    local_targets = part_targets[offset:offset + int(local_sizes[rank])]
+
+    plans = get_local_first_plan(part_sizes, num_trainers_per_part)
+    # The targets a trainer keeps come first in its plan.
+    keep = [slices[0][2] if len(slices) > 0 and slices[0][0] == src else 0 \
+            for src, slices in enumerate(plans)]
+    surplus = _all_gather_ids(local_targets[keep[rank]:])
+    targets = [local_targets[start:end] if src == rank \
+            else surplus[src][start - keep[src]:end - keep[src]] \
+            for src, start, end in plans[rank]]
+    num_local = sum(end - start for src, start, end in plans[rank] \
+            if src // num_trainers_per_part == partition_book.partid)
+    print("Rank {} gets {} targets and {} of them are local.".format(
+        rank, sum(len(ids) for ids in targets), num_local))
+    if len(targets) == 0:
+        return th.zeros((0,), dtype=th.int64)
+    return th.cat(targets)
+
 def modify_fanout_for_target_etype(g, fanout, target_etypes):
     """ This function specifies a zero fanout for the target etype
         removing this etype from the message passing graph
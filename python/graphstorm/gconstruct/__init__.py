@@ -21,3 +21,4 @@ from .construct_graph import write_data_parquet
 from .construct_graph import parse_feat_ops
 from .construct_graph import process_features
 from .construct_graph import process_labels
+from .id_map import IdMap
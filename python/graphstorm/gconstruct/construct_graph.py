@@ -17,56 +17,241 @@
     node regression, edge classification and edge regression.
 """
 
-import multiprocessing
-from multiprocessing import Process
 import glob
 import os
 import json
 import argparse
+import tempfile
+from functools import partial
 import pyarrow.parquet as pq
+import pyarrow.csv as pacsv
+import pyarrow.json as pajson
 import pyarrow as pa
 import numpy as np
 
-from transformers import BertTokenizer
+from transformers import AutoTokenizer
 import torch as th
 import dgl
 
+from .id_map import IdMap
+from .partition import write_dist_partitions
+from .transform import parse_transform, TwoPhaseTransform
+from .utils import save_worker_result, load_worker_result, concat_arrays, WorkerPool
+from .utils import get_cache_key, load_cached_result, save_cached_result, fingerprint_array
+
 ##################### The I/O functions ####################
 
-def read_data_parquet(data_file):
+def _arrow_to_numpy(arr):
+    """ Convert an Arrow array to a Numpy array.
+
+    A multi-dimension array is stored as a list column in Parquet.
+    Because all rows of the column have the same length, we can take
+    the flattened values as one contiguous buffer and reshape it to
+    a matrix without converting each row separately.
+
+    Parameters
+    ----------
+    arr : Arrow Array or ChunkedArray
+        The Arrow data.
+
+    Returns
+    -------
+    Numpy array : the data in Numpy.
+    """
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    if pa.types.is_fixed_size_list(arr.type):
+        dim = arr.type.list_size
+        vals = _arrow_to_numpy(arr.flatten())
+        return vals.reshape(len(arr), dim)
+    elif pa.types.is_list(arr.type) or pa.types.is_large_list(arr.type):
+        # The data written by old versions are stored as variable-length lists.
+        offsets = arr.offsets.to_numpy()
+        lens = offsets[1:] - offsets[:-1]
+        if len(lens) > 0:
+            assert np.all(lens == lens[0]), \
+                    "All rows of a multi-dimension array need to have the same length."
+        dim = lens[0] if len(lens) > 0 else 0
+        vals = _arrow_to_numpy(arr.flatten())
+        return vals.reshape(len(arr), dim)
+    else:
+        return arr.to_numpy(zero_copy_only=False)
+
+def read_data_parquet(data_file, data_fields=None):
     """ Read data from the parquet file.
 
-    A row of a multi-dimension data is stored as an object in Parquet.
-    We need to stack them to form a tensor.
+    A multi-dimension array is stored as a list column in Parquet.
+    It is read into a Numpy matrix directly from the Arrow buffers.
 
     Parameters
     ----------
     data_file : str
         The parquet file that contains the data
+    data_fields : list of str
+        The columns to read from the file. If it's None, all columns are read.
 
     Returns
     -------
     dict : map from data name to data.
     """
-    table = pq.read_table(data_file)
-    data = {}
-    for key, val in table.to_pandas().items():
-        d = np.array(val)
-        # For multi-dimension arrays, we split them by rows and
-        # save them as objects in parquet. We need to merge them
-        # together and store them in a tensor.
-        if d.dtype.hasobject:
-            d = [d[i] for i in range(len(d))]
-            d = np.stack(d)
-        data[key] = d
-    return data
+    table = pq.read_table(data_file, columns=data_fields)
+    return _table_to_dict(table)
+
+def _table_to_dict(table):
+    """ Convert an Arrow table or record batch to a dict of Numpy arrays.
+    """
+    return {key: _arrow_to_numpy(table.column(i)) \
+            for i, key in enumerate(table.schema.names)}
+
+def _iter_table_chunks(batches, schema, chunk_size):
+    """ Regroup Arrow record batches into chunks of `chunk_size` rows.
+
+    Parameters
+    ----------
+    batches : iterable of Arrow RecordBatch
+        The record batches read from a file.
+    schema : Arrow Schema
+        The schema of the record batches.
+    chunk_size : int
+        The number of rows in a chunk.
+
+    Returns
+    -------
+    generator of dict : each dict maps from data name to the data of a chunk.
+    """
+    buf = []
+    num_rows = 0
+    num_chunks = 0
+    for batch in batches:
+        buf.append(batch)
+        num_rows += batch.num_rows
+        while num_rows >= chunk_size:
+            table = pa.Table.from_batches(buf, schema=schema)
+            yield _table_to_dict(table.slice(0, chunk_size))
+            num_chunks += 1
+            table = table.slice(chunk_size)
+            buf = table.to_batches()
+            num_rows = table.num_rows
+    # An empty file still generates an empty chunk.
+    if num_rows > 0 or num_chunks == 0:
+        yield _table_to_dict(pa.Table.from_batches(buf, schema=schema))
+
+def _parse_schema(schema):
+    """ Parse the declared column types, e.g., {"id": "int64", "text": "string"}.
+    """
+    if schema is None:
+        return None
+    return {key: pa.type_for_alias(val) for key, val in schema.items()}
+
+def read_data_parquet_chunks(data_file, data_fields=None, chunk_size=None):
+    """ Read data from the parquet file chunk by chunk.
+
+    The file is read in record batches of `chunk_size` rows so that
+    the entire file does not need to be loaded in memory.
+
+    Parameters
+    ----------
+    data_file : str
+        The parquet file that contains the data
+    data_fields : list of str
+        The columns to read from the file. If it's None, all columns are read.
+    chunk_size : int
+        The number of rows in a chunk. If it's None, the whole file is read as one chunk.
+
+    Returns
+    -------
+    generator of dict : each dict maps from data name to the data of a chunk.
+    """
+    if chunk_size is None:
+        yield read_data_parquet(data_file, data_fields)
+        return
+    pq_file = pq.ParquetFile(data_file)
+    if pq_file.metadata.num_rows == 0:
+        yield read_data_parquet(data_file, data_fields)
+        return
+    for batch in pq_file.iter_batches(batch_size=chunk_size, columns=data_fields):
+        yield {key: _arrow_to_numpy(batch.column(i)) \
+                for i, key in enumerate(batch.schema.names)}
+
+def read_data_csv_chunks(data_file, data_fields=None, chunk_size=None,
+                         separator=",", schema=None):
+    """ Read data from a CSV file chunk by chunk.
+
+    The file is parsed by Arrow's multithreaded CSV reader. If `chunk_size` is
+    provided, the file is streamed block by block and the entire file does not need
+    to be loaded in memory.
+
+    Parameters
+    ----------
+    data_file : str
+        The CSV file that contains the data.
+    data_fields : list of str
+        The columns to read from the file. If it's None, all columns are read.
+    chunk_size : int
+        The number of rows in a chunk. If it's None, the whole file is read as one chunk.
+    separator : str
+        The separator of the columns.
+    schema : dict of str
+        The data types of the columns. The types of the other columns are inferred.
+
+    Returns
+    -------
+    generator of dict : each dict maps from data name to the data of a chunk.
+    """
+    read_options = pacsv.ReadOptions(use_threads=True)
+    parse_options = pacsv.ParseOptions(delimiter=separator)
+    convert_options = pacsv.ConvertOptions(column_types=_parse_schema(schema),
+                                           include_columns=data_fields)
+    if chunk_size is None:
+        yield _table_to_dict(pacsv.read_csv(data_file, read_options=read_options,
+                                            parse_options=parse_options,
+                                            convert_options=convert_options))
+        return
+    reader = pacsv.open_csv(data_file, read_options=read_options,
+                            parse_options=parse_options, convert_options=convert_options)
+    yield from _iter_table_chunks(reader, reader.schema, chunk_size)
+
+def read_data_json_chunks(data_file, data_fields=None, chunk_size=None, schema=None):
+    """ Read data from a file of newline-delimited JSON objects chunk by chunk.
+
+    The file is parsed by Arrow's multithreaded JSON reader. Arrow doesn't provide
+    a streaming JSON reader, so the file is parsed as a whole and is then
+    processed chunk by chunk.
+
+    Parameters
+    ----------
+    data_file : str
+        The JSON file that contains the data.
+    data_fields : list of str
+        The columns to read from the file. If it's None, all columns are read.
+    chunk_size : int
+        The number of rows in a chunk. If it's None, the whole file is read as one chunk.
+    schema : dict of str
+        The data types of the columns. The types of the other columns are inferred.
+
+    Returns
+    -------
+    generator of dict : each dict maps from data name to the data of a chunk.
+    """
+    schema = _parse_schema(schema)
+    parse_options = pajson.ParseOptions(
+        explicit_schema=pa.schema(list(schema.items())) if schema is not None else None)
+    table = pajson.read_json(data_file, read_options=pajson.ReadOptions(use_threads=True),
+                             parse_options=parse_options)
+    if data_fields is not None:
+        table = table.select(data_fields)
+    if chunk_size is None:
+        yield _table_to_dict(table)
+        return
+    yield from _iter_table_chunks(table.to_batches(max_chunksize=chunk_size),
+                                  table.schema, chunk_size)
 
 def write_data_parquet(data, data_file):
     """ Write data in parquet files.
 
     Normally, Parquet cannot support multi-dimension arrays.
-    This function splits a multi-dimensiion array into N arrays
-    (each row is an array) and store the arrays as objects in the parquet file.
+    This function stores a matrix as a fixed-size list column whose values
+    are the contiguous buffer of the matrix.
 
     Parameters
     ----------
@@ -83,7 +268,8 @@ def write_data_parquet(data, data_file):
         if len(arr.shape) == 1:
             arr_dict[key] = arr
         else:
-            arr_dict[key] = [arr[i] for i in range(len(arr))]
+            vals = pa.array(np.ascontiguousarray(arr).reshape(-1))
+            arr_dict[key] = pa.FixedSizeListArray.from_arrays(vals, arr.shape[1])
     table = pa.Table.from_arrays(list(arr_dict.values()), names=list(arr_dict.keys()))
     pq.write_table(table, data_file)
 
@@ -94,10 +280,21 @@ def parse_file_format(fmt):
     ----------
     fmt : dict
         Describe the file format.
+
+    Returns
+    -------
+    callable : the function that reads a file chunk by chunk.
     """
     assert 'name' in fmt, "'name' field must be defined in the format."
     if fmt["name"] == "parquet":
-        return read_data_parquet
+        return read_data_parquet_chunks
+    elif fmt["name"] == "csv":
+        separator = fmt["separator"] if "separator" in fmt else ","
+        schema = fmt["schema"] if "schema" in fmt else None
+        return partial(read_data_csv_chunks, separator=separator, schema=schema)
+    elif fmt["name"] == "json":
+        schema = fmt["schema"] if "schema" in fmt else None
+        return partial(read_data_json_chunks, schema=schema)
     else:
         raise ValueError('Unknown file format: {}'.format(fmt['name']))
 
@@ -106,17 +303,39 @@ def parse_file_format(fmt):
 class Tokenizer:
     """ A wrapper to a tokenizer.
 
-    It is defined to process multiple strings.
+    It is defined to process multiple strings. The strings are tokenized
+    in batches with a fast (Rust-backed) HuggingFace tokenizer.
+
+    If `compact` is True, the tokenizer returns the token IDs and the number
+    of valid tokens of each string in `valid_len` instead of the full attention
+    masks and token type IDs. The attention masks are rebuilt from `valid_len`
+    during the forward pass.
 
     Parameters
     ----------
     tokenizer : a tokenizer
     max_seq_length : int
         The maximal length of the tokenization results.
+    batch_size : int
+        The number of strings tokenized together.
+    token_dtype : Numpy dtype
+        The data type of the token IDs. If it's None, the token IDs are stored in int64.
+    compact : bool
+        Whether to store the valid token length instead of the attention masks.
     """
-    def __init__(self, tokenizer, max_seq_length):
+    def __init__(self, tokenizer, max_seq_length, batch_size=1024,
+                 token_dtype=None, compact=False):
         self.tokenizer = tokenizer
         self.max_seq_length = max_seq_length
+        self.batch_size = batch_size
+        self.token_dtype = np.dtype(token_dtype) if token_dtype is not None \
+                else np.dtype(np.int64)
+        assert self.token_dtype in (np.int16, np.int32, np.int64), \
+                "The token IDs can only be stored in int16, int32 or int64."
+        if len(tokenizer) - 1 > np.iinfo(self.token_dtype).max:
+            raise ValueError("The vocabulary size {} of the tokenizer ".format(len(tokenizer)) \
+                    + "does not fit in {}.".format(self.token_dtype))
+        self.compact = compact
 
     def __call__(self, strs):
         """ Tokenization function.
@@ -130,24 +349,40 @@ class Tokenizer:
         -------
         a dict of tokenization results.
         """
-        tokens = []
-        att_masks = []
-        type_ids = []
-        for s in strs:
-            t = self.tokenizer(s, max_length=self.max_seq_length,
-                               truncation=True, padding='max_length', return_tensors='pt')
-            tokens.append(t['input_ids'])
-            att_masks.append(t['attention_mask'])
-            type_ids.append(t['token_type_ids'])
-        return {'token_ids': th.cat(tokens, dim=0),
-                'attention_mask': th.cat(att_masks, dim=0),
-                'token_type_ids': th.cat(type_ids, dim=0)}
+        num_strs = len(strs)
+        token_ids = np.zeros((num_strs, self.max_seq_length), dtype=self.token_dtype)
+        # The valid length is at most max_seq_length.
+        len_dtype = np.int16 if self.max_seq_length <= np.iinfo(np.int16).max else np.int32
+        valid_len = np.zeros(num_strs, dtype=len_dtype)
+        if not self.compact:
+            att_masks = np.zeros((num_strs, self.max_seq_length), dtype=np.int64)
+            type_ids = np.zeros((num_strs, self.max_seq_length), dtype=np.int64)
+        for start in range(0, num_strs, self.batch_size):
+            end = min(start + self.batch_size, num_strs)
+            batch = [str(s) for s in strs[start:end]]
+            t = self.tokenizer(batch, max_length=self.max_seq_length,
+                               truncation=True, padding='max_length', return_tensors='np')
+            token_ids[start:end] = t['input_ids']
+            valid_len[start:end] = t['attention_mask'].sum(axis=1)
+            if not self.compact:
+                att_masks[start:end] = t['attention_mask']
+                # Some tokenizers, e.g., RoBERTa and DistilBERT, don't return
+                # token type IDs, so they stay zeros.
+                if 'token_type_ids' in t:
+                    type_ids[start:end] = t['token_type_ids']
+        if self.compact:
+            return {'token_ids': th.from_numpy(token_ids),
+                    'valid_len': th.from_numpy(valid_len)}
+        return {'token_ids': th.from_numpy(token_ids),
+                'attention_mask': th.from_numpy(att_masks),
+                'token_type_ids': th.from_numpy(type_ids)}
 
 def parse_tokenize(op):
     """ Parse the tokenization configuration
 
     The parser returns a function that tokenizes text with HuggingFace tokenizer.
-    The tokenization function returns a dict of three Pytorch tensors.
+    By default, the tokenization function returns a dict of three Pytorch tensors.
+    If "compact" is true, it returns the token IDs and the valid token lengths.
 
     Parameters
     ----------
@@ -158,9 +393,13 @@ def parse_tokenize(op):
     -------
     callable : a function to process the data.
     """
-    tokenizer = BertTokenizer.from_pretrained(op['bert_model'])
+    tokenizer = AutoTokenizer.from_pretrained(op['bert_model'], use_fast=True)
     max_seq_length = int(op['max_seq_length'])
-    return Tokenizer(tokenizer, max_seq_length)
+    batch_size = int(op['batch_size']) if 'batch_size' in op else 1024
+    token_dtype = op['token_dtype'] if 'token_dtype' in op else None
+    compact = op['compact'] if 'compact' in op else False
+    return Tokenizer(tokenizer, max_seq_length, batch_size=batch_size,
+                     token_dtype=token_dtype, compact=compact)
 
 def parse_feat_ops(confs):
     """ Parse the configurations for processing the features
@@ -186,8 +425,7 @@ def parse_feat_ops(confs):
     assert isinstance(confs, list), \
             "The feature configurations need to be in a list."
     for feat in confs:
-        # TODO(zhengda) we will support data type in the future.
-        dtype = None
+        dtype = np.dtype(feat['data_type']) if 'data_type' in feat else None
         if 'transform' not in feat:
             transform = None
         else:
@@ -197,10 +435,16 @@ def parse_feat_ops(confs):
             if transform['name'] == 'tokenize_hf':
                 transform = parse_tokenize(transform)
             else:
-                raise ValueError('Unknown operation: {}'.format(transform['name']))
-        feat_name = feat['feature_name'] if 'feature_name' in feat else None
+                name = transform['name']
+                transform = parse_transform(transform)
+                if transform is None:
+                    raise ValueError('Unknown operation: {}'.format(name))
         assert 'feature_col' in feat, \
                 "'feature_col' must be defined in a feature field."
+        feat_name = feat['feature_name'] if 'feature_name' in feat else None
+        if feat_name is None and isinstance(feat['feature_col'], str) \
+                and not isinstance(transform, Tokenizer):
+            feat_name = feat['feature_col']
         ops.append((feat['feature_col'], feat_name, dtype, transform))
     return ops
 
@@ -227,22 +471,71 @@ def process_features(data, ops):
     """
     new_data = {}
     for feat_col, feat_name, dtype, op in ops:
+        # Multiple columns are stacked into a matrix.
+        feat_data = np.column_stack([data[col] for col in feat_col]) \
+                if isinstance(feat_col, list) else data[feat_col]
+        # If the transformation depends on the statistics of all input files,
+        # we keep the original data and transform them after the statistics
+        # of all files are merged.
+        if isinstance(op, TwoPhaseTransform) and not op.has_stats:
+            new_data[feat_name] = feat_data
         # If the transformation is defined on the feature.
-        if op is not None:
-            res = op(data[feat_col])
+        elif op is not None:
+            res = op(feat_data)
             if isinstance(res, dict):
                 for key, val in res.items():
                     new_data[key] = val
             else:
-                new_data[feat_name] = res
+                new_data[feat_name] = res.astype(dtype) if dtype is not None else res
         # If the required data type is defined on the feature.
         elif dtype is not None:
-            new_data[feat_name] = data[feat_col].astype(dtype)
+            new_data[feat_name] = feat_data.astype(dtype)
         # If no transformation is defined for the feature.
         else:
-            new_data[feat_name] = data[feat_col]
+            new_data[feat_name] = feat_data
     return new_data
 
+def collect_feat_stats(data, ops):
+    """ Compute the statistics of the features required by the transformations.
+
+    Parameters
+    ----------
+    data : dict of lists
+        The chunks of the features returned by `process_features`.
+    ops : list of tuples
+        The operations.
+
+    Returns
+    -------
+    dict : the key is the feature name, the value is the statistics of the feature.
+    """
+    stats = {}
+    for _, feat_name, _, op in ops:
+        if isinstance(op, TwoPhaseTransform) and not op.has_stats:
+            stats[feat_name] = op.merge_stats([op.collect_stats(chunk) \
+                    for chunk in data[feat_name]])
+    return stats
+
+def apply_feat_stats(type_data, type_stats, ops):
+    """ Merge the statistics of the input files and transform the features with them.
+
+    Parameters
+    ----------
+    type_data : dict of lists
+        The chunks of the features of all input files of a node/edge type.
+    type_stats : list of dicts
+        The statistics of the features of every input file.
+    ops : list of tuples
+        The operations.
+    """
+    for _, feat_name, dtype, op in ops:
+        if not isinstance(op, TwoPhaseTransform) or op.has_stats:
+            continue
+        op.set_stats(op.merge_stats([stats[feat_name] for stats in type_stats]))
+        for i, data in enumerate(type_data[feat_name]):
+            data = op(data)
+            type_data[feat_name][i] = data.astype(dtype) if dtype is not None else data
+
 def process_labels(data, label_confs):
     """ Process labels
 
@@ -286,32 +579,6 @@ def process_labels(data, label_confs):
 
 ################### The functions for multiprocessing ###############
 
-def wait_process(processes, max_proc):
-    """ Wait for a process
-
-    Parameters
-    ----------
-    processes : list of process
-        The list of processes
-    max_proc : int
-        The maximal number of processes to process the data together.
-    """
-    if len(processes) < max_proc:
-        return
-    processes[0].join()
-    processes.pop(0)
-
-def wait_all(processes):
-    """ Wait for all processes
-
-    Parameters
-    ----------
-    processes : list of processes
-        The list of processes
-    """
-    for proc in processes:
-        proc.join()
-
 def get_in_files(in_files):
     """ Get the input files.
 
@@ -334,19 +601,51 @@ def get_in_files(in_files):
     in_files.sort()
     return in_files
 
-def parse_node_data(file_idx, in_file, feat_ops, node_id_col, label_conf,
-                    read_file, return_dict):
+def _get_data_fields(id_cols, feat_ops, label_conf):
+    """ Get the columns that need to be read from an input file.
+    """
+    fields = list(id_cols)
+    if feat_ops is not None:
+        for feat_col, _, _, _ in feat_ops:
+            fields += feat_col if isinstance(feat_col, list) else [feat_col]
+    if label_conf is not None:
+        for conf in label_conf:
+            if 'label_col' in conf:
+                fields.append(conf['label_col'])
+    # Remove duplicated columns and keep the order.
+    return list(dict.fromkeys(fields))
+
+def _group_chunks(chunks):
+    """ Turn the data parsed from the chunks of a file into a list of chunks per name.
+
+    The chunks aren't concatenated here. They are concatenated only once with
+    the chunks of other files when the data of a node/edge type are written,
+    so the processed data of a file don't need to be copied into a single array.
+
+    Parameters
+    ----------
+    chunks : list of dict
+        The data of each chunk.
+
+    Returns
+    -------
+    dict of lists : the chunks of each data name.
+    """
+    data = {}
+    for chunk in chunks:
+        for key, val in chunk.items():
+            data.setdefault(key, []).append(val)
+    return data
+
+def parse_node_data(in_file, feat_ops, node_id_col, label_conf, read_file, chunk_size=None):
     """ Parse node data.
 
     The function parses a node file that contains node IDs, features and labels
     The node file is parsed according to users' configuration
-    and performs some feature transformation and save the result in
-    `return_dict`.
+    and performs some feature transformation.
 
     Parameters
     ----------
-    file_idx : int
-        The index of the node file among all node files.
     in_file : str
         The path of the input node file.
     feat_ops : dict
@@ -356,31 +655,44 @@ def parse_node_data(file_idx, in_file, feat_ops, node_id_col, label_conf,
     label_conf : dict
         The configuration of labels.
     read_file : callable
-        The function to read the node file
-    return_dict : dict
-        The dictionary that is shared among all processes and saves the parsed node data.
+        The function to read the node file chunk by chunk.
+    chunk_size : int
+        The number of rows processed together. If it's None, the whole file is
+        processed together.
+
+    Returns
+    -------
+    tuple : the chunks of the node IDs and a dict of the chunks of node data.
     """
-    data = read_file(in_file)
-    feat_data = process_features(data, feat_ops) if feat_ops is not None else {}
+    data_fields = _get_data_fields([node_id_col], feat_ops, label_conf)
+    node_ids = []
+    feat_chunks = []
+    label_chunks = []
+    for data in read_file(in_file, data_fields, chunk_size):
+        node_ids.append(data[node_id_col])
+        feat_chunks.append(process_features(data, feat_ops) if feat_ops is not None else {})
+        if label_conf is not None:
+            label_chunks.append({conf['label_col']: data[conf['label_col']] \
+                    for conf in label_conf})
+    feat_data = _group_chunks(feat_chunks)
+    # The data split is computed on the labels of the whole file.
     if label_conf is not None:
-        label_data = process_labels(data, label_conf)
-        for key, val in label_data.items():
-            feat_data[key] = val
-    return_dict[file_idx] = (data[node_id_col], feat_data)
-
-def parse_edge_data(file_idx, in_file, feat_ops, src_id_col, dst_id_col, edge_type,
-                    node_id_map, label_conf, read_file, return_dict):
+        label_data = {key: np.concatenate(val) \
+                for key, val in _group_chunks(label_chunks).items()}
+        for key, val in process_labels(label_data, label_conf).items():
+            feat_data[key] = [val]
+    return (node_ids, feat_data)
+
+def parse_edge_data(in_file, feat_ops, src_id_col, dst_id_col, edge_type,
+                    node_id_map, label_conf, read_file, chunk_size=None):
     """ Parse edge data.
 
     The function parses an edge file that contains the source and destination node
     IDs, edge features and potentially edge labels. The edge file is parsed
-    according to users' configuration and performs some feature transformation
-    and save the result in `return_dict`.
+    according to users' configuration and performs some feature transformation.
 
     Parameters
     ----------
-    file_idx : int
-        The index of the edge file among all edge files.
     in_file : str
         The path of the input edge file.
     feat_ops : dict
@@ -391,36 +703,215 @@ def parse_edge_data(file_idx, in_file, feat_ops, src_id_col, dst_id_col, edge_ty
         The column name that contains the destination node ID.
     edge_type : tuple
         The tuple that contains source node type, relation type and destination node type.
-    node_id_map : dict
+    node_id_map : dict of IdMap
         Contains the ID mapping for every node type.
     label_conf : dict
         The configuration of labels.
     read_file : callable
-        The function to read the node file
-    return_dict : dict
-        The dictionary that is shared among all processes and saves the parsed edge data.
+        The function to read the edge file chunk by chunk.
+    chunk_size : int
+        The number of rows processed together. If it's None, the whole file is
+        processed together.
+
+    Returns
+    -------
+    tuple : the chunks of the source node IDs, the chunks of the destination node IDs
+    and a dict of the chunks of edge data.
     """
-    data = read_file(in_file)
-    feat_data = process_features(data, feat_ops) if feat_ops is not None else {}
-    if label_conf is not None:
-        label_data = process_labels(data, label_conf)
-        for key, val in label_data.items():
-            feat_data[key] = val
-    src_ids = data[src_id_col]
-    dst_ids = data[dst_id_col]
     assert node_id_map is not None
     src_type, _, dst_type = edge_type
-    if src_type in node_id_map:
-        src_ids = np.array([node_id_map[src_type][sid] for sid in src_ids])
-    else:
-        assert np.issubdtype(src_ids.dtype, np.integer), \
-                "The source node Ids have to be integer."
-    if dst_type in node_id_map:
-        dst_ids = np.array([node_id_map[dst_type][did] for did in dst_ids])
-    else:
-        assert np.issubdtype(dst_ids.dtype, np.integer), \
-                "The destination node Ids have to be integer."
-    return_dict[file_idx] = (src_ids, dst_ids, feat_data)
+    data_fields = _get_data_fields([src_id_col, dst_id_col], feat_ops, label_conf)
+    src_chunks = []
+    dst_chunks = []
+    feat_chunks = []
+    label_chunks = []
+    for data in read_file(in_file, data_fields, chunk_size):
+        feat_chunks.append(process_features(data, feat_ops) if feat_ops is not None else {})
+        if label_conf is not None:
+            label_chunks.append({conf['label_col']: data[conf['label_col']] \
+                    for conf in label_conf})
+        src_ids = data[src_id_col]
+        dst_ids = data[dst_id_col]
+        if src_type in node_id_map:
+            src_ids = node_id_map[src_type].map_id(src_ids)
+        else:
+            assert np.issubdtype(src_ids.dtype, np.integer), \
+                    "The source node Ids have to be integer."
+        if dst_type in node_id_map:
+            dst_ids = node_id_map[dst_type].map_id(dst_ids)
+        else:
+            assert np.issubdtype(dst_ids.dtype, np.integer), \
+                    "The destination node Ids have to be integer."
+        src_chunks.append(src_ids)
+        dst_chunks.append(dst_ids)
+    feat_data = _group_chunks(feat_chunks)
+    # The data split is computed on the labels of the whole file.
+    if label_conf is not None:
+        label_data = {key: np.concatenate(val) \
+                for key, val in _group_chunks(label_chunks).items()}
+        for key, val in process_labels(label_data, label_conf).items():
+            feat_data[key] = [val]
+    return (src_chunks, dst_chunks, feat_data)
+
+# The states cached in a worker process, e.g., feature operations and ID maps.
+# They are loaded once and reused by all files processed by the worker process.
+_worker_states = {}
+
+def _get_feat_ops(feat_confs):
+    """ Get the feature operations in a worker process.
+
+    Parsing the feature configurations may load a tokenizer, so the parsed
+    operations are cached and reused for the following files.
+    """
+    if feat_confs is None:
+        return None
+    key = "feat_ops:" + json.dumps(feat_confs, sort_keys=True)
+    if key not in _worker_states:
+        _worker_states[key] = parse_feat_ops(feat_confs)
+    return _worker_states[key]
+
+def _get_id_maps(id_map_paths):
+    """ Get the ID maps saved on the disk in a worker process.
+
+    The ID maps are memory-mapped once and reused for the following files.
+    """
+    id_maps = {}
+    for ntype, path in id_map_paths.items():
+        key = "id_map:" + path
+        if key not in _worker_states:
+            _worker_states[key] = IdMap.load(path)
+        id_maps[ntype] = _worker_states[key]
+    return id_maps
+
+def parse_node_file(in_file, out_dir, process_conf, chunk_size):
+    """ Parse a node file in a worker process and save the result.
+
+    Parameters
+    ----------
+    in_file : str
+        The path of the input node file.
+    out_dir : str
+        The folder where the parsed data are saved.
+    process_conf : dict
+        The configuration of the node type.
+    chunk_size : int
+        The number of rows processed together.
+
+    Returns
+    -------
+    tuple : the paths of the saved node IDs, node data and the statistics of node features.
+    """
+    read_file = parse_file_format(process_conf['format'])
+    feat_ops = _get_feat_ops(process_conf.get('features'))
+    label_conf = process_conf.get('labels')
+    node_ids, data = parse_node_data(in_file, feat_ops, process_conf['node_id_col'],
+                                     label_conf, read_file, chunk_size)
+    stats = collect_feat_stats(data, feat_ops) if feat_ops is not None else {}
+    return save_worker_result((node_ids, data, stats), out_dir)
+
+def parse_edge_file(in_file, out_dir, process_conf, id_map_paths, chunk_size):
+    """ Parse an edge file in a worker process and save the result.
+
+    Parameters
+    ----------
+    in_file : str
+        The path of the input edge file.
+    out_dir : str
+        The folder where the parsed data are saved.
+    process_conf : dict
+        The configuration of the edge type.
+    id_map_paths : dict of str
+        The folders where the ID maps of node types are saved.
+    chunk_size : int
+        The number of rows processed together.
+
+    Returns
+    -------
+    tuple : the paths of the saved source node IDs, destination node IDs, edge data
+    and the statistics of edge features.
+    """
+    read_file = parse_file_format(process_conf['format'])
+    feat_ops = _get_feat_ops(process_conf.get('features'))
+    label_conf = process_conf.get('labels')
+    src_ids, dst_ids, data = parse_edge_data(in_file, feat_ops, process_conf['source_id_col'],
+                                             process_conf['dest_id_col'],
+                                             process_conf['relation'],
+                                             _get_id_maps(id_map_paths), label_conf,
+                                             read_file, chunk_size)
+    stats = collect_feat_stats(data, feat_ops) if feat_ops is not None else {}
+    return save_worker_result((src_ids, dst_ids, data, stats), out_dir)
+
+def _get_stats_ops(process_conf):
+    """ Get the feature operations that depend on the statistics of all input files.
+
+    Only these operations are parsed in the main process, so other operations,
+    e.g., tokenizers, aren't loaded.
+    """
+    if 'features' not in process_conf:
+        return []
+    confs = [conf for conf in process_conf['features'] \
+            if 'transform' in conf and conf['transform']['name'] != 'tokenize_hf']
+    return parse_feat_ops(confs)
+
+def _get_cache_conf(process_conf):
+    """ Get the configuration that determines the processed result of an input file.
+
+    The input files of a node/edge type don't change the processed result of a file.
+    """
+    return {key: val for key, val in process_conf.items() if key != 'files'}
+
+def _run_cached_tasks(pool, tasks, cache_dir, get_cache_conf):
+    """ Run the tasks of processing input files and reuse the cached results.
+
+    If the construction cache is enabled, a task saves its result in the cache
+    instead of the workspace. The tasks whose results are already in the cache
+    are skipped.
+
+    Parameters
+    ----------
+    pool : WorkerPool
+        The worker processes that run the tasks.
+    tasks : list of tuples
+        The tasks. The first argument of a task is the input file and
+        the second argument is the output folder.
+    cache_dir : str
+        The folder of the construction cache. If it's None, all tasks run.
+    get_cache_conf : callable
+        The function that returns the configuration of processing the file of a task.
+
+    Returns
+    -------
+    dict : the key is the key of a task and the value is the result of the task.
+    """
+    if cache_dir is None:
+        return pool.run(tasks)
+
+    results = {}
+    cache_keys = {}
+    new_tasks = []
+    for key, in_file, func, args in tasks:
+        cache_key = get_cache_key(in_file, get_cache_conf((key, in_file, func, args)))
+        meta = load_cached_result(cache_dir, cache_key)
+        if meta is not None:
+            results[key] = meta
+        else:
+            cache_keys[key] = cache_key
+            args = (args[0], os.path.join(cache_dir, cache_key)) + args[2:]
+            new_tasks.append((key, in_file, func, args))
+    print("Reuse the cached results of {} files and process {} files".format(
+        len(results), len(new_tasks)))
+    new_results = pool.run(new_tasks)
+    for key, meta in new_results.items():
+        save_cached_result(cache_dir, cache_keys[key], meta)
+    results.update(new_results)
+    return results
+
+def _get_out_file(out_prefix, name):
+    """ Get the Numpy file that stores the processed data in the external memory.
+
+    If `out_prefix` is None, the processed data are stored in memory.
+    """
+    return None if out_prefix is None else out_prefix + name + ".npy"
 
 def create_id_map(ids):
     """ Create ID map
@@ -434,11 +925,12 @@ def create_id_map(ids):
 
     Returns
     -------
-    dict : the key is the original ID and the value is the new ID.
+    IdMap : the map from the original ID to the new ID.
     """
-    return {id1: i for i, id1 in enumerate(ids)}
+    return IdMap(ids)
 
-def process_node_data(process_confs, remap_id, num_processes):
+def process_node_data(process_confs, remap_id, pool, workspace, chunk_size=None,
+                      ext_mem=False, cache_dir=None):
     """ Process node data
 
     We need to process all node data before we can process edge data.
@@ -476,55 +968,68 @@ def process_node_data(process_confs, remap_id, num_processes):
         The configurations to process node data.
     remap_id: bool
         Whether or not to remap node IDs
-    num_processes: int
-        The number of processes to process the input files.
+    pool: WorkerPool
+        The worker processes that process the input files.
+    workspace: str
+        The folder where the worker processes save the parsed data.
+    chunk_size: int
+        The number of rows of an input file processed together.
+        If it's None, a file is processed as a whole.
+    ext_mem: bool
+        Whether to store the processed data in memory-mapped files in the workspace
+        instead of in memory.
+    cache_dir: str
+        The folder of the construction cache. If it's provided, the processed result
+        of an input file is saved in the cache and is reused if neither the file nor
+        its configuration changes.
 
     Returns
     -------
-    dict: node ID map
+    dict of IdMap: node ID map
     dict: node features.
     """
     node_data = {}
     node_id_map = {}
-    for process_conf in process_confs:
-        # each iteration is to process a node type.
+    # The files of all node types are processed by the worker pool together.
+    tasks = []
+    type_files = []
+    for type_idx, process_conf in enumerate(process_confs):
         assert 'node_id_col' in process_conf, \
                 "'node_id_col' must be defined for a node type."
-        node_id_col = process_conf['node_id_col']
         assert 'node_type' in process_conf, \
                 "'node_type' must be defined for a node type"
-        node_type = process_conf['node_type']
         assert 'format' in process_conf, \
                 "'format' must be defined for a node type"
-        read_file = parse_file_format(process_conf['format'])
+        # Check the file format in the main process.
+        parse_file_format(process_conf['format'])
         assert 'files' in process_conf, \
                 "'files' must be defined for a node type"
         in_files = get_in_files(process_conf['files'])
-        feat_ops = parse_feat_ops(process_conf['features']) \
-                if 'features' in process_conf else None
-        label_conf = process_conf['labels'] if 'labels' in process_conf else None
-        processes = []
-        manager = multiprocessing.Manager()
-        return_dict = manager.dict()
+        type_files.append(in_files)
         for i, in_file in enumerate(in_files):
-            proc = Process(target=parse_node_data, args=(i, in_file, feat_ops, node_id_col,
-                                                         label_conf, read_file, return_dict))
-            proc.start()
-            processes.append(proc)
-            wait_process(processes, num_processes)
-        wait_all(processes)
-
-        type_node_id_map = [None] * len(return_dict)
+            out_dir = os.path.join(workspace, "node{}".format(type_idx), str(i))
+            tasks.append(((type_idx, i), in_file, parse_node_file,
+                          (in_file, out_dir, process_conf, chunk_size)))
+    return_dict = _run_cached_tasks(pool, tasks, cache_dir,
+                                    lambda task: ["node", _get_cache_conf(task[3][2])])
+
+    for type_idx, process_conf in enumerate(process_confs):
+        # each iteration is to process a node type.
+        node_type = process_conf['node_type']
+        num_files = len(type_files[type_idx])
+        type_node_id_map = []
         type_node_data = {}
-        for i, (node_ids, data) in return_dict.items():
+        type_stats = [None] * num_files
+        for i in range(num_files):
+            # The parsed chunks are memory-mapped and are only read when the chunks
+            # of all files are concatenated below.
+            node_ids, data, type_stats[i] = load_worker_result(return_dict[(type_idx, i)])
             for feat_name in data:
-                if feat_name not in type_node_data:
-                    type_node_data[feat_name] = [None] * len(return_dict)
-                type_node_data[feat_name][i] = data[feat_name]
-            type_node_id_map[i] = node_ids
+                type_node_data.setdefault(feat_name, []).extend(data[feat_name])
+            type_node_id_map.extend(node_ids)
+        apply_feat_stats(type_node_data, type_stats, _get_stats_ops(process_conf))
 
-        for i, id_map in enumerate(type_node_id_map):
-            assert id_map is not None, f"We do not get ID map in part {i}."
+        assert len(type_node_id_map) > 0, f"We do not get ID map of node type {node_type}."
         type_node_id_map = np.concatenate(type_node_id_map)
         # We don't need to create ID map if the node IDs are integers,
         # all node Ids are in sequence start from 0 and
@@ -538,8 +1043,10 @@ def process_node_data(process_confs, remap_id, num_processes):
             type_node_id_map = create_id_map(type_node_id_map)
             num_nodes = len(type_node_id_map)
 
-        for feat_name in type_node_data:
-            type_node_data[feat_name] = np.concatenate(type_node_data[feat_name])
+        out_prefix = os.path.join(workspace, "node{}_".format(type_idx)) if ext_mem else None
+        for i, feat_name in enumerate(type_node_data):
+            type_node_data[feat_name] = concat_arrays(
+                type_node_data[feat_name], _get_out_file(out_prefix, "data{}".format(i)))
             assert len(type_node_data[feat_name]) == num_nodes
 
         # Some node types don't have data.
@@ -550,7 +1057,8 @@ def process_node_data(process_confs, remap_id, num_processes):
 
     return (node_id_map, node_data)
 
-def process_edge_data(process_confs, node_id_map, num_processes):
+def process_edge_data(process_confs, node_id_map, pool, workspace, chunk_size=None,
+                      ext_mem=False, cache_dir=None):
     """ Process edge data
 
     The edge data of an edge type is defined as follows:
@@ -584,10 +1092,22 @@ def process_edge_data(process_confs, node_id_map, num_processes):
     ----------
     process_confs: list of dicts
         The configurations to process edge data.
-    node_id_map: dict
+    node_id_map: dict of IdMap
         The node ID map.
-    num_processes: int
-        The number of processes to process the input files.
+    pool: WorkerPool
+        The worker processes that process the input files.
+    workspace: str
+        The folder where the worker processes save the parsed data.
+    chunk_size: int
+        The number of rows of an input file processed together.
+        If it's None, a file is processed as a whole.
+    ext_mem: bool
+        Whether to store the processed data in memory-mapped files in the workspace
+        instead of in memory.
+    cache_dir: str
+        The folder of the construction cache. If it's provided, the processed result
+        of an input file is saved in the cache and is reused if neither the file nor
+        its configuration changes.
 
     Returns
     -------
@@ -596,56 +1116,73 @@ def process_edge_data(process_confs, node_id_map, num_processes):
     edges = {}
     edge_data = {}
 
-    for process_conf in process_confs:
-        # each iteration is to process an edge type.
+    # The worker processes were created before the ID maps, so the ID maps
+    # are saved in the workspace and are memory-mapped by the worker processes.
+    id_map_paths = {}
+    for i, (ntype, id_map) in enumerate(node_id_map.items()):
+        id_map_paths[ntype] = os.path.join(workspace, "id_map{}".format(i))
+        id_map.save(id_map_paths[ntype])
+
+    # The files of all edge types are processed by the worker pool together.
+    tasks = []
+    type_files = []
+    for type_idx, process_conf in enumerate(process_confs):
         assert 'source_id_col' in process_conf, \
                 "'source_id_col' is not defined for an edge type."
-        src_id_col = process_conf['source_id_col']
         assert 'dest_id_col' in process_conf, \
                 "'dest_id_col' is not defined for an edge type."
-        dst_id_col = process_conf['dest_id_col']
         assert 'relation' in process_conf, \
                 "'relation' is not defined for an edge type."
-        edge_type = process_conf['relation']
         assert 'format' in process_conf, \
                 "'format' is not defined for an edge type."
-        read_file = parse_file_format(process_conf['format'])
+        # Check the file format in the main process.
+        parse_file_format(process_conf['format'])
         assert 'files' in process_conf, \
                 "'files' is not defined for an edge type."
         in_files = get_in_files(process_conf['files'])
-        feat_ops = parse_feat_ops(process_conf['features']) \
-                if 'features' in process_conf else None
-        label_conf = process_conf['labels'] if 'labels' in process_conf else None
-        processes = []
-        manager = multiprocessing.Manager()
-        return_dict = manager.dict()
+        type_files.append(in_files)
         for i, in_file in enumerate(in_files):
-            proc = Process(target=parse_edge_data, args=(i, in_file, feat_ops,
-                                                         src_id_col, dst_id_col, edge_type,
-                                                         node_id_map, label_conf,
-                                                         read_file, return_dict))
-            proc.start()
-            processes.append(proc)
-            wait_process(processes, num_processes)
-        wait_all(processes)
-
-        type_src_ids = [None] * len(return_dict)
-        type_dst_ids = [None] * len(return_dict)
+            out_dir = os.path.join(workspace, "edge{}".format(type_idx), str(i))
+            tasks.append(((type_idx, i), in_file, parse_edge_file,
+                          (in_file, out_dir, process_conf, id_map_paths, chunk_size)))
+    # The remapped node IDs in the processed edge data depend on the ID maps,
+    # so the edge data are processed again if the ID maps change.
+    id_map_fingerprints = {}
+    if cache_dir is not None:
+        id_map_fingerprints = {ntype: fingerprint_array(id_map.ids) \
+                for ntype, id_map in node_id_map.items()}
+    def _get_edge_cache_conf(task):
+        conf = task[3][2]
+        src_type, _, dst_type = conf['relation']
+        return ["edge", _get_cache_conf(conf), id_map_fingerprints.get(src_type),
+                id_map_fingerprints.get(dst_type)]
+    return_dict = _run_cached_tasks(pool, tasks, cache_dir, _get_edge_cache_conf)
+
+    for type_idx, process_conf in enumerate(process_confs):
+        # each iteration is to process an edge type.
+        edge_type = process_conf['relation']
+        num_files = len(type_files[type_idx])
+        type_src_ids = []
+        type_dst_ids = []
         type_edge_data = {}
-        for i, (src_ids, dst_ids, part_data) in return_dict.items():
-            type_src_ids[i] = src_ids
-            type_dst_ids[i] = dst_ids
+        type_stats = [None] * num_files
+        for i in range(num_files):
+            src_ids, dst_ids, part_data, type_stats[i] = \
+                    load_worker_result(return_dict[(type_idx, i)])
+            type_src_ids.extend(src_ids)
+            type_dst_ids.extend(dst_ids)
             for feat_name in part_data:
-                if feat_name not in type_edge_data:
-                    type_edge_data[feat_name] = [None] * len(return_dict)
-                type_edge_data[feat_name][i] = part_data[feat_name]
+                type_edge_data.setdefault(feat_name, []).extend(part_data[feat_name])
+        apply_feat_stats(type_edge_data, type_stats, _get_stats_ops(process_conf))
 
-        type_src_ids = np.concatenate(type_src_ids)
-        type_dst_ids = np.concatenate(type_dst_ids)
+        out_prefix = os.path.join(workspace, "edge{}_".format(type_idx)) if ext_mem else None
+        type_src_ids = concat_arrays(type_src_ids, _get_out_file(out_prefix, "src"))
+        type_dst_ids = concat_arrays(type_dst_ids, _get_out_file(out_prefix, "dst"))
         assert len(type_src_ids) == len(type_dst_ids)
 
-        for feat_name in type_edge_data:
-            type_edge_data[feat_name] = np.concatenate(type_edge_data[feat_name])
+        for i, feat_name in enumerate(type_edge_data):
+            type_edge_data[feat_name] = concat_arrays(
+                type_edge_data[feat_name], _get_out_file(out_prefix, "data{}".format(i)))
             assert len(type_edge_data[feat_name]) == len(type_src_ids)
 
         edge_type = tuple(edge_type)
@@ -656,15 +1193,9 @@ def process_edge_data(process_confs, node_id_map, num_processes):
 
     return edges, edge_data
 
-def process_graph(args):
-    """ Process the graph.
+def _get_num_nodes(node_id_map, node_data):
+    """ Get the number of nodes of each node type.
     """
-    with open(args.conf_file, 'r', encoding="utf8") as json_file:
-        process_confs = json.load(json_file)
-
-    node_id_map, node_data = process_node_data(process_confs['node'], args.remap_node_id,
-                                               args.num_processes)
-    edges, edge_data = process_edge_data(process_confs['edge'], node_id_map, args.num_processes)
     num_nodes = {}
     for ntype in set(list(node_data.keys()) + list(node_id_map.keys())):
         # If a node type has Id map.
@@ -680,34 +1211,79 @@ def process_graph(args):
         else:
             # A node type must have either ID map or node data.
             raise ValueError('Node type {} must have either ID map or node data'.format(ntype))
-    if args.add_reverse_edges:
-        edges1 = {}
-        for etype in edges:
-            e = edges[etype]
-            assert isinstance(e, tuple) and len(e) == 2
-            assert isinstance(etype, tuple) and len(etype) == 3
-            edges1[etype] = e
-            edges1[etype[2], etype[1] + "-rev", etype[0]] = (e[1], e[0])
-        edges = edges1
-    g = dgl.heterograph(edges, num_nodes_dict=num_nodes)
-    for ntype in node_data:
-        for name, ndata in node_data[ntype].items():
-            g.nodes[ntype].data[name] = th.tensor(ndata)
-    for etype in edge_data:
-        for name, edata in edge_data[etype].items():
-            g.edges[etype].data[name] = th.tensor(edata)
-
-    if args.output_format == "DistDGL":
-        dgl.distributed.partition_graph(g, args.graph_name, args.num_partitions,
-                                        args.output_dir, part_method="None")
-    elif args.output_format == "DGL":
-        dgl.save_graphs(os.path.join(args.output_dir, args.graph_name + ".dgl"), [g])
-    else:
-        raise ValueError('Unknown output format: {}'.format(args.output_format))
-    for ntype in node_id_map:
+    return num_nodes
+
+def process_graph(args):
+    """ Process the graph.
+    """
+    with open(args.conf_file, 'r', encoding="utf8") as json_file:
+        process_confs = json.load(json_file)
+
+    # If the graph is partitioned by the partition writer, the processed data are
+    # kept in the workspace and the whole graph is never constructed in memory.
+    stream_partitions = args.output_format == "DistDGL" and args.part_method != "None"
+    # The worker processes are shared by all node types and edge types.
+    pool = WorkerPool(args.num_processes)
+    with tempfile.TemporaryDirectory(dir=args.tmp_dir) as workspace:
+        node_id_map, node_data = process_node_data(process_confs['node'], args.remap_node_id,
+                                                   pool, workspace, args.chunk_size,
+                                                   ext_mem=stream_partitions,
+                                                   cache_dir=args.cache_dir)
+        edges, edge_data = process_edge_data(process_confs['edge'], node_id_map,
+                                             pool, workspace, args.chunk_size,
+                                             ext_mem=stream_partitions,
+                                             cache_dir=args.cache_dir)
+        pool.close()
+        num_nodes = _get_num_nodes(node_id_map, node_data)
+        if args.add_reverse_edges:
+            edges1 = {}
+            for etype in edges:
+                e = edges[etype]
+                assert isinstance(e, tuple) and len(e) == 2
+                assert isinstance(etype, tuple) and len(etype) == 3
+                edges1[etype] = e
+                edges1[etype[2], etype[1] + "-rev", etype[0]] = (e[1], e[0])
+            edges = edges1
+
+        node_orders = {}
+        if stream_partitions:
+            node_orders = write_dist_partitions(args.graph_name, args.num_partitions,
+                                                args.output_dir, workspace, num_nodes,
+                                                edges, node_data, edge_data,
+                                                part_method=args.part_method,
+                                                buffer_size=args.buffer_size * 1024 * 1024)
+        else:
+            g = dgl.heterograph(edges, num_nodes_dict=num_nodes)
+            for ntype in node_data:
+                for name, ndata in node_data[ntype].items():
+                    g.nodes[ntype].data[name] = th.tensor(ndata)
+            for etype in edge_data:
+                for name, edata in edge_data[etype].items():
+                    g.edges[etype].data[name] = th.tensor(edata)
+
+            if args.output_format == "DistDGL":
+                dgl.distributed.partition_graph(g, args.graph_name, args.num_partitions,
+                                                args.output_dir, part_method="None")
+            elif args.output_format == "DGL":
+                dgl.save_graphs(os.path.join(args.output_dir, args.graph_name + ".dgl"), [g])
+            else:
+                raise ValueError('Unknown output format: {}'.format(args.output_format))
+
+    for ntype in num_nodes:
+        # The partition writer relabels nodes, so the ID map of a node type
+        # is saved if the node IDs are remapped or the nodes are relabeled.
+        order = node_orders.get(ntype)
+        if order is not None and np.all(order == np.arange(len(order))):
+            order = None
+        if ntype not in node_id_map and order is None:
+            continue
         map_data = {}
-        map_data["orig"] = np.array(list(node_id_map[ntype].keys()))
-        map_data["new"] = np.array(list(node_id_map[ntype].values()))
+        if ntype in node_id_map:
+            map_data["orig"] = node_id_map[ntype].ids if order is None \
+                    else node_id_map[ntype].ids[order]
+        else:
+            map_data["orig"] = order
+        map_data["new"] = np.arange(num_nodes[ntype])
         write_data_parquet(map_data, os.path.join(args.output_dir, ntype + "_id_remap.parquet"))
 
 if __name__ == '__main__':
@@ -716,6 +1292,16 @@ if __name__ == '__main__':
                            help="The configuration file.")
     argparser.add_argument("--num_processes", type=int, default=1,
                            help="The number of processes to process the data simulteneously.")
+    argparser.add_argument("--chunk_size", type=int, default=None,
+                           help="The number of rows of an input file processed together. " + \
+                                   "By default, an input file is processed as a whole.")
+    argparser.add_argument("--tmp_dir", type=str, default=None,
+                           help="The folder where the worker processes save the parsed data. " + \
+                                   "By default, the system temporary folder is used.")
+    argparser.add_argument("--cache_dir", type=str, default=None,
+                           help="The folder of the construction cache. The processed " + \
+                                   "results of the input files are saved in the cache and " + \
+                                   "only new or changed files are processed in later runs.")
     argparser.add_argument("--output_dir", type=str, required=True,
                            help="The path of the output data folder.")
     argparser.add_argument("--graph_name", type=str, required=True,
@@ -729,4 +1315,13 @@ if __name__ == '__main__':
     argparser.add_argument("--num_partitions", type=int, default=1,
                            help="The number of graph partitions. " + \
                                    "This is only valid if the output format is DistDGL.")
+    argparser.add_argument("--part_method", type=str, default="None",
+                           choices=["None", "random", "hash"],
+                           help="The method of assigning nodes to partitions. " + \
+                                   "If it's random or hash, the partitions are written " + \
+                                   "directly without constructing the graph in memory. " + \
+                                   "This is only valid if the output format is DistDGL.")
+    argparser.add_argument("--buffer_size", type=int, default=256,
+                           help="The size (MB) of the data processed together " + \
+                                   "when the partitions are written directly.")
     process_graph(argparser.parse_args())
@@ -0,0 +1,160 @@
+"""
+    Copyright 2023 Contributors
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+
+    The ID map used in graph construction.
+"""
+import os
+
+import numpy as np
+
+def _to_array_ids(ids):
+    """ Convert the input IDs to a Numpy array that can be sorted and searched.
+
+    String IDs read from Parquet are stored as Python objects. We convert them
+    to a fixed-width unicode array so that sorting and searching run in C.
+    """
+    ids = np.asarray(ids)
+    if ids.dtype.hasobject:
+        ids = ids.astype(str)
+    return ids
+
+def _id_kind(ids):
+    """ Get the kind of the IDs. Signed and unsigned integers are the same kind.
+    """
+    return 'i' if ids.dtype.kind == 'u' else ids.dtype.kind
+
+class IdMap:
+    """ Map the original node IDs to new node IDs.
+
+    The new ID of a node is its position in the input ID array. Instead of
+    a Python dict, the map keeps the original IDs sorted and looks them up
+    with binary search, so that a whole column of IDs is remapped in one
+    vectorized call. All states are Numpy arrays. They are shared with forked
+    worker processes without copying and can be saved to disk and memory-mapped
+    by other processes.
+
+    Parameters
+    ----------
+    ids : Numpy array
+        The original node IDs.
+    """
+    def __init__(self, ids):
+        ids = _to_array_ids(ids)
+        assert len(ids.shape) == 1, "The node IDs have to be stored in a vector."
+        sorted_idx = np.argsort(ids, kind='stable')
+        sorted_ids = ids[sorted_idx]
+        if len(sorted_ids) > 1:
+            dup = sorted_ids[1:] == sorted_ids[:-1]
+            if np.any(dup):
+                dup_ids = np.unique(sorted_ids[1:][dup])
+                raise ValueError("There are {} duplicated node IDs, e.g., {}.".format(
+                    len(dup_ids), dup_ids[:10]))
+        self._ids = ids
+        self._sorted_ids = sorted_ids
+        self._sorted_idx = sorted_idx
+
+    def __len__(self):
+        return len(self._ids)
+
+    @property
+    def ids(self):
+        """ The original node IDs ordered by the new node IDs.
+        """
+        return self._ids
+
+    def find_ids(self, ids):
+        """ Look up the input IDs in the ID map.
+
+        Parameters
+        ----------
+        ids : Numpy array
+            The original node IDs.
+
+        Returns
+        -------
+        tuple of Numpy arrays : the new node IDs and a boolean mask that indicates
+        whether an input ID exists in the ID map. The new IDs of the input IDs that
+        do not exist in the ID map are undefined.
+        """
+        ids = _to_array_ids(ids)
+        if len(self._sorted_ids) == 0:
+            return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+        # Binary search across different kinds of data, e.g., integers and strings,
+        # either fails or silently finds nothing.
+        assert _id_kind(ids) == _id_kind(self._sorted_ids), \
+                "The IDs of type {} can't be looked up in the ID map of type {}.".format(
+                    ids.dtype, self._sorted_ids.dtype)
+        pos = np.searchsorted(self._sorted_ids, ids)
+        # searchsorted returns len(sorted_ids) for IDs larger than all IDs in the map.
+        pos[pos == len(self._sorted_ids)] = 0
+        found = self._sorted_ids[pos] == ids
+        return self._sorted_idx[pos], found
+
+    def map_id(self, ids):
+        """ Map the original IDs to the new IDs.
+
+        Parameters
+        ----------
+        ids : Numpy array
+            The original node IDs.
+
+        Returns
+        -------
+        Numpy array : the new node IDs.
+        """
+        new_ids, found = self.find_ids(ids)
+        if not np.all(found):
+            unknown = np.unique(_to_array_ids(ids)[~found])
+            raise ValueError("{} IDs do not exist in the ID map, e.g., {}.".format(
+                len(unknown), unknown[:10]))
+        return new_ids
+
+    def save(self, path):
+        """ Save the ID map to a folder.
+
+        The arrays are stored in the Numpy format so that they can be
+        memory-mapped by `IdMap.load`.
+
+        Parameters
+        ----------
+        path : str
+            The folder where the ID map is saved.
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "ids.npy"), self._ids)
+        np.save(os.path.join(path, "sorted_ids.npy"), self._sorted_ids)
+        np.save(os.path.join(path, "sorted_idx.npy"), self._sorted_idx)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """ Load the ID map saved by `IdMap.save`.
+
+        Parameters
+        ----------
+        path : str
+            The folder where the ID map is saved.
+        mmap_mode : str
+            The mode of memory-mapping the arrays. If it's None, the arrays are read
+            into memory.
+
+        Returns
+        -------
+        IdMap : the ID map.
+        """
+        id_map = cls.__new__(cls)
+        id_map._ids = np.load(os.path.join(path, "ids.npy"), mmap_mode=mmap_mode)
+        id_map._sorted_ids = np.load(os.path.join(path, "sorted_ids.npy"), mmap_mode=mmap_mode)
+        id_map._sorted_idx = np.load(os.path.join(path, "sorted_idx.npy"), mmap_mode=mmap_mode)
+        return id_map
@@ -0,0 +1,304 @@
+"""
+    Copyright 2023 Contributors
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+
+    Write the constructed graph into the DistDGL partition format directly.
+"""
+import os
+import json
+import time
+
+import numpy as np
+import torch as th
+import dgl
+
+def _hash_ids(ids):
+    """ A vectorized hash (the finalizer of splitmix64) of integer IDs.
+    """
+    x = ids.astype(np.uint64)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+    return x ^ (x >> np.uint64(31))
+
+def assign_nodes(num_nodes, num_parts, part_method):
+    """ Assign nodes to partitions.
+
+    Parameters
+    ----------
+    num_nodes : dict of int
+        The number of nodes of each node type.
+    num_parts : int
+        The number of partitions.
+    part_method : str
+        "random" assigns nodes to partitions randomly with balanced partition sizes.
+        "hash" assigns nodes to partitions by the hash of their node IDs, so that
+        the assignment is deterministic.
+
+    Returns
+    -------
+    dict of Numpy arrays : the partition ID of each node.
+    """
+    node_parts = {}
+    for ntype in num_nodes:
+        if part_method == "random":
+            parts = np.random.permutation(num_nodes[ntype]) % num_parts
+        elif part_method == "hash":
+            parts = _hash_ids(np.arange(num_nodes[ntype])) % np.uint64(num_parts)
+        else:
+            raise ValueError("Unknown partition method: {}".format(part_method))
+        node_parts[ntype] = parts.astype(np.int32)
+    return node_parts
+
+def _get_num_rows(arr, buffer_size):
+    """ Get the number of rows of an array that fit in the buffer.
+    """
+    row_size = arr.dtype.itemsize * int(np.prod(arr.shape[1:]))
+    return max(1, buffer_size // max(1, row_size))
+
+def _scatter_rows(arr, parts, counts, out_files, buffer_size, map_fn=None):
+    """ Scatter the rows of an array to the partitions on the disk.
+
+    The array is read block by block so that only `buffer_size` bytes of the input
+    array are in memory at any time. The rows of a partition keep their order
+    in the input array.
+
+    Parameters
+    ----------
+    arr : Numpy array
+        The input array. It can be memory-mapped.
+    parts : Numpy array
+        The partition ID of each row.
+    counts : Numpy array
+        The number of rows in each partition.
+    out_files : list of str
+        The Numpy file that stores the rows of each partition.
+    buffer_size : int
+        The number of bytes of the input array read together.
+    map_fn : callable
+        The function applied to a block of the input array before it's written.
+    """
+    outs = []
+    for part_id, out_file in enumerate(out_files):
+        outs.append(np.lib.format.open_memmap(out_file, mode='w+', dtype=arr.dtype,
+                                              shape=(counts[part_id],) + arr.shape[1:]))
+    offsets = np.zeros(len(out_files), dtype=np.int64)
+    num_rows = _get_num_rows(arr, buffer_size)
+    for start in range(0, len(arr), num_rows):
+        block = np.asarray(arr[start:start + num_rows])
+        if map_fn is not None:
+            block = map_fn(block)
+        block_parts = parts[start:start + num_rows]
+        for part_id, out in enumerate(outs):
+            rows = block[block_parts == part_id]
+            out[offsets[part_id]:offsets[part_id] + len(rows)] = rows
+            offsets[part_id] += len(rows)
+    for out in outs:
+        out.flush()
+
+def write_dist_partitions(graph_name, num_parts, output_dir, workspace, num_nodes,
+                          edges, node_data, edge_data, part_method="random",
+                          buffer_size=256 * 1024 * 1024):
+    """ Write the graph into the DistDGL partition format without constructing
+    the whole graph in memory.
+
+    Nodes are assigned to partitions with `part_method` and an edge is assigned to
+    the partition of its destination node. The node/edge data are streamed
+    block by block from the (memory-mapped) input arrays into per-partition files
+    in the workspace, so the peak memory is bounded by the buffer size plus
+    the data of one partition, which is loaded when the partition is saved.
+
+    Nodes and edges are relabeled so that the nodes and edges of a partition have
+    contiguous IDs. The new node ID of a node is its position in the returned order.
+
+    Parameters
+    ----------
+    graph_name : str
+        The graph name.
+    num_parts : int
+        The number of partitions.
+    output_dir : str
+        The folder where the partitions are saved.
+    workspace : str
+        The folder where the intermediate data are saved.
+    num_nodes : dict of int
+        The number of nodes of each node type.
+    edges : dict of tuples
+        The source and destination node IDs of each edge type.
+    node_data : dict of dict
+        The node data of each node type.
+    edge_data : dict of dict
+        The edge data of each edge type.
+    part_method : str
+        The method of assigning nodes to partitions: "random" or "hash".
+    buffer_size : int
+        The number of bytes of the input data processed together.
+
+    Returns
+    -------
+    dict of Numpy arrays : the original node IDs of each node type in the new order.
+    """
+    start = time.time()
+    ntypes = sorted(num_nodes.keys())
+    etypes = sorted(edges.keys())
+    ntype_ids = {ntype: i for i, ntype in enumerate(ntypes)}
+    node_parts = assign_nodes(num_nodes, num_parts, part_method)
+
+    # The nodes are relabeled by their partitions. Within a partition, the nodes
+    # are ordered by node types and then by the original node IDs.
+    node_orders = {}
+    new_node_ids = {}
+    type_offsets = {}
+    part_counts = {}
+    for ntype in ntypes:
+        node_orders[ntype] = np.argsort(node_parts[ntype], kind='stable')
+        new_node_ids[ntype] = np.empty(num_nodes[ntype], dtype=np.int64)
+        new_node_ids[ntype][node_orders[ntype]] = np.arange(num_nodes[ntype])
+        part_counts[ntype] = np.bincount(node_parts[ntype], minlength=num_parts)
+        type_offsets[ntype] = np.concatenate([[0], np.cumsum(part_counts[ntype])])
+    node_map = {ntype: [] for ntype in ntypes}
+    part_node_offsets = np.zeros(num_parts + 1, dtype=np.int64)
+    for part_id in range(num_parts):
+        offset = int(part_node_offsets[part_id])
+        for ntype in ntypes:
+            node_map[ntype].append([offset, offset + int(part_counts[ntype][part_id])])
+            offset += int(part_counts[ntype][part_id])
+        part_node_offsets[part_id + 1] = offset
+    homo_starts = {ntype: np.array([r[0] for r in node_map[ntype]]) for ntype in ntypes}
+    # The node type of a homogeneous node ID is the type of the last ID range
+    # that starts before it.
+    range_starts = [node_map[ntype][part_id][0] \
+            for part_id in range(num_parts) for ntype in ntypes]
+    range_types = np.array([ntype_ids[ntype] \
+            for part_id in range(num_parts) for ntype in ntypes], dtype=np.int32)
+
+    def _to_homo_ids(ntype, ids):
+        # Convert the original per-type node IDs to the new homogeneous node IDs.
+        new_ids = new_node_ids[ntype][ids]
+        part_ids = node_parts[ntype][ids]
+        return homo_starts[ntype][part_ids] + new_ids - type_offsets[ntype][part_ids]
+
+    # An edge belongs to the partition of its destination node.
+    edge_parts = {}
+    edge_counts = {}
+    for etype in etypes:
+        dst_ids = edges[etype][1]
+        parts = np.empty(len(dst_ids), dtype=np.int32)
+        num_rows = _get_num_rows(dst_ids, buffer_size)
+        for i in range(0, len(dst_ids), num_rows):
+            parts[i:i + num_rows] = node_parts[etype[2]][np.asarray(dst_ids[i:i + num_rows])]
+        edge_parts[etype] = parts
+        edge_counts[etype] = np.bincount(parts, minlength=num_parts)
+    edge_map = {etype: [] for etype in etypes}
+    num_edges = 0
+    for part_id in range(num_parts):
+        for etype in etypes:
+            edge_map[etype].append([num_edges, num_edges + int(edge_counts[etype][part_id])])
+            num_edges += int(edge_counts[etype][part_id])
+
+    # Scatter the node/edge data to the partitions.
+    def _part_files(name):
+        return [os.path.join(workspace, "part{}_{}.npy".format(part_id, name)) \
+                for part_id in range(num_parts)]
+    for ntype in node_data:
+        for i, name in enumerate(node_data[ntype]):
+            _scatter_rows(node_data[ntype][name], node_parts[ntype], part_counts[ntype],
+                          _part_files("n{}_{}".format(ntype_ids[ntype], i)), buffer_size)
+    for etype_id, etype in enumerate(etypes):
+        src_ids, dst_ids = edges[etype]
+        _scatter_rows(src_ids, edge_parts[etype], edge_counts[etype],
+                      _part_files("e{}_src".format(etype_id)), buffer_size,
+                      lambda ids, ntype=etype[0]: _to_homo_ids(ntype, ids))
+        _scatter_rows(dst_ids, edge_parts[etype], edge_counts[etype],
+                      _part_files("e{}_dst".format(etype_id)), buffer_size,
+                      lambda ids, ntype=etype[2]: _to_homo_ids(ntype, ids))
+        if etype in edge_data:
+            for i, name in enumerate(edge_data[etype]):
+                _scatter_rows(edge_data[etype][name], edge_parts[etype], edge_counts[etype],
+                              _part_files("e{}_{}".format(etype_id, i)), buffer_size)
+    print("Scatter data to partitions: {:.3f} seconds".format(time.time() - start))
+
+    part_metadata = {
+        "graph_name": graph_name,
+        "num_nodes": int(part_node_offsets[-1]),
+        "num_edges": num_edges,
+        "part_method": part_method,
+        "num_parts": num_parts,
+        "halo_hops": 1,
+        "node_map": node_map,
+        "edge_map": {":".join(etype): edge_map[etype] for etype in etypes},
+        "ntypes": ntype_ids,
+        "etypes": {":".join(etype): i for i, etype in enumerate(etypes)},
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    for part_id in range(num_parts):
+        # Build the partition graph with the in-edges of the nodes in the partition.
+        node_start = part_node_offsets[part_id]
+        num_inner_nodes = part_node_offsets[part_id + 1] - node_start
+        src_ids, dst_ids, edge_types = [], [], []
+        for etype_id, etype in enumerate(etypes):
+            src_ids.append(np.load(_part_files("e{}_src".format(etype_id))[part_id]))
+            dst_ids.append(np.load(_part_files("e{}_dst".format(etype_id))[part_id]))
+            edge_types.append(np.full(len(src_ids[-1]), etype_id, dtype=np.int32))
+        src_ids = np.concatenate(src_ids)
+        dst_ids = np.concatenate(dst_ids)
+        is_inner = (src_ids >= node_start) & (src_ids < node_start + num_inner_nodes)
+        halo_ids = np.unique(src_ids[~is_inner])
+        local_src = np.where(is_inner, src_ids - node_start,
+                             num_inner_nodes + np.searchsorted(halo_ids, src_ids))
+        local_dst = dst_ids - node_start
+        homo_ids = np.concatenate([np.arange(node_start, node_start + num_inner_nodes),
+                                   halo_ids])
+        part_ids = np.searchsorted(part_node_offsets[1:], homo_ids, side='right')
+        node_types = range_types[np.searchsorted(range_starts, homo_ids, side='right') - 1]
+        part = dgl.graph((th.from_numpy(local_src), th.from_numpy(local_dst)),
+                         num_nodes=len(homo_ids))
+        part.ndata[dgl.NID] = th.from_numpy(homo_ids)
+        part.ndata[dgl.NTYPE] = th.from_numpy(node_types)
+        part.ndata['inner_node'] = th.from_numpy((homo_ids < node_start + num_inner_nodes) \
+                & (homo_ids >= node_start)).to(th.uint8)
+        part.ndata['part_id'] = th.from_numpy(part_ids.astype(np.int64))
+        edge_start = edge_map[etypes[0]][part_id][0] if len(etypes) > 0 else 0
+        part.edata[dgl.EID] = th.arange(edge_start, edge_start + len(src_ids))
+        part.edata[dgl.ETYPE] = th.from_numpy(np.concatenate(edge_types))
+        part.edata['inner_edge'] = th.ones(len(src_ids), dtype=th.uint8)
+
+        node_feats = {}
+        for ntype in node_data:
+            for i, name in enumerate(node_data[ntype]):
+                node_feats[ntype + "/" + name] = th.from_numpy(
+                    np.load(_part_files("n{}_{}".format(ntype_ids[ntype], i))[part_id]))
+        edge_feats = {}
+        for etype_id, etype in enumerate(etypes):
+            if etype in edge_data:
+                for i, name in enumerate(edge_data[etype]):
+                    edge_feats[":".join(etype) + "/" + name] = th.from_numpy(
+                        np.load(_part_files("e{}_{}".format(etype_id, i))[part_id]))
+
+        part_dir = os.path.join(output_dir, "part" + str(part_id))
+        os.makedirs(part_dir, exist_ok=True)
+        part_metadata["part-{}".format(part_id)] = {
+            "node_feats": os.path.join("part" + str(part_id), "node_feat.dgl"),
+            "edge_feats": os.path.join("part" + str(part_id), "edge_feat.dgl"),
+            "part_graph": os.path.join("part" + str(part_id), "graph.dgl"),
+        }
+        dgl.data.utils.save_tensors(os.path.join(part_dir, "node_feat.dgl"), node_feats)
+        dgl.data.utils.save_tensors(os.path.join(part_dir, "edge_feat.dgl"), edge_feats)
+        dgl.save_graphs(os.path.join(part_dir, "graph.dgl"), [part])
+        print("Partition {} has {} nodes ({} inner nodes) and {} edges".format(
+            part_id, len(homo_ids), num_inner_nodes, len(src_ids)))
+
+    with open(os.path.join(output_dir, graph_name + ".json"), 'w', encoding="utf8") as outfile:
+        json.dump(part_metadata, outfile, indent=4)
+    print("Write partitions: {:.3f} seconds".format(time.time() - start))
+    return node_orders
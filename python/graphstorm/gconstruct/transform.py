@@ -0,0 +1,305 @@
+"""
+    Copyright 2023 Contributors
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+
+    Vectorized feature transformations used in graph construction.
+"""
+import zlib
+
+import numpy as np
+
+class TwoPhaseTransform:
+    """ The base class of the transformations that depend on statistics of the data.
+
+    The statistics (e.g., min, max or the vocabulary of categories) are computed
+    on every input file by `collect_stats` in the worker processes while the files
+    are parsed. Then the statistics of all files are merged by `merge_stats`
+    and the transformation is applied to the parsed data, so the input files
+    don't need to be read twice.
+
+    If the statistics are provided in the configuration, the transformation
+    is applied directly.
+    """
+    def __init__(self):
+        self._stats = None
+
+    @property
+    def has_stats(self):
+        """ Whether the statistics of the transformation are available.
+        """
+        return self._stats is not None
+
+    def collect_stats(self, data):
+        """ Compute the statistics of a chunk of data.
+
+        Parameters
+        ----------
+        data : Numpy array
+            The input data.
+
+        Returns
+        -------
+        tuple of Numpy arrays : the statistics.
+        """
+        raise NotImplementedError()
+
+    def merge_stats(self, stats):
+        """ Merge the statistics of multiple chunks of data.
+
+        Parameters
+        ----------
+        stats : list of tuples
+            The statistics returned by `collect_stats` or `merge_stats`.
+
+        Returns
+        -------
+        tuple of Numpy arrays : the merged statistics.
+        """
+        raise NotImplementedError()
+
+    def set_stats(self, stats):
+        """ Set the statistics of the whole data.
+
+        Parameters
+        ----------
+        stats : tuple of Numpy arrays
+            The merged statistics.
+        """
+        self._stats = tuple(np.asarray(val) for val in stats)
+
+    def __call__(self, data):
+        raise NotImplementedError()
+
+class MaxMinTransform(TwoPhaseTransform):
+    """ Normalize the data to [0, 1] with the max and min values of each column.
+
+    Parameters
+    ----------
+    max_val : float or list of floats
+        The max value. If it's None, it's computed from the data.
+    min_val : float or list of floats
+        The min value. If it's None, it's computed from the data.
+    """
+    def __init__(self, max_val=None, min_val=None):
+        super(MaxMinTransform, self).__init__()
+        if max_val is not None and min_val is not None:
+            self.set_stats((np.array(max_val, dtype=np.float64),
+                            np.array(min_val, dtype=np.float64)))
+
+    def collect_stats(self, data):
+        data = np.asarray(data, dtype=np.float64)
+        if len(data) == 0:
+            return (np.full(data.shape[1:], -np.inf), np.full(data.shape[1:], np.inf))
+        return (np.nanmax(data, axis=0), np.nanmin(data, axis=0))
+
+    def merge_stats(self, stats):
+        return (np.max(np.stack([stat[0] for stat in stats]), axis=0),
+                np.min(np.stack([stat[1] for stat in stats]), axis=0))
+
+    def __call__(self, data):
+        assert self.has_stats, "The max and min values are not available."
+        max_val, min_val = self._stats
+        scale = max_val - min_val
+        scale = np.where(scale > 0, scale, 1)
+        data = (np.asarray(data, dtype=np.float64) - min_val) / scale
+        return np.clip(data, 0, 1).astype(np.float32)
+
+class StandardTransform(TwoPhaseTransform):
+    """ Normalize the data with the mean and the standard deviation of each column.
+
+    Parameters
+    ----------
+    mean : float or list of floats
+        The mean. If it's None, it's computed from the data.
+    std : float or list of floats
+        The standard deviation. If it's None, it's computed from the data.
+    """
+    def __init__(self, mean=None, std=None):
+        super(StandardTransform, self).__init__()
+        if mean is not None and std is not None:
+            mean = np.array(mean, dtype=np.float64)
+            std = np.array(std, dtype=np.float64)
+            # The statistics are stored as the count, the sum and the sum of squares.
+            self.set_stats((np.array(1.0), mean, std ** 2 + mean ** 2))
+
+    def collect_stats(self, data):
+        data = np.asarray(data, dtype=np.float64)
+        return (np.array(len(data), dtype=np.float64), np.sum(data, axis=0),
+                np.sum(data ** 2, axis=0))
+
+    def merge_stats(self, stats):
+        return (np.sum([stat[0] for stat in stats]),
+                np.sum(np.stack([stat[1] for stat in stats]), axis=0),
+                np.sum(np.stack([stat[2] for stat in stats]), axis=0))
+
+    def __call__(self, data):
+        assert self.has_stats, "The mean and the standard deviation are not available."
+        count, sum_val, sum_sq = self._stats
+        mean = sum_val / count
+        std = np.sqrt(np.maximum(sum_sq / count - mean ** 2, 0))
+        std = np.where(std > 0, std, 1)
+        return ((np.asarray(data, dtype=np.float64) - mean) / std).astype(np.float32)
+
+class CategoricalTransform(TwoPhaseTransform):
+    """ Convert categorical values to category IDs or one-hot vectors.
+
+    The category IDs are the positions of the values in the vocabulary.
+    A vocabulary provided by users keeps its order and a vocabulary collected
+    from the data is sorted. The values that are not in the vocabulary get
+    the ID -1 or an all-zero vector.
+
+    Parameters
+    ----------
+    vocab : list
+        The vocabulary of the categories. If it's None, it's collected from the data.
+    output : str
+        "id" outputs the category IDs and "one_hot" outputs one-hot vectors.
+    """
+    def __init__(self, vocab=None, output="one_hot"):
+        super(CategoricalTransform, self).__init__()
+        assert output in ("id", "one_hot"), \
+                "The output of to_categorical can only be 'id' or 'one_hot'."
+        self.output = output
+        self._order = None
+        if vocab is not None:
+            vocab = _to_array_values(vocab)
+            assert len(np.unique(vocab)) == len(vocab), \
+                    "The vocabulary of to_categorical can't contain duplicated values."
+            self.set_stats((vocab,))
+
+    def collect_stats(self, data):
+        return (np.unique(_to_array_values(data)),)
+
+    def merge_stats(self, stats):
+        return (np.unique(np.concatenate([stat[0] for stat in stats])),)
+
+    def set_stats(self, stats):
+        super(CategoricalTransform, self).set_stats(stats)
+        # The values are looked up in the sorted view of the vocabulary.
+        self._order = np.argsort(self._stats[0], kind="stable")
+
+    def __call__(self, data):
+        assert self.has_stats, "The vocabulary of the categories is not available."
+        vocab = self._stats[0]
+        sorted_vocab = vocab[self._order]
+        data = _to_array_values(data)
+        pos = np.searchsorted(sorted_vocab, data)
+        pos[pos == len(vocab)] = 0
+        found = sorted_vocab[pos] == data if len(vocab) > 0 \
+                else np.zeros(len(data), dtype=bool)
+        ids = self._order[pos] if len(vocab) > 0 else pos
+        ids[~found] = -1
+        if self.output == "id":
+            return ids.astype(np.int64)
+        one_hot = np.zeros((len(data), len(vocab)), dtype=np.float32)
+        one_hot[np.nonzero(found)[0], ids[found]] = 1
+        return one_hot
+
+class BucketTransform:
+    """ Convert numerical values to one-hot vectors of buckets.
+
+    The range [min, max) is split into `bucket_cnt` buckets of the same width.
+    The values smaller than min fall into the first bucket and the values
+    not smaller than max fall into the last bucket.
+
+    Parameters
+    ----------
+    bucket_range : list of two floats
+        The min and max values.
+    bucket_cnt : int
+        The number of buckets.
+    """
+    def __init__(self, bucket_range, bucket_cnt):
+        assert len(bucket_range) == 2 and bucket_range[0] < bucket_range[1], \
+                "The range of buckets has to be [min, max]."
+        assert bucket_cnt > 0, "The number of buckets has to be positive."
+        self.boundaries = np.linspace(bucket_range[0], bucket_range[1],
+                                      bucket_cnt + 1)[1:-1]
+        self.bucket_cnt = bucket_cnt
+
+    def __call__(self, data):
+        data = np.asarray(data)
+        assert len(data.shape) == 1, "Bucketization only works on a single column."
+        ids = np.digitize(data, self.boundaries)
+        one_hot = np.zeros((len(data), self.bucket_cnt), dtype=np.float32)
+        one_hot[np.arange(len(data)), ids] = 1
+        return one_hot
+
+class HashTransform:
+    """ Map values to a fixed number of buckets with a hash function.
+
+    Integers are hashed with the finalizer of splitmix64 and strings are hashed
+    with CRC32, so the results are deterministic across processes.
+
+    Parameters
+    ----------
+    num_buckets : int
+        The number of hash buckets.
+    """
+    def __init__(self, num_buckets):
+        assert num_buckets > 0, "The number of hash buckets has to be positive."
+        self.num_buckets = num_buckets
+
+    def __call__(self, data):
+        data = _to_array_values(data)
+        if np.issubdtype(data.dtype, np.integer):
+            x = data.astype(np.uint64)
+            x = (x ^ (x >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+            x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+            hashes = x ^ (x >> np.uint64(31))
+        else:
+            # Only the unique values are hashed in Python.
+            uniq, inverse = np.unique(data.astype(str), return_inverse=True)
+            uniq_hashes = np.array([zlib.crc32(val.encode("utf8")) for val in uniq],
+                                   dtype=np.uint64)
+            hashes = uniq_hashes[inverse.reshape(-1)]
+        return (hashes % np.uint64(self.num_buckets)).astype(np.int64)
+
+def _to_array_values(data):
+    """ Convert the values to a Numpy array that can be sorted and searched.
+    """
+    data = np.asarray(data)
+    if data.dtype.hasobject:
+        data = data.astype(str)
+    return data
+
+def parse_transform(transform):
+    """ Parse the configuration of a vectorized feature transformation.
+
+    Parameters
+    ----------
+    transform : dict
+        The configuration of the transformation.
+
+    Returns
+    -------
+    callable : the transformation or None if it isn't a vectorized transformation.
+    """
+    name = transform['name']
+    if name == 'max_min_norm':
+        return MaxMinTransform(transform.get('max_val'), transform.get('min_val'))
+    elif name == 'standard_norm':
+        return StandardTransform(transform.get('mean'), transform.get('std'))
+    elif name == 'to_categorical':
+        return CategoricalTransform(transform.get('mapping'),
+                                    transform.get('output', 'one_hot'))
+    elif name == 'bucket_numerical':
+        assert 'range' in transform and 'bucket_cnt' in transform, \
+                "bucket_numerical requires 'range' and 'bucket_cnt'."
+        return BucketTransform(transform['range'], int(transform['bucket_cnt']))
+    elif name == 'feature_hash':
+        assert 'num_buckets' in transform, "feature_hash requires 'num_buckets'."
+        return HashTransform(int(transform['num_buckets']))
+    else:
+        return None
@@ -0,0 +1,263 @@
+"""
+    Copyright 2023 Contributors
+
+    Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+
+    Utility functions for graph construction.
+"""
+import os
+import json
+import time
+import hashlib
+import multiprocessing
+
+import numpy as np
+
+# The version of the processed results in the construction cache. Increase it whenever
+# the format or the processing of the results changes, so that the results saved
+# by an older version aren't reused.
+CACHE_FORMAT_VERSION = 1
+
+def _to_saved_array(arr):
+    """ Convert the data to a Numpy array that can be memory-mapped.
+    """
+    arr = np.asarray(arr)
+    # Memory-mapping doesn't support Python objects. Strings are stored
+    # as fixed-width unicode arrays.
+    if arr.dtype.hasobject:
+        arr = arr.astype(str)
+    return arr
+
+def save_worker_result(result, out_dir):
+    """ Save the result of a worker process to the disk.
+
+    The arrays in the result are saved as Numpy files in `out_dir` and
+    the returned metadata has the same structure as the result, except that
+    every array is replaced by the path of its file. Only the metadata
+    needs to be sent back to the parent process.
+
+    Parameters
+    ----------
+    result : tuple, list, dict or array
+        The result of a worker process. A tuple, a list or a dict can contain
+        tuples, lists, dicts or arrays. A list is loaded back as a tuple.
+    out_dir : str
+        The folder where the arrays are saved.
+
+    Returns
+    -------
+    the metadata of the saved result.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    num_files = [0]
+    def _save(data):
+        if isinstance(data, (tuple, list)):
+            return tuple(_save(val) for val in data)
+        elif isinstance(data, dict):
+            return {key: _save(val) for key, val in data.items()}
+        else:
+            path = os.path.join(out_dir, "{}.npy".format(num_files[0]))
+            num_files[0] += 1
+            np.save(path, _to_saved_array(data))
+            return path
+    return _save(result)
+
+def load_worker_result(meta, mmap_mode='r'):
+    """ Load the result saved by `save_worker_result`.
+
+    Parameters
+    ----------
+    meta : tuple, dict or str
+        The metadata returned by `save_worker_result`.
+    mmap_mode : str
+        The mode of memory-mapping the arrays. If it's None, the arrays are read
+        into memory.
+
+    Returns
+    -------
+    the result with the same structure as the one saved by the worker process.
+    """
+    # The tuples become lists if the metadata is loaded from a JSON file.
+    if isinstance(meta, (tuple, list)):
+        return tuple(load_worker_result(val, mmap_mode) for val in meta)
+    elif isinstance(meta, dict):
+        return {key: load_worker_result(val, mmap_mode) for key, val in meta.items()}
+    else:
+        return np.load(meta, mmap_mode=mmap_mode)
+
+def get_cache_key(in_file, *confs):
+    """ Get the key of the processed result of an input file in the construction cache.
+
+    The key is a hash of the path, the size and the modification time of the input
+    file, the cache format version as well as the configurations that determine
+    how the file is processed. If any of them changes, the file is processed again.
+
+    Parameters
+    ----------
+    in_file : str
+        The path of the input file.
+    confs : JSON serializable objects
+        The configurations of processing the file.
+
+    Returns
+    -------
+    str : the cache key.
+    """
+    stat = os.stat(in_file)
+    fingerprint = json.dumps([CACHE_FORMAT_VERSION, os.path.abspath(in_file), stat.st_size,
+                              stat.st_mtime_ns, list(confs)], sort_keys=True)
+    return hashlib.sha256(fingerprint.encode("utf8")).hexdigest()
+
+def load_cached_result(cache_dir, key):
+    """ Load the metadata of a processed result in the construction cache.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The folder of the construction cache.
+    key : str
+        The cache key returned by `get_cache_key`.
+
+    Returns
+    -------
+    The metadata returned by `save_worker_result` or None if the result isn't cached.
+    """
+    meta_file = os.path.join(cache_dir, key, "meta.json")
+    if not os.path.exists(meta_file):
+        return None
+    with open(meta_file, "r", encoding="utf8") as f:
+        return json.load(f)
+
+def save_cached_result(cache_dir, key, meta):
+    """ Save the metadata of a processed result in the construction cache.
+
+    The metadata is written after the arrays have been saved, so a result is
+    only reused if it was saved completely.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The folder of the construction cache.
+    key : str
+        The cache key returned by `get_cache_key`.
+    meta : tuple
+        The metadata returned by `save_worker_result`.
+    """
+    meta_file = os.path.join(cache_dir, key, "meta.json")
+    with open(meta_file + ".tmp", "w", encoding="utf8") as f:
+        json.dump(meta, f)
+    os.replace(meta_file + ".tmp", meta_file)
+
+def fingerprint_array(arr):
+    """ Compute the hash of the content of an array.
+
+    Parameters
+    ----------
+    arr : Numpy array
+        The input array.
+
+    Returns
+    -------
+    str : the hash of the array.
+    """
+    arr = np.ascontiguousarray(arr)
+    sha = hashlib.sha256(str((arr.dtype.str, arr.shape)).encode("utf8"))
+    sha.update(memoryview(arr.reshape(-1).view(np.uint8)))
+    return sha.hexdigest()
+
+def concat_arrays(arrs, out_file=None):
+    """ Concatenate arrays along the first dimension.
+
+    Parameters
+    ----------
+    arrs : list of Numpy arrays
+        The arrays to concatenate. They can be memory-mapped.
+    out_file : str
+        If it's provided, the result is written to this Numpy file block by block
+        and is returned as a memory-mapped array. Otherwise, the result is
+        stored in memory.
+
+    Returns
+    -------
+    Numpy array : the concatenated array.
+    """
+    if out_file is None:
+        return np.concatenate(arrs)
+    shape = (sum(len(arr) for arr in arrs),) + arrs[0].shape[1:]
+    out = np.lib.format.open_memmap(out_file, mode='w+', dtype=arrs[0].dtype, shape=shape)
+    start = 0
+    for arr in arrs:
+        out[start:start + len(arr)] = arr
+        start += len(arr)
+    out.flush()
+    return np.load(out_file, mmap_mode='r')
+
+def _run_task(task):
+    """ Run a task in a worker process and measure its runtime.
+    """
+    key, func, args = task
+    start = time.time()
+    res = func(*args)
+    return key, res, time.time() - start
+
+class WorkerPool:
+    """ A pool of worker processes that parse input files.
+
+    The worker processes are created once and are used for all node types
+    and edge types, so the states loaded in a worker process (e.g., tokenizers
+    and ID maps) can be reused by the following tasks. The tasks are scheduled
+    from the largest file to the smallest file and a task is sent to
+    whichever worker process becomes idle first.
+
+    Parameters
+    ----------
+    num_processes : int
+        The number of worker processes. If it's 1, tasks run in the current process.
+    """
+    def __init__(self, num_processes):
+        self._pool = multiprocessing.Pool(num_processes) if num_processes > 1 else None
+
+    def run(self, tasks):
+        """ Run the tasks in the worker processes.
+
+        Parameters
+        ----------
+        tasks : list of tuples
+            Each task is a tuple of a key, the input file, the function that processes
+            the file and the arguments of the function.
+
+        Returns
+        -------
+        dict : the key is the key of a task and the value is the result of the task.
+        """
+        file_sizes = {key: os.path.getsize(in_file) for key, in_file, _, _ in tasks}
+        in_files = {key: in_file for key, in_file, _, _ in tasks}
+        tasks = sorted(tasks, key=lambda task: file_sizes[task[0]], reverse=True)
+        tasks = [(key, func, args) for key, _, func, args in tasks]
+        if self._pool is not None:
+            res_iter = self._pool.imap_unordered(_run_task, tasks)
+        else:
+            res_iter = map(_run_task, tasks)
+        results = {}
+        for key, res, runtime in res_iter:
+            print("Process {} ({:.3f} MB) takes {:.3f} seconds".format(
+                in_files[key], file_sizes[key] / 1024 / 1024, runtime))
+            results[key] = res
+        return results
+
+    def close(self):
+        """ Shut down the worker processes.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
@@ -15,7 +15,7 @@
 
     GSF utility functions.
 """
-
+import os
 
 import numpy as np
 import dgl
@@ -40,7 +40,7 @@ from .model.edge_decoder import DenseBiDecoder, MLPEdgeDecoder
 from .model.edge_decoder import LinkPredictDotDecoder, LinkPredictDistMultDecoder
 from .tracker import get_task_tracker_class
 
-def initialize(ip_config, backend):
+def initialize(ip_config, backend, num_samplers=None):
     """ Initialize distributed inference context
 
     Parameters
@@ -49,7 +49,17 @@ def initialize(ip_config, backend):
         File path of ip_config file
     backend: str
         Torch distributed backend
+    num_samplers: int
+        The number of sampler processes of every trainer. DGL creates the sampler
+        processes from the environment variable DGL_NUM_SAMPLER set by its launch
+        script, so the number has to match `--num_samplers` of the launch script.
     """
+    if num_samplers is not None:
+        launched_samplers = int(os.environ.get("DGL_NUM_SAMPLER", 0))
+        assert num_samplers == launched_samplers, \
+            f"The job is launched with {launched_samplers} sampler processes, " \
+            f"but num_samplers is {num_samplers}. Please pass --num_samplers " \
+            f"{num_samplers} to the DGL launch script."
     # We need to use socket for communication in DGL 0.8. The tensorpipe backend has a bug.
     # This problem will be fixed in the future.
     dgl.distributed.initialize(ip_config, net_type='socket')
@@ -353,14 +363,16 @@ def set_encoder(model, g, config, train_task):
             # only use language model(s) as input layer encoder(s)
             encoder = GSPureLMNodeInputLayer(g, config.node_lm_configs,
                                              num_train=config.lm_train_nodes,
-                                             lm_infer_batchszie=config.lm_infer_batchszie)
+                                             lm_infer_batchszie=config.lm_infer_batchszie,
+                                             cache_dtype=config.emb_dtype)
         else:
             encoder = GSLMNodeEncoderInputLayer(g, config.node_lm_configs,
                                                 feat_size, config.n_hidden,
                                                 num_train=config.lm_train_nodes,
                                                 lm_infer_batchszie=config.lm_infer_batchszie,
                                                 dropout=config.dropout,
-                                                use_node_embeddings=config.use_node_embeddings)
+                                                use_node_embeddings=config.use_node_embeddings,
+                                                cache_dtype=config.emb_dtype)
     else:
         encoder = GSNodeEncoderInputLayer(g, feat_size, config.n_hidden,
                                           dropout=config.dropout,
@@ -41,7 +41,9 @@ class GSgnnEdgePredictionInfer(GSInfer):
     """
 
     def infer(self, loader, save_embed_path, save_predict_path=None,
-            mini_batch_infer=False):  # pylint: disable=unused-argument
+            mini_batch_infer=False, double_buffer=False,
+            emb_dtype=th.float32, reuse_blocks=False,
+            block_cache_path=None):  # pylint: disable=unused-argument
         """ Do inference
 
         The infer can do three things:
@@ -58,28 +60,43 @@ class GSgnnEdgePredictionInfer(GSInfer):
             The path where the prediction results will be saved.
         mini_batch_infer : bool
             Whether or not to use mini-batch inference.
+        double_buffer : bool
+            Whether full-graph inference reuses two buffers of node embeddings
+            for all GNN layers.
+        emb_dtype : torch.dtype
+            The data type that stores the node embeddings and the saved embeddings.
+        reuse_blocks : bool
+            Whether full-graph inference reuses the full-neighbor blocks in all GNN layers.
+        block_cache_path : str
+            The folder where the reused blocks are saved. If it's None, they are kept
+            in memory.
         """
         do_eval = self.evaluator is not None
         sys_tracker.check('start inferencing')
         self._model.eval()
+        # Only compute and save the embeddings related to target edge types.
+        infer_data = loader.data
+        target_ntypes = set()
+        for etype in infer_data.eval_etypes:
+            target_ntypes.add(etype[0])
+            target_ntypes.add(etype[2])
         embs = do_full_graph_inference(self._model, loader.data,
-                                       task_tracker=self.task_tracker)
+                                       task_tracker=self.task_tracker,
+                                       target_nodes=list(target_ntypes),
+                                       double_buffer=double_buffer,
+                                       emb_dtype=emb_dtype,
+                                       reuse_blocks=reuse_blocks,
+                                       block_cache_path=block_cache_path)
         sys_tracker.check('compute embeddings')
         res = edge_mini_batch_predict(self._model, embs, loader, return_label=do_eval)
         pred = res[0]
         label = res[1] if do_eval else None
         sys_tracker.check('compute prediction')
 
-        # Only save the embeddings related to target edge types.
-        infer_data = loader.data
-        target_ntypes = set()
-        for etype in infer_data.eval_etypes:
-            target_ntypes.add(etype[0])
-            target_ntypes.add(etype[2])
         embs = {ntype: embs[ntype] for ntype in target_ntypes}
         if save_embed_path is not None:
             save_gsgnn_embeddings(save_embed_path, embs, self.rank,
-                th.distributed.get_world_size())
+                th.distributed.get_world_size(), dtype=emb_dtype)
         th.distributed.barrier()
         sys_tracker.check('save embeddings')
 
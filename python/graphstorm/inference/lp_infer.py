@@ -22,7 +22,7 @@ from .graphstorm_infer import GSInfer
 from ..model.utils import save_embeddings as save_gsgnn_embeddings
 from ..model.utils import save_relation_embeddings
 from ..model.edge_decoder import LinkPredictDistMultDecoder
-from ..model.gnn import do_full_graph_inference
+from ..model.gnn import do_full_graph_inference, do_incremental_inference
 from ..model.lp_gnn import lp_mini_batch_predict
 
 from ..utils import sys_tracker
@@ -42,7 +42,9 @@ class GSgnnLinkPredictionInfer(GSInfer):
     """
 
     # TODO(zhengda) We only support full-graph inference for now.
-    def infer(self, data, loader, save_embed_path, edge_mask_for_gnn_embeddings='train_mask'):
+    def infer(self, data, loader, save_embed_path, edge_mask_for_gnn_embeddings='train_mask',
+              layer_embed_path=None, incremental_changes=None, double_buffer=False,
+              emb_dtype=th.float32, reuse_blocks=False, block_cache_path=None):
         """ Do inference
 
         The inference can do two things:
@@ -61,16 +63,54 @@ class GSgnnLinkPredictionInfer(GSInfer):
             The mask that indicates the edges used for computing GNN embeddings. By default,
             the dataloader uses the edges in the training graphs to compute GNN embeddings to
             avoid information leak for link prediction.
+        layer_embed_path : str
+            The path where the embeddings of every GNN layer are saved.
+        incremental_changes : dict
+            The IDs of the changed nodes and edges under the keys "nodes" and "edges".
+            If it's provided, only the embeddings in `layer_embed_path` affected by
+            the changes are refreshed.
+        double_buffer : bool
+            Whether full-graph inference reuses two buffers of node embeddings
+            for all GNN layers.
+        emb_dtype : torch.dtype
+            The data type that stores the node embeddings and the saved embeddings.
+        reuse_blocks : bool
+            Whether full-graph inference reuses the full-neighbor blocks in all GNN layers.
+        block_cache_path : str
+            The folder where the reused blocks are saved. If it's None, they are kept
+            in memory.
         """
         sys_tracker.check('start inferencing')
         self._model.eval()
-        embs = do_full_graph_inference(self._model, data,
-                                       edge_mask=edge_mask_for_gnn_embeddings,
-                                       task_tracker=self.task_tracker)
+        # The embeddings of all nodes are saved. Otherwise, only the embeddings of
+        # the node types of the test edges are needed.
+        target_nodes = None
+        if save_embed_path is None and layer_embed_path is None:
+            target_nodes = set()
+            for etype in data.eval_etypes:
+                target_nodes.update([etype[0], etype[2]])
+            target_nodes = list(target_nodes)
+        if incremental_changes is not None:
+            embs = do_incremental_inference(self._model, data, layer_embed_path,
+                                            incremental_changes.get("nodes"),
+                                            incremental_changes.get("edges"),
+                                            edge_mask=edge_mask_for_gnn_embeddings,
+                                            task_tracker=self.task_tracker,
+                                            emb_dtype=emb_dtype)
+        else:
+            embs = do_full_graph_inference(self._model, data,
+                                           edge_mask=edge_mask_for_gnn_embeddings,
+                                           task_tracker=self.task_tracker,
+                                           target_nodes=target_nodes,
+                                           layer_embed_path=layer_embed_path,
+                                           double_buffer=double_buffer,
+                                           emb_dtype=emb_dtype,
+                                           reuse_blocks=reuse_blocks,
+                                           block_cache_path=block_cache_path)
         sys_tracker.check('compute embeddings')
         if save_embed_path is not None:
             save_gsgnn_embeddings(save_embed_path, embs, self.rank,
-                th.distributed.get_world_size())
+                th.distributed.get_world_size(), dtype=emb_dtype)
         th.distributed.barrier()
         sys_tracker.check('save embeddings')
 
@@ -21,7 +21,7 @@ import torch as th
 
 from .graphstorm_infer import GSInfer
 from ..model.utils import save_embeddings as save_gsgnn_embeddings
-from ..model.gnn import do_full_graph_inference
+from ..model.gnn import do_full_graph_inference, do_incremental_inference
 from ..model.node_gnn import node_mini_batch_gnn_predict
 from ..model.node_gnn import node_mini_batch_predict
 
@@ -42,7 +42,9 @@ class GSgnnNodePredictionInfer(GSInfer):
     """
 
     def infer(self, loader, save_embed_path, save_predict_path=None,
-              mini_batch_infer=False):
+              mini_batch_infer=False, layer_embed_path=None, incremental_changes=None,
+              double_buffer=False, emb_dtype=th.float32, reuse_blocks=False,
+              block_cache_path=None):
         """ Do inference
 
         The inference does three things:
@@ -60,6 +62,23 @@ class GSgnnNodePredictionInfer(GSInfer):
             The path where the prediction results will be saved.
         mini_batch_infer : bool
             Whether or not to use mini-batch inference.
+        layer_embed_path : str
+            The path where the embeddings of every GNN layer are saved in
+            full-graph inference.
+        incremental_changes : dict
+            The IDs of the changed nodes and edges under the keys "nodes" and "edges".
+            If it's provided, full-graph inference only refreshes the embeddings
+            in `layer_embed_path` affected by the changes.
+        double_buffer : bool
+            Whether full-graph inference reuses two buffers of node embeddings
+            for all GNN layers.
+        emb_dtype : torch.dtype
+            The data type that stores the node embeddings and the saved embeddings.
+        reuse_blocks : bool
+            Whether full-graph inference reuses the full-neighbor blocks in all GNN layers.
+        block_cache_path : str
+            The folder where the reused blocks are saved. If it's None, they are kept
+            in memory.
         """
         do_eval = self.evaluator is not None
         sys_tracker.check('start inferencing')
@@ -75,8 +94,28 @@ class GSgnnNodePredictionInfer(GSInfer):
                 "GraphStorm only support single target node type for training and inference"
             embs = {loader.data.eval_ntypes[0]: embs}
         else:
-            embs = do_full_graph_inference(self._model, loader.data,
-                                           task_tracker=self.task_tracker)
+            # The embeddings of the target node types are saved. Otherwise, only
+            # the embeddings of the test nodes are needed.
+            target_nodes = loader.data.eval_ntypes if save_embed_path is not None \
+                    else loader.target_nidx
+            if incremental_changes is not None:
+                embs = do_incremental_inference(self._model, loader.data, layer_embed_path,
+                                                incremental_changes.get("nodes"),
+                                                incremental_changes.get("edges"),
+                                                task_tracker=self.task_tracker,
+                                                emb_dtype=emb_dtype)
+            else:
+                if layer_embed_path is not None:
+                    # The embeddings of every layer are saved for all nodes.
+                    target_nodes = None
+                embs = do_full_graph_inference(self._model, loader.data,
+                                               task_tracker=self.task_tracker,
+                                               target_nodes=target_nodes,
+                                               layer_embed_path=layer_embed_path,
+                                               double_buffer=double_buffer,
+                                               emb_dtype=emb_dtype,
+                                               reuse_blocks=reuse_blocks,
+                                               block_cache_path=block_cache_path)
             res = node_mini_batch_predict(self._model, embs, loader, return_label=do_eval)
             pred = res[0]
             label = res[1] if do_eval else None
@@ -85,7 +124,7 @@ class GSgnnNodePredictionInfer(GSInfer):
         embeddings = {ntype: embs[ntype] for ntype in loader.data.eval_ntypes}
         if save_embed_path is not None:
             save_gsgnn_embeddings(save_embed_path,
-                embeddings, self.rank, th.distributed.get_world_size())
+                embeddings, self.rank, th.distributed.get_world_size(), dtype=emb_dtype)
             th.distributed.barrier()
         sys_tracker.check('save embeddings')
 
@@ -21,6 +21,7 @@ from .lm_embed import GSLMNodeEncoderInputLayer, GSPureLMNodeInputLayer
 from .utils import sparse_emb_initializer
 
 from .gnn import GSgnnModel, GSOptimizer, do_full_graph_inference
+from .gnn import do_incremental_inference
 from .node_gnn import GSgnnNodeModel, GSgnnNodeModelBase
 from .node_gnn import node_mini_batch_gnn_predict, node_mini_batch_predict
 from .edge_gnn import GSgnnEdgeModel, GSgnnEdgeModelBase
@@ -338,14 +338,14 @@ class LinkPredictDotDecoder(GSLayerNoParam):
         canonical_etype = list(pos_neg_tuple.keys())[0]
         pos_src, neg_src, pos_dst, neg_dst = pos_neg_tuple[canonical_etype]
         utype, _, vtype = canonical_etype
-        pos_src_emb = emb[utype][pos_src].to(device)
-        pos_dst_emb = emb[vtype][pos_dst].to(device)
+        pos_src_emb = emb[utype][pos_src].to(device).float()
+        pos_dst_emb = emb[vtype][pos_dst].to(device).float()
 
         scores = {}
         pos_scores = calc_dot_pos_score(pos_src_emb, pos_dst_emb)
         neg_scores = []
         if neg_src is not None:
-            neg_src_emb = emb[utype][neg_src.reshape(-1,)].to(device)
+            neg_src_emb = emb[utype][neg_src.reshape(-1,)].to(device).float()
             if neg_sample_type == BUILTIN_LP_UNIFORM_NEG_SAMPLER:
                 neg_src_emb = neg_src_emb.reshape(
                     neg_src.shape[0], neg_src.shape[1], -1)
@@ -373,7 +373,7 @@ class LinkPredictDotDecoder(GSLayerNoParam):
 
         if neg_dst is not None:
             if neg_sample_type == BUILTIN_LP_UNIFORM_NEG_SAMPLER:
-                neg_dst_emb = emb[vtype][neg_dst.reshape(-1,)].to(device)
+                neg_dst_emb = emb[vtype][neg_dst.reshape(-1,)].to(device).float()
                 neg_dst_emb = neg_dst_emb.reshape(
                     neg_dst.shape[0], neg_dst.shape[1], -1)
                 # uniform sampled negative samples
@@ -381,7 +381,7 @@ class LinkPredictDotDecoder(GSLayerNoParam):
                     pos_src_emb.shape[0], 1, pos_src_emb.shape[1])
                 neg_score = calc_dot_pos_score(pos_src_emb, neg_dst_emb)
             elif neg_sample_type == BUILTIN_LP_JOINT_NEG_SAMPLER:
-                neg_dst_emb = emb[vtype][neg_dst].to(device)
+                neg_dst_emb = emb[vtype][neg_dst].to(device).float()
                 # joint sampled negative samples
                 assert len(pos_src_emb.shape) == 2, \
                     "For joint negative sampler, in evaluation " \
@@ -541,8 +541,8 @@ class LinkPredictDistMultDecoder(GSLayer):
         for canonical_etype, (pos_src, neg_src, pos_dst, neg_dst) in pos_neg_tuple.items():
             utype, _, vtype = canonical_etype
             # pos score
-            pos_src_emb = emb[utype][pos_src]
-            pos_dst_emb = emb[vtype][pos_dst]
+            pos_src_emb = emb[utype][pos_src].float()
+            pos_dst_emb = emb[vtype][pos_dst].float()
             rid = self.etype2rid[canonical_etype]
             rel_embedding = self._w_relation(
                 th.tensor(rid).to(self._w_relation.weight.device))
@@ -551,7 +551,7 @@ class LinkPredictDistMultDecoder(GSLayer):
             neg_scores = []
 
             if neg_src is not None:
-                neg_src_emb = emb[utype][neg_src.reshape(-1,)]
+                neg_src_emb = emb[utype][neg_src.reshape(-1,)].float()
                 if neg_sample_type == BUILTIN_LP_UNIFORM_NEG_SAMPLER:
                     neg_src_emb = neg_src_emb.reshape(neg_src.shape[0], neg_src.shape[1], -1)
                     # uniform sampled negative samples
@@ -584,7 +584,7 @@ class LinkPredictDistMultDecoder(GSLayer):
 
             if neg_dst is not None:
                 if neg_sample_type == BUILTIN_LP_UNIFORM_NEG_SAMPLER:
-                    neg_dst_emb = emb[vtype][neg_dst.reshape(-1,)]
+                    neg_dst_emb = emb[vtype][neg_dst.reshape(-1,)].float()
                     neg_dst_emb = neg_dst_emb.reshape(neg_dst.shape[0], neg_dst.shape[1], -1)
                     # uniform sampled negative samples
                     pos_src_emb = pos_src_emb.reshape(
@@ -594,7 +594,7 @@ class LinkPredictDistMultDecoder(GSLayer):
                     neg_score = calc_distmult_pos_score(
                         pos_src_emb, rel_embedding, neg_dst_emb, device)
                 elif neg_sample_type == BUILTIN_LP_JOINT_NEG_SAMPLER:
-                    neg_dst_emb = emb[vtype][neg_dst]
+                    neg_dst_emb = emb[vtype][neg_dst].float()
                     # joint sampled negative samples
                     assert len(pos_src_emb.shape) == 2, \
                         "For joint negative sampler, in evaluation " \
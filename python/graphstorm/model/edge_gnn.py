@@ -219,7 +219,8 @@ def edge_mini_batch_predict(model, emb, loader, return_label=False):
             etype = batch_graph.canonical_etypes[0]
             batch_embs = {}
             for ntype, in_nodes in input_nodes.items():
-                batch_embs[ntype] = emb[ntype][in_nodes].to(device)
+                # The embeddings can be stored in half precision.
+                batch_embs[ntype] = emb[ntype][in_nodes].to(device).float()
             batch_graph = batch_graph.to(device)
             # TODO(zhengda) how to deal with edge features?
             preds_list.append(decoder.predict(batch_graph, batch_embs))
@@ -20,6 +20,7 @@ from torch import nn
 from dgl.distributed import DistEmbedding, DistTensor, node_split
 
 from .gs_layer import GSLayer
+from .utils import get_emb_tensor_name
 from ..dataloading.dataset import prepare_batch_input
 from ..utils import get_rank
 
@@ -249,11 +250,18 @@ class GSNodeEncoderInputLayer(GSNodeInputLayer):
         return self.embed_size
 
 def compute_node_input_embeddings(g, batch_size, embed_layer,
-                                  task_tracker=None, feat_field='feat'):
+                                  task_tracker=None, feat_field='feat', infer_nodes=None,
+                                  persistent=True, dtype=th.float32):
     """
     This function computes the input embeddings of all nodes in a distributed graph
     either from the node features or from the embedding layer.
 
+    If `infer_nodes` is provided, only the input embeddings of these nodes are computed.
+
+    By default, the input embeddings are stored in a persistent distributed tensor
+    that is reused by the following calls. If `persistent` is False, they are stored
+    in a new distributed tensor that is freed once it's no longer referenced.
+
     Parameters
     ----------
     g : DistGraph
@@ -266,6 +274,13 @@ def compute_node_input_embeddings(g, batch_size, embed_layer,
         The task tracker.
     feat_field : str or dict of str
         The fields that contain the node features.
+    infer_nodes : dict of Tensors
+        The nodes in the local partition whose input embeddings are computed.
+        If it's None, all nodes in the local partition are computed.
+    persistent : bool
+        Whether to store the input embeddings in a persistent distributed tensor.
+    dtype : torch.dtype
+        The data type that stores the input embeddings. They are computed in float32.
 
     Returns
     -------
@@ -282,20 +297,31 @@ def compute_node_input_embeddings(g, batch_size, embed_layer,
             # TODO(zhengda) we need to be careful about this. Here it creates a persistent
             # distributed tensor to store the node embeddings. This can potentially consume
             # a lot of memory.
-            if 'input_emb' not in g.nodes[ntype].data:
-                g.nodes[ntype].data['input_emb'] = DistTensor(
-                        (g.number_of_nodes(ntype), embed_size),
-                        dtype=th.float32, name='{}_input_emb'.format(ntype),
-                        part_policy=g.get_node_partition_policy(ntype),
-                        persistent=True)
+            if not persistent:
+                input_emb = DistTensor((g.number_of_nodes(ntype), embed_size),
+                                       dtype=dtype,
+                                       part_policy=g.get_node_partition_policy(ntype))
+            else:
+                emb_name = get_emb_tensor_name('input_emb', dtype)
+                if emb_name not in g.nodes[ntype].data:
+                    g.nodes[ntype].data[emb_name] = DistTensor(
+                            (g.number_of_nodes(ntype), embed_size),
+                            dtype=dtype,
+                            name=get_emb_tensor_name('{}_input_emb'.format(ntype), dtype),
+                            part_policy=g.get_node_partition_policy(ntype),
+                            persistent=True)
+                else:
+                    assert g.nodes[ntype].data[emb_name].shape[1] == embed_size
+                input_emb = g.nodes[ntype].data[emb_name]
+            if infer_nodes is None:
+                # TODO(zhengda) this is not a memory efficient way of implementing this.
+                local_nodes = node_split(th.ones((g.number_of_nodes(ntype),), dtype=th.bool),
+                                         partition_book=g.get_partition_book(),
+                                         ntype=ntype, force_even=False)
             else:
-                assert g.nodes[ntype].data['input_emb'].shape[1] == embed_size
-            input_emb = g.nodes[ntype].data['input_emb']
-            # TODO(zhengda) this is not a memory efficient way of implementing this.
-            infer_nodes = node_split(th.ones((g.number_of_nodes(ntype),), dtype=th.bool),
-                                     partition_book=g.get_partition_book(),
-                                     ntype=ntype, force_even=False)
-            node_list = th.split(infer_nodes, batch_size)
+                local_nodes = infer_nodes[ntype] if ntype in infer_nodes \
+                        else th.zeros((0,), dtype=th.int64)
+            node_list = th.split(local_nodes, batch_size)
             dev = embed_layer.device
             for iter_l, input_nodes in enumerate(node_list):
                 if iter_l % 10000 == 0 and g.rank() == 0:
@@ -307,7 +333,7 @@ def compute_node_input_embeddings(g, batch_size, embed_layer,
 
                 feat = prepare_batch_input(g, {ntype: input_nodes}, dev=dev, feat_field=feat_field)
                 emb = embed_layer(feat, {ntype: input_nodes})
-                input_emb[input_nodes] = emb[ntype].to('cpu')
+                input_emb[input_nodes] = emb[ntype].to('cpu').to(dtype)
             n_embs[ntype] = input_emb
         if get_rank() == 0:
             print("Extract node embeddings")
@@ -26,9 +26,12 @@ from .utils import load_model as load_gsgnn_model
 from .utils import save_model as save_gsgnn_model
 from .utils import save_opt_state, load_opt_state
 from .utils import save_sparse_embeds, load_sparse_embeds
+from .utils import save_embeddings, load_embeddings, get_layer_embed_path
 from .embed import compute_node_input_embeddings
 from .gs_layer import GSLayerBase
-from .gnn_encoder_base import dist_inference
+from .gnn_encoder_base import dist_inference, get_local_nodes
+from .gnn_encoder_base import get_khop_scope, get_scoped_nodes
+from .gnn_encoder_base import get_affected_nodes, dist_incremental_inference
 from ..utils import get_rank
 
 class GSOptimizer():
@@ -501,11 +504,34 @@ class GSgnnModel(GSgnnModelBase):    # pylint: disable=abstract-method
         """
         return self._loss_fn
 
-def do_full_graph_inference(model, data, batch_size=1024, edge_mask=None, task_tracker=None):
+def do_full_graph_inference(model, data, batch_size=1024, edge_mask=None, task_tracker=None,
+                            target_nodes=None, layer_embed_path=None, double_buffer=False,
+                            emb_dtype=th.float32, reuse_blocks=False, block_cache_path=None):
     """ Do fullgraph inference
 
     It may use some of the edges indicated by `edge_mask` to compute GNN embeddings.
 
+    If `target_nodes` is provided, the inference is scoped to the target nodes.
+    Every layer only computes the embeddings of the nodes within the receptive field
+    of the target nodes, which are found by walking back k hops from the target nodes.
+    Only the returned embeddings of the target nodes are valid. If the target nodes
+    are all nodes of all node types, the inference isn't scoped.
+
+    If `layer_embed_path` is provided, the input embeddings and the outputs of every
+    GNN layer are saved, so that `do_incremental_inference` can refresh the embeddings
+    after the graph changes.
+
+    If `double_buffer` is True, the GNN layers reuse two buffers of node embeddings and
+    the input embeddings are released after the first layer.
+
+    The embeddings are computed in float32 and stored in `emb_dtype`. th.float16 or
+    th.bfloat16 halves the memory and the communication of the embeddings.
+
+    If `reuse_blocks` is True, the full-neighbor blocks are sampled once and replayed
+    for every GNN layer instead of being sampled again for every layer. They are kept
+    in memory or in `block_cache_path`. If `target_nodes` is provided, the later layers
+    replay the blocks of the first layer and only keep the nodes in their scopes.
+
     Parameters
     ----------
     model: torch model
@@ -518,17 +544,60 @@ def do_full_graph_inference(model, data, batch_size=1024, edge_mask=None, task_t
         The edge mask that indicates what edges are used to compute GNN embeddings.
     task_tracker: GSTaskTrackerAbc
         Task tracker
+    target_nodes : dict of Tensors or list of str
+        The target nodes of the trainer. If it's a list of node types, all nodes of
+        the node types are the targets. If it's None, the embeddings of all nodes
+        are computed.
+    layer_embed_path : str
+        The path where the embeddings of every layer are saved.
+    double_buffer : bool
+        Whether to reuse two buffers of node embeddings for all GNN layers.
+    emb_dtype : torch.dtype
+        The data type that stores the node embeddings.
+    reuse_blocks : bool
+        Whether to reuse the full-neighbor blocks in all GNN layers.
+    block_cache_path : str
+        The folder where the reused blocks are saved. If it's None, they are kept in memory.
 
     Returns
     -------
     dict of th.Tensor : node embeddings.
     """
     assert isinstance(model, GSgnnModel), "Only GSgnnModel supports full-graph inference."
+    if isinstance(target_nodes, (list, tuple)) and set(data.g.ntypes) <= set(target_nodes):
+        # All nodes are needed, so finding the scope only adds passes over the graph.
+        target_nodes = None
+    assert layer_embed_path is None or target_nodes is None, \
+        "The embeddings of every layer can only be saved when all nodes are computed."
+    scope = None
+    infer_nodes = None
+    if target_nodes is not None and model.gnn_encoder is not None:
+        t0 = time.time() # pylint: disable=invalid-name
+        scope = get_khop_scope(data.g, target_nodes, model.num_gnn_layers,
+                               edge_mask=edge_mask, batch_size=batch_size)
+        infer_nodes = get_scoped_nodes(data.g, scope, model.num_gnn_layers)
+        if get_rank() == 0:
+            print(f"computing the {model.num_gnn_layers}-hop scope of the target nodes: "
+                  f"{time.time() - t0:.4f} seconds")
+    elif isinstance(target_nodes, (list, tuple)):
+        # Without GNN layers, only the input embeddings of the target nodes are needed.
+        local_nodes = get_local_nodes(data.g)
+        infer_nodes = {ntype: local_nodes[ntype] for ntype in target_nodes}
+    elif target_nodes is not None:
+        infer_nodes = target_nodes
     node_embed = compute_node_input_embeddings(data.g,
                                                batch_size,
                                                model.node_input_encoder,
                                                task_tracker=task_tracker,
-                                               feat_field=data.node_feat_field)
+                                               feat_field=data.node_feat_field,
+                                               infer_nodes=infer_nodes,
+                                               # The GNN layers can only release
+                                               # the input embeddings that aren't persistent.
+                                               persistent=not double_buffer,
+                                               dtype=emb_dtype)
+    if layer_embed_path is not None:
+        save_embeddings(get_layer_embed_path(layer_embed_path, 0), node_embed,
+                        get_rank(), th.distributed.get_world_size())
     t1 = time.time() # pylint: disable=invalid-name
     # full graph evaluation
     th.distributed.barrier()
@@ -539,9 +608,90 @@ def do_full_graph_inference(model, data, batch_size=1024, edge_mask=None, task_t
         model.eval()
         embeddings = dist_inference(data.g, model.gnn_encoder, node_embed,
                                     batch_size, -1, edge_mask=edge_mask,
-                                    task_tracker=task_tracker)
+                                    task_tracker=task_tracker, scope=scope,
+                                    layer_embed_path=layer_embed_path,
+                                    double_buffer=double_buffer, dtype=emb_dtype,
+                                    reuse_blocks=reuse_blocks,
+                                    block_cache_path=block_cache_path)
         # TODO(zhengda) we should avoid getting rank from the graph.
         if get_rank() == 0:
             print(f"computing GNN embeddings: {time.time() - t1:.4f} seconds")
         model.train()
     return embeddings
+
+def do_incremental_inference(model, data, layer_embed_path, changed_nodes=None,
+                             changed_edges=None, batch_size=1024, edge_mask=None,
+                             task_tracker=None, emb_dtype=th.float32):
+    """ Refresh the embeddings saved by fullgraph inference after the graph changes.
+
+    The embeddings of every layer saved by `do_full_graph_inference` are loaded and
+    only the nodes within the k-hop out-neighborhood of the changes are recomputed
+    layer by layer. The refreshed embeddings of every layer are saved in place.
+    The node IDs of the graph have to be the same as when the embeddings were saved.
+
+    Parameters
+    ----------
+    model: torch model
+        GNN model
+    data : GSgnnData
+        The GraphStorm dataset
+    layer_embed_path : str
+        The path where the embeddings of every layer are saved.
+    changed_nodes : dict of Tensors
+        The IDs of the nodes whose features changed. The destination nodes of
+        the removed edges should be included.
+    changed_edges : dict of Tensors
+        The IDs of the edges that are added or changed.
+    batch_size : int
+        The batch size for inferencing a GNN layer
+    edge_mask : str
+        The edge mask that indicates what edges are used to compute GNN embeddings.
+    task_tracker: GSTaskTrackerAbc
+        Task tracker
+    emb_dtype : torch.dtype
+        The data type that stores the node embeddings.
+
+    Returns
+    -------
+    dict of th.Tensor : node embeddings.
+    """
+    assert isinstance(model, GSgnnModel), "Only GSgnnModel supports incremental inference."
+    rank = get_rank()
+    world_size = th.distributed.get_world_size()
+    num_layers = model.num_gnn_layers if model.gnn_encoder is not None else 0
+    t0 = time.time() # pylint: disable=invalid-name
+    affected = get_affected_nodes(data.g, changed_nodes, changed_edges, num_layers,
+                                  edge_mask=edge_mask, batch_size=batch_size)
+    if rank == 0:
+        print(f"computing the nodes affected by the changes: {time.time() - t0:.4f} seconds")
+
+    # Create the tensors of the input embeddings without computing any node.
+    node_embed = compute_node_input_embeddings(data.g, batch_size, model.node_input_encoder,
+                                               task_tracker=task_tracker,
+                                               feat_field=data.node_feat_field,
+                                               infer_nodes={}, dtype=emb_dtype)
+    input_path = get_layer_embed_path(layer_embed_path, 0)
+    load_embeddings(input_path, node_embed, rank, world_size)
+    th.distributed.barrier()
+    node_embed = compute_node_input_embeddings(data.g, batch_size, model.node_input_encoder,
+                                               task_tracker=task_tracker,
+                                               feat_field=data.node_feat_field,
+                                               infer_nodes=get_scoped_nodes(data.g,
+                                                                            affected, 0),
+                                               dtype=emb_dtype)
+    save_embeddings(input_path, node_embed, rank, world_size)
+    t1 = time.time() # pylint: disable=invalid-name
+    th.distributed.barrier()
+    if model.gnn_encoder is None:
+        embeddings = node_embed
+    else:
+        model.eval()
+        embeddings = dist_incremental_inference(data.g, model.gnn_encoder, node_embed,
+                                                batch_size, -1, affected, layer_embed_path,
+                                                edge_mask=edge_mask,
+                                                task_tracker=task_tracker,
+                                                dtype=emb_dtype)
+        if rank == 0:
+            print(f"refreshing GNN embeddings: {time.time() - t1:.4f} seconds")
+        model.train()
+    return embeddings
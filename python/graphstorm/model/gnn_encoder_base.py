@@ -15,6 +15,10 @@
 
     Relational GNN
 """
+import os
+import shutil
+from functools import partial
+
 import tqdm
 
 import dgl
@@ -22,6 +26,10 @@ import torch as th
 from torch import nn
 from dgl.distributed import DistTensor, node_split
 from .gs_layer import GSLayer
+from .utils import save_embeddings, load_embeddings, get_layer_embed_path
+from .utils import get_emb_tensor_name
+from ..utils import get_rank
+from ..dataloading.sample_cache import SampleCache
 
 class GraphConvEncoder(GSLayer):     # pylint: disable=abstract-method
     r"""General encoder for graph data.
@@ -72,10 +80,354 @@ class GraphConvEncoder(GSLayer):     # pylint: disable=abstract-method
         """
         return self._layers
 
+def get_local_nodes(g):
+    """ Get the nodes of every node type in the local partition of the trainer.
+
+    Parameters
+    ----------
+    g : DistGraph
+        The distributed graph.
+
+    Returns
+    -------
+    dict of Tensors : the node IDs of each node type.
+    """
+    return {ntype: node_split(th.ones((g.number_of_nodes(ntype),), dtype=th.bool),
+                              partition_book=g.get_partition_book(),
+                              ntype=ntype, force_even=False) for ntype in g.ntypes}
+
+def _init_full(shape, dtype, fill_value):
+    """ Initialize a distributed tensor with a value.
+
+    It's defined in the module, so that it can be sent to the servers.
+    """
+    return th.full(shape, fill_value, dtype=dtype)
+
+def get_khop_scope(g, target_nodes, num_hops, edge_mask=None, batch_size=1024):
+    """ Find the nodes within `num_hops` hops of the target nodes.
+
+    The GNN embeddings of the target nodes only depend on the nodes that reach them
+    in `num_hops` hops. The function walks back from the target nodes along the in-edges
+    one hop at a time and records the number of hops from every node to the closest
+    target node. Every trainer expands the frontier of the nodes in its local partition,
+    so a node is visited once even if it's close to the targets of multiple trainers.
+
+    Parameters
+    ----------
+    g : DistGraph
+        The distributed graph.
+    target_nodes : dict of Tensors or list of str
+        The target nodes of the trainer. If it's a list of node types, all nodes
+        of the node types are the targets.
+    num_hops : int
+        The number of hops, i.e., the number of GNN layers.
+    edge_mask : str
+        The edge mask that indicates what edges are used to compute GNN embeddings.
+    batch_size : int
+        The number of nodes whose neighbors are collected at a time.
+
+    Returns
+    -------
+    dict of DistTensors : the number of hops from every node to the closest target node.
+    The nodes farther than `num_hops` hops get `num_hops + 1`.
+    """
+    local_nodes = get_local_nodes(g)
+    if isinstance(target_nodes, (list, tuple)):
+        target_nodes = {ntype: local_nodes[ntype] for ntype in target_nodes}
+    hops = {ntype: DistTensor((g.number_of_nodes(ntype),), dtype=th.int32,
+                              init_func=partial(_init_full, fill_value=num_hops + 1),
+                              part_policy=g.get_node_partition_policy(ntype)) \
+            for ntype in g.ntypes}
+    for ntype, nids in target_nodes.items():
+        hops[ntype][nids] = th.zeros((len(nids),), dtype=th.int32)
+    th.distributed.barrier()
+
+    sampler = dgl.dataloading.MultiLayerNeighborSampler([-1], mask=edge_mask)
+    for hop in range(num_hops):
+        for ntype in g.ntypes:
+            nids = local_nodes[ntype]
+            frontier = nids[hops[ntype][nids] == hop]
+            for seeds in th.split(frontier, batch_size):
+                input_nodes, _, _ = sampler.sample(g, {ntype: seeds})
+                if not isinstance(input_nodes, dict):
+                    # This happens on a homogeneous graph.
+                    input_nodes = {g.ntypes[0]: input_nodes}
+                for src_ntype, src_nids in input_nodes.items():
+                    src_nids = src_nids[hops[src_ntype][src_nids] > hop + 1]
+                    if len(src_nids) > 0:
+                        hops[src_ntype][src_nids] = th.full((len(src_nids),), hop + 1,
+                                                            dtype=th.int32)
+        th.distributed.barrier()
+    return hops
+
+def get_scoped_nodes(g, scope, max_hops):
+    """ Get the local nodes within `max_hops` hops of the target nodes.
+
+    Parameters
+    ----------
+    g : DistGraph
+        The distributed graph.
+    scope : dict of DistTensors
+        The numbers of hops returned by `get_khop_scope`.
+    max_hops : int
+        The max number of hops.
+
+    Returns
+    -------
+    dict of Tensors : the node IDs of each node type.
+    """
+    nodes = {}
+    for ntype, nids in get_local_nodes(g).items():
+        nids = nids[scope[ntype][nids] <= max_hops]
+        if len(nids) > 0:
+            nodes[ntype] = nids
+    return nodes
+
+def find_affected_dst_nodes(block, levels, level):
+    """ Find the destination nodes of a block that have in-neighbors affected at `level`.
+
+    Parameters
+    ----------
+    block : DGLBlock
+        The block of the in-edges of the destination nodes. The source and destination
+        nodes store their IDs in the graph in `dgl.NID`.
+    levels : dict of DistTensors
+        The first affected layer of every node.
+    level : int
+        The layer.
+
+    Returns
+    -------
+    Tensor : the IDs of the affected destination nodes.
+    """
+    affected = [th.zeros((0,), dtype=th.int64)]
+    for etype in block.canonical_etypes:
+        src, dst = block.edges(etype=etype)
+        if len(src) == 0:
+            continue
+        src = block.srcnodes[etype[0]].data[dgl.NID][src]
+        dst = block.dstnodes[etype[2]].data[dgl.NID][dst]
+        affected.append(dst[levels[etype[0]][src] == level])
+    return th.unique(th.cat(affected))
+
+def get_affected_nodes(g, changed_nodes, changed_edges, num_layers,
+                       edge_mask=None, batch_size=1024):
+    """ Find the nodes whose embeddings are affected by the changes of the graph.
+
+    The input embedding of a changed node changes, and the output of the first GNN layer
+    changes on the destination nodes of the changed edges. A change of the output of
+    a layer on a node affects the outputs of the following layers on the node and
+    its out-neighbors. The function propagates the changes forward one layer at a time
+    and records the first layer whose output changes on every node.
+
+    A partition only stores the in-edges of its nodes, so the out-edges of a node
+    are spread over the partitions. Instead of walking along the out-edges, every
+    trainer checks the in-edges of the unaffected nodes in its local partition and
+    marks a node as affected if any of its in-neighbors is affected by the previous layer.
+
+    The removed edges are no longer in the graph, so their destination nodes should be
+    provided as changed nodes.
+
+    Parameters
+    ----------
+    g : DistGraph
+        The distributed graph.
+    changed_nodes : dict of Tensors
+        The IDs of the nodes whose features changed.
+    changed_edges : dict of Tensors
+        The IDs of the edges that are added or changed.
+    num_layers : int
+        The number of GNN layers.
+    edge_mask : str
+        The edge mask that indicates what edges are used to compute GNN embeddings.
+    batch_size : int
+        The number of nodes whose neighbors are collected at a time.
+
+    Returns
+    -------
+    dict of DistTensors : the first layer whose output changes on every node.
+    0 means the input embedding changes and i means the output of the i-th layer changes.
+    The unaffected nodes get `num_layers + 1`.
+    """
+    levels = {ntype: DistTensor((g.number_of_nodes(ntype),), dtype=th.int32,
+                                init_func=partial(_init_full, fill_value=num_layers + 1),
+                                part_policy=g.get_node_partition_policy(ntype)) \
+              for ntype in g.ntypes}
+    for ntype, nids in (changed_nodes or {}).items():
+        levels[ntype][nids] = th.zeros((len(nids),), dtype=th.int32)
+    th.distributed.barrier()
+    for etype, eids in (changed_edges or {}).items():
+        dst_ntype = g.to_canonical_etype(etype)[2]
+        _, dst = g.find_edges(eids, etype=etype)
+        dst = th.unique(dst)
+        dst = dst[levels[dst_ntype][dst] > 1]
+        if len(dst) > 0:
+            levels[dst_ntype][dst] = th.ones((len(dst),), dtype=th.int32)
+    th.distributed.barrier()
+
+    local_nodes = get_local_nodes(g)
+    sampler = dgl.dataloading.MultiLayerNeighborSampler([-1], mask=edge_mask)
+    for level in range(num_layers):
+        for ntype in g.ntypes:
+            nids = local_nodes[ntype]
+            candidates = nids[levels[ntype][nids] > level + 1]
+            for seeds in th.split(candidates, batch_size):
+                _, _, blocks = sampler.sample(g, {ntype: seeds})
+                affected = find_affected_dst_nodes(blocks[0], levels, level)
+                if len(affected) > 0:
+                    levels[ntype][affected] = th.full((len(affected),), level + 1,
+                                                      dtype=th.int32)
+        th.distributed.barrier()
+    return levels
+
+def _create_layer_output(g, gnn_encoder, i, buffers=None, dtype=th.float32):
+    """ Create the distributed tensors that store the outputs of the i-th GNN layer.
+
+    If `buffers` is provided, the layers alternate between two buffers and a layer
+    reuses the buffer of the layer before the previous one. The buffer is released
+    and created again if the output size changes.
+    """
+    num_layers = len(gnn_encoder.layers)
+    h_dim = gnn_encoder.h_dims if i < num_layers - 1 else gnn_encoder.out_dims
+    if buffers is None:
+        return {ntype: DistTensor((g.number_of_nodes(ntype), h_dim),
+                                  dtype=dtype, name=get_emb_tensor_name('h-' + str(i), dtype),
+                                  part_policy=g.get_node_partition_policy(ntype),
+                                  # TODO(zhengda) this makes the tensor persistent in memory.
+                                  persistent=True) for ntype in g.ntypes}
+    slot = i % 2
+    if buffers[slot] is None or buffers[slot][g.ntypes[0]].shape[1] != h_dim \
+            or buffers[slot][g.ntypes[0]].dtype != dtype:
+        # Release the old buffer before creating the new one.
+        buffers[slot] = None
+        buffers[slot] = {ntype: DistTensor((g.number_of_nodes(ntype), h_dim),
+                                           dtype=dtype,
+                                           part_policy=g.get_node_partition_policy(ntype)) \
+                         for ntype in g.ntypes}
+    return buffers[slot]
+
+def _filter_block_dst(block, dst_mask):
+    """ Keep the destination nodes of a block in `dst_mask` and their in-edges.
+
+    The destination nodes of a block are also its first source nodes, so the kept
+    edges are relabeled on the source nodes and converted to a new block. The node
+    and edge data of the new block, e.g., the original IDs, come from the old block.
+    """
+    data_dict = {}
+    kept_eids = {}
+    for etype in block.canonical_etypes:
+        src, dst = block.edges(etype=etype)
+        kept_eids[etype] = th.nonzero(dst_mask[etype[2]][dst], as_tuple=True)[0]
+        data_dict[etype] = (src[kept_eids[etype]], dst[kept_eids[etype]])
+    frontier = dgl.heterograph(data_dict, {ntype: block.num_src_nodes(ntype) \
+            for ntype in block.srctypes})
+    new_block = dgl.to_block(frontier, {ntype: th.nonzero(mask, as_tuple=True)[0] \
+            for ntype, mask in dst_mask.items()})
+    for ntype in new_block.srctypes:
+        idx = new_block.srcnodes[ntype].data[dgl.NID]
+        new_block.srcnodes[ntype].data.update({key: val[idx] \
+                for key, val in block.srcnodes[ntype].data.items()})
+    for ntype in new_block.dsttypes:
+        idx = new_block.dstnodes[ntype].data[dgl.NID]
+        new_block.dstnodes[ntype].data.update({key: val[idx] \
+                for key, val in block.dstnodes[ntype].data.items()})
+    for etype in new_block.canonical_etypes:
+        idx = kept_eids[etype][new_block.edges[etype].data[dgl.EID]]
+        new_block.edges[etype].data.update({key: val[idx] \
+                for key, val in block.edges[etype].data.items()})
+    return new_block
+
+def _filter_scoped_batches(batches, scope, max_hops):
+    """ Keep the destination nodes within `max_hops` hops of the target nodes in the batches.
+
+    The batches are sampled for the nodes of a previous layer, which include
+    the nodes of the later layers.
+    """
+    for _, _, blocks in batches:
+        block = blocks[0]
+        dst_mask = {ntype: scope[ntype][block.dstnodes[ntype].data[dgl.NID]] <= max_hops \
+                for ntype in block.dsttypes}
+        if sum(int(mask.sum()) for mask in dst_mask.values()) == 0:
+            continue
+        block = _filter_block_dst(block, dst_mask)
+        input_nodes = {ntype: block.srcnodes[ntype].data[dgl.NID] for ntype in block.srctypes}
+        output_nodes = {ntype: block.dstnodes[ntype].data[dgl.NID] \
+                for ntype in block.dsttypes if block.num_dst_nodes(ntype) > 0}
+        yield input_nodes, output_nodes, [block]
+
+def _infer_layer(g, layer, x, y, infer_nodes, batch_size, fanout, device,
+                 edge_mask=None, task_tracker=None, block_cache=None, scope=None,
+                 max_hops=None):
+    """ Compute the outputs of a GNN layer on the nodes.
+
+    The inputs of the layer are read from `x` and the outputs are written to `y`.
+    The layer computes in float32 and the outputs are cast to the data type of `y`.
+    If `block_cache` is provided, the blocks sampled for a previous layer are replayed.
+    If `scope` is also provided, the replayed blocks only keep the destination nodes
+    within `max_hops` hops of the target nodes.
+    """
+    # need to provide the fanout as a list, the number of layers is one obviously here
+    sampler = dgl.dataloading.MultiLayerNeighborSampler([fanout], mask=edge_mask)
+    # Every node is computed once, so the nodes are visited in the order of their IDs,
+    # which keeps the reads and writes of the embeddings local.
+    dataloader = dgl.dataloading.DistNodeDataLoader(g, infer_nodes, sampler,
+                                                    batch_size=batch_size,
+                                                    shuffle=False,
+                                                    drop_last=False) \
+            if len(infer_nodes) > 0 else []
+    if block_cache is not None:
+        dataloader = block_cache.epoch_iter(dataloader)
+        if scope is not None:
+            dataloader = _filter_scoped_batches(dataloader, scope, max_hops)
+
+    for iter_l, (input_nodes, output_nodes, blocks) in enumerate(tqdm.tqdm(dataloader)):
+        if task_tracker is not None:
+            task_tracker.keep_alive(report_step=iter_l)
+        block = blocks[0].to(device)
+
+        if not isinstance(input_nodes, dict):
+            # This happens on a homogeneous graph.
+            assert len(g.ntypes) == 1
+            input_nodes = {g.ntypes[0]: input_nodes}
+
+        if not isinstance(output_nodes, dict):
+            # This happens on a homogeneous graph.
+            assert len(g.ntypes) == 1
+            output_nodes = {g.ntypes[0]: output_nodes}
+
+        h = {k: x[k][input_nodes[k]].to(device).float() for k in input_nodes.keys()}
+        h = layer(block, h)
+
+        for k in h.keys():
+            # some ntypes might be in the tensor h but are not in the output nodes
+            # that have empty tensors
+            if k in output_nodes:
+                y[k][output_nodes[k]] = h[k].cpu().to(y[k].dtype)
+
 def dist_inference(g, gnn_encoder, node_feats, batch_size, fanout,
-                   edge_mask=None, task_tracker=None):
+                   edge_mask=None, task_tracker=None, scope=None, layer_embed_path=None,
+                   double_buffer=False, dtype=th.float32, reuse_blocks=False,
+                   block_cache_path=None):
     """Distributed inference of final representation over all node types.
 
+    If `scope` is provided, a GNN layer only computes the embeddings of the nodes
+    that the next layers need to compute the embeddings of the target nodes.
+    The embeddings of the other nodes are not computed.
+
+    By default, every GNN layer stores its outputs in a new persistent distributed tensor,
+    so the memory grows with the number of layers. If `double_buffer` is True,
+    the layers alternate between two distributed tensors of every node type, which are
+    freed once they are no longer referenced. The input embeddings are released after
+    the first layer, so the memory stays at two copies of the node embeddings.
+
+    If `reuse_blocks` is True and every GNN layer uses all neighbors (`fanout` is -1),
+    the 1-hop blocks of the local nodes are sampled once for the first layer and
+    replayed in the same order for the other layers, because all layers compute
+    the same nodes on the same neighborhoods. The blocks are kept in their CSC form
+    in memory or in `block_cache_path`. If `scope` is provided, the first layer computes
+    the most nodes, so the other layers replay its blocks and only keep the destination
+    nodes in their scopes.
+
     Parameters
     ----------
     g : DistGraph
@@ -92,63 +444,118 @@ def dist_inference(g, gnn_encoder, node_feats, batch_size, fanout,
         The edge mask indicates which edges are used to compute GNN embeddings.
     task_tracker : GSTaskTrackerAbc
         The task tracker.
+    scope : dict of DistTensors
+        The numbers of hops to the target nodes returned by `get_khop_scope`.
+    layer_embed_path : str
+        The path where the outputs of every GNN layer are saved for
+        `dist_incremental_inference`. If it's None, they are not saved.
+    double_buffer : bool
+        Whether to reuse two buffers for the outputs of all GNN layers. The input
+        embeddings are removed from `node_feats`, so they can be released.
+    dtype : torch.dtype
+        The data type that stores the outputs of the GNN layers, e.g., th.float16 or
+        th.bfloat16 halves the memory. The layers still compute in float32.
+    reuse_blocks : bool
+        Whether to sample the full-neighbor blocks once and reuse them in all GNN layers.
+    block_cache_path : str
+        The folder where the reused blocks are saved. If it's None, the blocks are
+        kept in memory.
 
     Returns
     -------
     dict of Tensor : the final GNN embeddings of all nodes.
     """
-    device = gnn_encoder.device
-    x = node_feats
+    assert layer_embed_path is None or scope is None, \
+        "The outputs of the GNN layers are only saved when all nodes are computed."
+    num_layers = len(gnn_encoder.layers)
+    x = dict(node_feats)
+    buffers = None
+    if double_buffer:
+        buffers = [None, None]
+        # Only `x` references the input embeddings, so they are released after the first layer.
+        node_feats.clear()
+    block_cache = None
+    if reuse_blocks and fanout == -1:
+        if block_cache_path is not None:
+            block_cache_path = os.path.join(block_cache_path, str(get_rank()))
+        block_cache = SampleCache(1, cache_path=block_cache_path, shuffle=False)
     with th.no_grad():
         for i, layer in enumerate(gnn_encoder.layers):
-            # get the fanout for this layer
-            y = {}
-            for k in g.ntypes:
-                h_dim = gnn_encoder.h_dims \
-                        if i < len(gnn_encoder.layers) - 1 else gnn_encoder.out_dims
-                y[k] = DistTensor((g.number_of_nodes(k), h_dim),
-                                  dtype=th.float32, name='h-' + str(i),
-                                  part_policy=g.get_node_partition_policy(k),
-                                  # TODO(zhengda) this makes the tensor persistent in memory.
-                                  persistent=True)
-
-            infer_nodes = {}
-            for ntype in g.ntypes:
-                infer_nodes[ntype] = node_split(th.ones((g.number_of_nodes(ntype),),
-                                                        dtype=th.bool),
-                                                partition_book=g.get_partition_book(),
-                                                ntype=ntype, force_even=False)
-            # need to provide the fanout as a list, the number of layers is one obviously here
-            sampler = dgl.dataloading.MultiLayerNeighborSampler([fanout], mask=edge_mask)
-            dataloader = dgl.dataloading.DistNodeDataLoader(g, infer_nodes, sampler,
-                                                            batch_size=batch_size,
-                                                            shuffle=True,
-                                                            drop_last=False)
-
-            for iter_l, (input_nodes, output_nodes, blocks) in enumerate(tqdm.tqdm(dataloader)):
-                if task_tracker is not None:
-                    task_tracker.keep_alive(report_step=iter_l)
-                block = blocks[0].to(device)
-
-                if not isinstance(input_nodes, dict):
-                    # This happens on a homogeneous graph.
-                    assert len(g.ntypes) == 1
-                    input_nodes = {g.ntypes[0]: input_nodes}
+            y = _create_layer_output(g, gnn_encoder, i, buffers, dtype=dtype)
+            if scope is None:
+                infer_nodes = get_local_nodes(g)
+            else:
+                # The outputs of the layer are only needed within the receptive field
+                # of the remaining layers.
+                infer_nodes = get_scoped_nodes(g, scope, num_layers - 1 - i)
+            _infer_layer(g, layer, x, y, infer_nodes, batch_size, fanout, gnn_encoder.device,
+                         edge_mask=edge_mask, task_tracker=task_tracker,
+                         block_cache=block_cache,
+                         # The blocks of the first layer are sampled for all scoped nodes.
+                         scope=scope if i > 0 and block_cache is not None else None,
+                         max_hops=num_layers - 1 - i)
+            x = y
+            th.distributed.barrier()
+            if layer_embed_path is not None:
+                save_embeddings(get_layer_embed_path(layer_embed_path, i + 1), y,
+                                get_rank(), th.distributed.get_world_size())
+    if block_cache is not None and block_cache_path is not None:
+        shutil.rmtree(block_cache_path, ignore_errors=True)
+    return y
 
-                if not isinstance(output_nodes, dict):
-                    # This happens on a homogeneous graph.
-                    assert len(g.ntypes) == 1
-                    output_nodes = {g.ntypes[0]: output_nodes}
+def dist_incremental_inference(g, gnn_encoder, node_feats, batch_size, fanout, affected,
+                               layer_embed_path, edge_mask=None, task_tracker=None,
+                               dtype=th.float32):
+    """ Refresh the GNN embeddings saved by `dist_inference` after the graph changes.
 
-                h = {k: x[k][input_nodes[k]].to(device) for k in input_nodes.keys()}
-                h = layer(block, h)
+    Every layer loads its saved outputs and only recomputes the outputs on the nodes
+    affected by the changes. The unaffected neighbors read the saved outputs
+    of the previous layer. The refreshed outputs overwrite the saved ones.
 
-                for k in h.keys():
-                    # some ntypes might be in the tensor h but are not in the output nodes
-                    # that have empty tensors
-                    if k in output_nodes:
-                        y[k][output_nodes[k]] = h[k].cpu()
+    Parameters
+    ----------
+    g : DistGraph
+        The distributed graph.
+    gnn_encoder : GraphConvEncoder
+        The GNN encoder on the graph.
+    node_feats : dict of Tensors
+        The refreshed input embeddings of all nodes.
+    batch_size : int
+        The batch size for the GNN inference.
+    fanout : int
+        The fanout for computing the GNN embeddings in a GNN layer.
+    affected : dict of DistTensors
+        The first affected layer of every node returned by `get_affected_nodes`.
+    layer_embed_path : str
+        The path where the outputs of every GNN layer are saved.
+    edge_mask : str
+        The edge mask indicates which edges are used to compute GNN embeddings.
+    task_tracker : GSTaskTrackerAbc
+        The task tracker.
+    dtype : torch.dtype
+        The data type that stores the outputs of the GNN layers.
 
+    Returns
+    -------
+    dict of Tensor : the final GNN embeddings of all nodes.
+    """
+    rank = get_rank()
+    world_size = th.distributed.get_world_size()
+    x = node_feats
+    with th.no_grad():
+        for i, layer in enumerate(gnn_encoder.layers):
+            path = get_layer_embed_path(layer_embed_path, i + 1)
+            y = _create_layer_output(g, gnn_encoder, i, dtype=dtype)
+            load_embeddings(path, y, rank, world_size)
+            th.distributed.barrier()
+            # The nodes whose outputs of this layer or any previous layer change.
+            infer_nodes = get_scoped_nodes(g, affected, i + 1)
+            if rank == 0:
+                print("Refresh the outputs of layer {} on {} local nodes".format(
+                    i, sum(len(nids) for nids in infer_nodes.values())))
+            _infer_layer(g, layer, x, y, infer_nodes, batch_size, fanout, gnn_encoder.device,
+                         edge_mask=edge_mask, task_tracker=task_tracker)
             x = y
             th.distributed.barrier()
+            save_embeddings(path, y, rank, world_size)
     return y
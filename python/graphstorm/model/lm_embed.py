@@ -24,9 +24,11 @@ from .embed import GSNodeInputLayer
 from .embed import GSNodeEncoderInputLayer
 from .lm_model import init_lm_model
 from .lm_model import get_lm_node_feats
+from .utils import get_emb_tensor_name
 from ..utils import get_rank
 
-def update_bert_cache(g, lm_models_info, lm_models, lm_emb_cache, lm_infer_batchszie):
+def update_bert_cache(g, lm_models_info, lm_models, lm_emb_cache, lm_infer_batchszie,
+                      dtype=th.float32):
     """ Update the lm_emb_cache using lanaguage models.
 
     Parameters
@@ -39,7 +41,10 @@ def update_bert_cache(g, lm_models_info, lm_models, lm_emb_cache, lm_infer_batch
         Language model embedding cache
     lm_infer_batchszie: int
         Language model inference batch size
+    dtype: torch.dtype
+        The data type that stores the cached embeddings.
     """
+    emb_name = get_emb_tensor_name('bert_emb', dtype)
     for (lm_ntypes, lm_node_feats), lm_model \
         in zip(lm_models_info, lm_models):
         lm_model.eval()
@@ -47,15 +52,15 @@ def update_bert_cache(g, lm_models_info, lm_models, lm_emb_cache, lm_infer_batch
             if get_rank() == 0:
                 print('compute bert embedding on node {}'.format(ntype))
             hidden_size = lm_model.feat_size
-            if 'bert_emb' not in g.nodes[ntype].data:
-                g.nodes[ntype].data['bert_emb'] = \
+            if emb_name not in g.nodes[ntype].data:
+                g.nodes[ntype].data[emb_name] = \
                     dgl.distributed.DistTensor(
                         (g.number_of_nodes(ntype), hidden_size),
-                        name="bert_emb",
-                        dtype=th.float32,
+                        name=emb_name,
+                        dtype=dtype,
                         part_policy=g.get_node_partition_policy(ntype),
                         persistent=True)
-            input_emb = g.nodes[ntype].data['bert_emb']
+            input_emb = g.nodes[ntype].data[emb_name]
             infer_nodes = dgl.distributed.node_split(
                 th.ones((g.number_of_nodes(ntype),), dtype=th.bool),
                 partition_book=g.get_partition_book(),
@@ -70,7 +75,7 @@ def update_bert_cache(g, lm_models_info, lm_models, lm_emb_cache, lm_infer_batch
                         for fname, feat in lm_node_feats[ntype].items()
                 }
                 text_embs = lm_model(input_ntypes, input_lm_feats)
-                input_emb[input_nodes] = text_embs[ntype].to('cpu')
+                input_emb[input_nodes] = text_embs[ntype].to('cpu').to(dtype)
             th.distributed.barrier()
             lm_emb_cache[ntype] = input_emb
         lm_model.train()
@@ -109,7 +114,7 @@ def lm_model_forward(input_nodes, lm_emb_cache, lm_models, lm_models_info, use_c
         # Note: self.lm_emb_cache is initialized by calling warmup
         for ntype, idx in input_nodes.items():
             if ntype in lm_emb_cache:
-                lm_feats[ntype] = lm_emb_cache[ntype][idx].to(dev)
+                lm_feats[ntype] = lm_emb_cache[ntype][idx].to(dev).float()
     else:
         # TODO: Release the bert cache properly
         #       This may need support from DistDGL
@@ -151,12 +156,15 @@ class GSPureLMNodeInputLayer(GSNodeInputLayer):
         Number of trainable texts
     lm_infer_batchszie: int
         Batch size used for computing text embeddings for static lm model
+    cache_dtype: torch.dtype
+        The data type that stores the cached text embeddings
     """
     def __init__(self,
                  g,
                  node_lm_configs,
                  num_train=0,
-                 lm_infer_batchszie=16):
+                 lm_infer_batchszie=16,
+                 cache_dtype=th.float32):
         super(GSPureLMNodeInputLayer, self).__init__(g)
         assert node_lm_configs is not None and len(node_lm_configs) > 0, \
             "language model configurations must be provided"
@@ -179,6 +187,7 @@ class GSPureLMNodeInputLayer(GSNodeInputLayer):
 
         self.num_train = num_train
         self.lm_infer_batchszie = lm_infer_batchszie
+        self.cache_dtype = cache_dtype
         self.use_cache = False
         self.lm_emb_cache = {}
 
@@ -214,7 +223,8 @@ class GSPureLMNodeInputLayer(GSNodeInputLayer):
                           self.lm_models_info,
                           self.lm_models,
                           self.lm_emb_cache,
-                          self.lm_infer_batchszie)
+                          self.lm_infer_batchszie,
+                          dtype=self.cache_dtype)
         self.use_cache = True
 
     #pylint: disable=keyword-arg-before-vararg
@@ -282,6 +292,8 @@ class GSLMNodeEncoderInputLayer(GSNodeEncoderInputLayer):
     use_node_embeddings : bool
         Whether we will use the node embeddings for individual nodes even when node features are
         available.
+    cache_dtype: torch.dtype
+        The data type that stores the cached text embeddings
     """
     def __init__(self,
                  g,
@@ -292,7 +304,8 @@ class GSLMNodeEncoderInputLayer(GSNodeEncoderInputLayer):
                  lm_infer_batchszie=16,
                  activation=None,
                  dropout=0.0,
-                 use_node_embeddings=False):
+                 use_node_embeddings=False,
+                 cache_dtype=th.float32):
         assert node_lm_configs is not None and len(node_lm_configs) > 0, \
             "language model configurations must be provided"
 
@@ -318,6 +331,7 @@ class GSLMNodeEncoderInputLayer(GSNodeEncoderInputLayer):
 
         self.num_train = num_train
         self.lm_infer_batchszie = lm_infer_batchszie
+        self.cache_dtype = cache_dtype
         self.use_cache = False
         self.lm_emb_cache = {}
 
@@ -351,7 +365,8 @@ class GSLMNodeEncoderInputLayer(GSNodeEncoderInputLayer):
                           self.lm_models_info,
                           self.lm_models,
                           self.lm_emb_cache,
-                          self.lm_infer_batchszie)
+                          self.lm_infer_batchszie,
+                          dtype=self.cache_dtype)
         self.use_cache = True
 
     def unfreeze(self):
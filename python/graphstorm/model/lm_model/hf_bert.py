@@ -166,7 +166,8 @@ class HFBertWrapper(GSFLanguageModelWrapper):
         input_id_lens = []
 
         for ntype in input_ntypes:
-            input_id = input_lm_feats[ntype][TOKEN_IDX].to(dev)
+            # The token IDs may be stored in a compact integer type, e.g., int16.
+            input_id = input_lm_feats[ntype][TOKEN_IDX].to(dev).long()
             input_id_lens.append(input_id.shape[0])
             # If ATT_MASK_IDX does not exist, we expect the VALID_LEN
             # stores the valid token length
@@ -192,7 +193,7 @@ class HFBertWrapper(GSFLanguageModelWrapper):
             input_ids.append(input_id)
             attention_masks.append(attention_mask)
             if TOKEN_TID_IDX in input_lm_feats[ntype]:
-                token_tid = input_lm_feats[ntype][TOKEN_TID_IDX].to(dev)
+                token_tid = input_lm_feats[ntype][TOKEN_TID_IDX].to(dev).long()
                 token_tids.append(token_tid)
 
         input_ids = th.cat(input_ids, dim=0)
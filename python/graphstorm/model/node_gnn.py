@@ -212,7 +212,8 @@ def node_mini_batch_predict(model, emb, loader, return_label=False):
             assert len(input_nodes) == 1, "Currently we only support one node type"
             ntype = list(input_nodes.keys())[0]
             in_nodes = input_nodes[ntype]
-            pred = model.decoder.predict(emb[ntype][in_nodes].to(device))
+            # The embeddings can be stored in half precision.
+            pred = model.decoder.predict(emb[ntype][in_nodes].to(device).float())
             preds.append(pred.cpu())
             if return_label:
                 lbl = data.get_labels(seeds)
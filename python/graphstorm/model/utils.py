@@ -164,7 +164,15 @@ def save_relation_embeddings(emb_path, decoder):
         json.dump(et2id_map, f, ensure_ascii=False, indent=4)
     th.save(relembs, os.path.join(emb_path, "rel_emb.pt"))
 
-def save_embeddings(model_path, embeddings, local_rank, world_size):
+def _get_data_range(local_rank, world_size, num_embs):
+    """ Get the range of the embeddings saved by a trainer.
+    """
+    start = local_rank * (num_embs // world_size)
+    end = (local_rank + 1) * (num_embs // world_size)
+    end = num_embs if local_rank + 1 == world_size else end
+    return start, end
+
+def save_embeddings(model_path, embeddings, local_rank, world_size, dtype=None):
     """ Save embeddings in a distributed way
 
         Parameters
@@ -177,27 +185,28 @@ def save_embeddings(model_path, embeddings, local_rank, world_size):
             Local rank
         world_size : int
             World size in a distributed env.
+        dtype : torch.dtype
+            The data type of the saved embeddings. If it's None, the embeddings
+            are saved in their own data type.
     """
     os.makedirs(model_path, exist_ok=True)
     assert local_rank < world_size
-    def get_data_range(num_embs):
-        # Get corresponding data range
-        start = local_rank * (num_embs // world_size)
-        end = (local_rank + 1) * (num_embs // world_size)
-        end = num_embs if local_rank + 1 == world_size else end
-        return start, end
-
     if isinstance(embeddings, (dgl.distributed.DistTensor, LazyDistTensor)):
-        start, end = get_data_range(len(embeddings))
+        start, end = _get_data_range(local_rank, world_size, len(embeddings))
         embeddings = embeddings[start:end]
     elif isinstance(embeddings, dict):
         # We need to duplicate the dict so that the input argument is not changed.
         embeddings = dict(embeddings.items())
         for name, emb in embeddings.items():
             if isinstance(emb, (dgl.distributed.DistTensor, LazyDistTensor)):
-                start, end = get_data_range(len(emb))
+                start, end = _get_data_range(local_rank, world_size, len(emb))
                 emb = emb[start:end]
                 embeddings[name] = emb
+    if dtype is not None:
+        if isinstance(embeddings, dict):
+            embeddings = {name: emb.to(dtype) for name, emb in embeddings.items()}
+        else:
+            embeddings = embeddings.to(dtype)
 
     emb_info = {
         "emb_name":[],
@@ -215,6 +224,70 @@ def save_embeddings(model_path, embeddings, local_rank, world_size):
         with open(os.path.join(model_path, "emb_info.json"), 'w', encoding='utf-8') as f:
             f.write(json.dumps(emb_info))
 
+def load_embeddings(model_path, embeddings, local_rank, world_size):
+    """ Load the embeddings saved by `save_embeddings` into distributed tensors.
+
+        Every trainer loads the part of the embeddings it saved, so the embeddings
+        have to be loaded by the same number of trainers.
+
+        Parameters
+        ----------
+        model_path : str
+            The path of the folder where the embeddings are saved.
+        embeddings : dict of DistTensors
+            The distributed tensors of each node type that store the loaded embeddings.
+        local_rank : int
+            Local rank
+        world_size : int
+            World size in a distributed env.
+    """
+    with open(os.path.join(model_path, "emb_info.json"), 'r', encoding='utf-8') as f:
+        emb_info = json.load(f)
+    assert emb_info["world_size"] == world_size, \
+        f"The embeddings in {model_path} were saved by {emb_info['world_size']} trainers, " \
+        f"but there are {world_size} trainers."
+    for name, emb in embeddings.items():
+        assert name in emb_info["emb_name"], f"The embeddings of {name} are not saved."
+        start, end = _get_data_range(local_rank, world_size, len(emb))
+        data = th.load(os.path.join(model_path, f'{name}_emb.part{local_rank}.bin'))
+        assert data.shape == (end - start,) + tuple(emb.shape[1:]), \
+            f"The saved embeddings of {name} don't match the shape {emb.shape}."
+        emb[start:end] = data.to(emb.dtype)
+
+def get_emb_tensor_name(name, dtype):
+    """ Get the name of a persistent distributed tensor of embeddings stored in `dtype`.
+
+        The tensors of different data types can't share the same name.
+
+        Parameters
+        ----------
+        name : str
+            The name of the tensor in float32.
+        dtype : torch.dtype
+            The data type of the tensor.
+
+        Returns
+        -------
+        str : the name of the tensor.
+    """
+    return name if dtype == th.float32 else f"{name}-{str(dtype).split('.')[-1]}"
+
+def get_layer_embed_path(layer_embed_path, layer):
+    """ Get the folder of the saved embeddings of a GNN layer.
+
+        Parameters
+        ----------
+        layer_embed_path : str
+            The path of the folder where the embeddings of all layers are saved.
+        layer : int
+            The layer index. 0 is the input embeddings and i is the output of the i-th layer.
+
+        Returns
+        -------
+        str : the folder of the embeddings of the layer.
+    """
+    return os.path.join(layer_embed_path, f"layer-{layer}")
+
 def load_model(model_path, gnn_model=None, embed_layer=None, decoder=None):
     """ Load a complete gnn model.
         A user needs to provide the correct model architectures first.
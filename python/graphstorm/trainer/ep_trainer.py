@@ -109,24 +109,35 @@ class GSgnnEdgePredictionTrainer(GSgnnTrainer):
         total_steps = 0
         early_stop = False # used when early stop is True
         sys_tracker.check('start training')
+        # The locks that pause prefetching mini-batches when the trainer sends RPC requests.
+        step_lock = self.get_rpc_lock(train_loader, in_step=True)
+        rpc_lock = self.get_rpc_lock(train_loader)
         for epoch in range(n_epochs):
             model.train()
+            # The hit rates of the feature cache are reported per epoch.
+            if data.feat_cache is not None:
+                data.feat_cache.reset_stats()
             t0 = time.time()
-            for i, (input_nodes, batch_graph, blocks) in enumerate(train_loader):
+            for i, (input_nodes, batch_graph, blocks, *batch_data) in enumerate(train_loader):
                 total_steps += 1
                 batch_tic = time.time()
 
                 if not isinstance(input_nodes, dict):
                     assert len(batch_graph.ntypes) == 1
                     input_nodes = {batch_graph.ntypes[0]: input_nodes}
-                input_feats = data.get_node_feats(input_nodes, device)
-                # retrieving seed edge id from the graph to find labels
-                # TODO(zhengda) expand code for multiple edge types
-                assert len(batch_graph.etypes) == 1
-                predict_etype = batch_graph.canonical_etypes[0]
-                # TODO(zhengda) the data loader should return labels directly.
-                seeds = batch_graph.edges[predict_etype[1]].data[dgl.EID]
-                lbl = data.get_labels({predict_etype: seeds}, device)
+                if len(batch_data) > 0:
+                    # The node features and edge labels are prefetched by the dataloader.
+                    input_feats, lbl = batch_data[0]
+                    input_feats = {ntype: feats.to(device) for ntype, feats in input_feats.items()}
+                    lbl = {etype: labels.to(device) for etype, labels in lbl.items()}
+                else:
+                    input_feats = data.get_node_feats(input_nodes, device)
+                    # retrieving seed edge id from the graph to find labels
+                    # TODO(zhengda) expand code for multiple edge types
+                    assert len(batch_graph.etypes) == 1
+                    predict_etype = batch_graph.canonical_etypes[0]
+                    seeds = batch_graph.edges[predict_etype[1]].data[dgl.EID]
+                    lbl = data.get_labels({predict_etype: seeds}, device)
                 blocks = [block.to(device) for block in blocks]
                 batch_graph = batch_graph.to(device)
                 for _, nodes in input_nodes.items():
@@ -137,13 +148,14 @@ class GSgnnEdgePredictionTrainer(GSgnnTrainer):
                     self._model.unfreeze_input_encoder()
                 # TODO(xiangsx) Support unfreezing gnn encoder and decoder
 
-                # TODO(zhengda) we don't support edge features for now.
-                loss = model(blocks, batch_graph, input_feats, None, lbl, input_nodes)
+                with step_lock:
+                    # TODO(zhengda) we don't support edge features for now.
+                    loss = model(blocks, batch_graph, input_feats, None, lbl, input_nodes)
 
-                t3 = time.time()
-                self.optimizer.zero_grad()
-                loss.backward()
-                self.optimizer.step()
+                    t3 = time.time()
+                    self.optimizer.zero_grad()
+                    loss.backward()
+                    self.optimizer.step()
                 forward_time += (t3 - t2)
                 back_time += (time.time() - t3)
 
@@ -159,8 +171,9 @@ class GSgnnEdgePredictionTrainer(GSgnnTrainer):
                 val_score = None
                 if self.evaluator is not None and \
                     self.evaluator.do_eval(total_steps, epoch_end=False):
-                    val_score = self.eval(model.module, val_loader, test_loader, mini_batch_infer,
-                                        total_steps)
+                    with rpc_lock:
+                        val_score = self.eval(model.module, val_loader, test_loader,
+                                              mini_batch_infer, total_steps)
 
                     if self.evaluator.do_early_stop(val_score):
                         early_stop = True
@@ -177,7 +190,8 @@ class GSgnnEdgePredictionTrainer(GSgnnTrainer):
                         #    latest K models.
                         # 2. There is evaluaiton, we need to follow the
                         #    guidance of validation score.
-                        self.save_topk_models(model, epoch, i, val_score, save_model_path)
+                        with rpc_lock:
+                            self.save_topk_models(model, epoch, i, val_score, save_model_path)
 
                 # early_stop, exit current interation.
                 if early_stop is True:
@@ -189,6 +203,10 @@ class GSgnnEdgePredictionTrainer(GSgnnTrainer):
             epoch_time = time.time() - t0
             if self.rank == 0:
                 print("Epoch {} take {}".format(epoch, epoch_time))
+                print("Epoch {} waits {:.3f} seconds for mini-batches ({} samplers)".format(
+                    epoch, train_loader.wait_time, train_loader.num_samplers))
+                if data.feat_cache is not None:
+                    print("Epoch {} feature cache: {}".format(epoch, data.feat_cache))
             dur.append(epoch_time)
 
             val_score = None
@@ -253,7 +271,12 @@ class GSgnnEdgePredictionTrainer(GSgnnTrainer):
             test_pred, test_label = edge_mini_batch_gnn_predict(model, test_loader,
                                                                 return_label=True)
         else:
-            emb = do_full_graph_inference(model, val_loader.data, task_tracker=self.task_tracker)
+            # Only the embeddings of the end nodes of the target edges are computed.
+            target_ntypes = set()
+            for etype in val_loader.data.eval_etypes:
+                target_ntypes.update([etype[0], etype[2]])
+            emb = do_full_graph_inference(model, val_loader.data, task_tracker=self.task_tracker,
+                                          target_nodes=list(target_ntypes))
             val_pred, val_label = edge_mini_batch_predict(model, emb, val_loader,
                                                           return_label=True)
             test_pred, test_label = edge_mini_batch_predict(model, emb, test_loader,
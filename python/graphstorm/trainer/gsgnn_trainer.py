@@ -16,10 +16,12 @@
     GraphStorm trainer base
 """
 import os
+from contextlib import nullcontext
 import psutil
 import torch as th
 
-from ..model import GSOptimizer
+from ..model import GSOptimizer, GSgnnModel
+from ..model import GSLMNodeEncoderInputLayer, GSPureLMNodeInputLayer
 from ..model.utils import TopKList
 from ..model.utils import remove_saved_models as remove_gsgnn_models
 from ..model.utils import save_model_results_json
@@ -313,6 +315,44 @@ class GSgnnTrainer():
         print('Epoch {:05d} | Batch {:03d} | forward {:05f} | Backward {:05f}'.format(
             epoch, i, gnn_forward_time, back_time))
 
+    def _step_uses_rpc(self):
+        """ Whether a training step of the model may send RPC requests to the graph servers.
+
+        It happens when the model has learnable node embeddings or pulls the text data of
+        nodes for language models. The models other than GSgnnModel are assumed to send
+        RPC requests.
+        """
+        if not isinstance(self._model, GSgnnModel):
+            return True
+        return len(self._model.get_sparse_params()) > 0 \
+                or isinstance(self._model.node_input_encoder,
+                              (GSLMNodeEncoderInputLayer, GSPureLMNodeInputLayer))
+
+    def get_rpc_lock(self, train_loader, in_step=False):
+        """ Get the lock that stops the dataloader from prefetching mini-batches.
+
+        The RPC client of DGL isn't thread-safe. When the dataloader prefetches
+        mini-batches in a background thread, the trainer holds the lock of the dataloader
+        while it sends RPC requests, e.g., in evaluation or in a training step that
+        pulls learnable node embeddings.
+
+        Parameters
+        ----------
+        train_loader : GSgnnDataLoaderBase
+            The dataloader for training.
+        in_step : bool
+            Whether the lock is used in a training step. A training step doesn't
+            need the lock if the model doesn't send RPC requests.
+
+        Returns
+        -------
+        context manager : the lock or a context manager that does nothing.
+        """
+        if getattr(train_loader, "num_prefetch_batches", 0) == 0 \
+                or (in_step and not self._step_uses_rpc()):
+            return nullcontext()
+        return train_loader.prefetch_lock
+
     def restore_model(self, model_path):
         """ Restore a GNN model and the optimizer.
 
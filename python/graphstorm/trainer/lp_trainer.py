@@ -110,10 +110,17 @@ class GSgnnLinkPredictionTrainer(GSgnnTrainer):
         forward_time = 0
         back_time = 0
         sys_tracker.check('start training')
+        # The locks that pause prefetching mini-batches when the trainer sends RPC requests.
+        step_lock = self.get_rpc_lock(train_loader, in_step=True)
+        rpc_lock = self.get_rpc_lock(train_loader)
         for epoch in range(n_epochs):
             model.train()
+            # The hit rates of the feature cache are reported per epoch.
+            if data.feat_cache is not None:
+                data.feat_cache.reset_stats()
             t0 = time.time()
-            for i, (input_nodes, pos_graph, neg_graph, blocks) in enumerate(train_loader):
+            for i, (input_nodes, pos_graph, neg_graph, blocks, *batch_data) \
+                    in enumerate(train_loader):
                 total_steps += 1
                 batch_tic = time.time()
 
@@ -123,7 +130,12 @@ class GSgnnLinkPredictionTrainer(GSgnnTrainer):
                 pos_graph = pos_graph.to(device)
                 neg_graph = neg_graph.to(device)
                 blocks = [blk.to(device) for blk in blocks]
-                input_feats = data.get_node_feats(input_nodes, device)
+                if len(batch_data) > 0:
+                    # The node features are prefetched by the dataloader.
+                    input_feats = {ntype: feats.to(device) \
+                            for ntype, feats in batch_data[0][0].items()}
+                else:
+                    input_feats = data.get_node_feats(input_nodes, device)
                 for _, nodes in input_nodes.items():
                     num_input_nodes += nodes.shape[0]
 
@@ -132,14 +144,15 @@ class GSgnnLinkPredictionTrainer(GSgnnTrainer):
                     self._model.unfreeze_input_encoder()
                 # TODO(xiangsx) Support unfreezing gnn encoder and decoder
 
-                # TODO(zhengda) we don't support edge features for now.
-                loss = model(blocks, pos_graph, neg_graph,
-                             input_feats, None, input_nodes)
+                with step_lock:
+                    # TODO(zhengda) we don't support edge features for now.
+                    loss = model(blocks, pos_graph, neg_graph,
+                                 input_feats, None, input_nodes)
 
-                t3 = time.time()
-                self.optimizer.zero_grad()
-                loss.backward()
-                self.optimizer.step()
+                    t3 = time.time()
+                    self.optimizer.zero_grad()
+                    loss.backward()
+                    self.optimizer.step()
                 forward_time += (t3 - t2)
                 back_time += (time.time() - t3)
 
@@ -153,9 +166,10 @@ class GSgnnLinkPredictionTrainer(GSgnnTrainer):
                 val_score = None
                 if self.evaluator is not None and \
                     self.evaluator.do_eval(total_steps, epoch_end=False):
-                    val_score = self.eval(model.module, data,
-                                          val_loader, test_loader, total_steps,
-                                          edge_mask_for_gnn_embeddings)
+                    with rpc_lock:
+                        val_score = self.eval(model.module, data,
+                                              val_loader, test_loader, total_steps,
+                                              edge_mask_for_gnn_embeddings)
 
                     if self.evaluator.do_early_stop(val_score):
                         early_stop = True
@@ -172,7 +186,8 @@ class GSgnnLinkPredictionTrainer(GSgnnTrainer):
                         #    latest K models.
                         # 2. There is evaluaiton, we need to follow the
                         #    guidance of validation score.
-                        self.save_topk_models(model, epoch, i, val_score, save_model_path)
+                        with rpc_lock:
+                            self.save_topk_models(model, epoch, i, val_score, save_model_path)
 
                 # early_stop, exit current interation.
                 if early_stop is True:
@@ -184,6 +199,10 @@ class GSgnnLinkPredictionTrainer(GSgnnTrainer):
             epoch_time = time.time() - t0
             if self.rank == 0:
                 print("Epoch {} take {}".format(epoch, epoch_time))
+                print("Epoch {} waits {:.3f} seconds for mini-batches ({} samplers)".format(
+                    epoch, train_loader.wait_time, train_loader.num_samplers))
+                if data.feat_cache is not None:
+                    print("Epoch {} feature cache: {}".format(epoch, data.feat_cache))
             dur.append(epoch_time)
 
             val_score = None
@@ -245,9 +264,15 @@ class GSgnnLinkPredictionTrainer(GSgnnTrainer):
         test_start = time.time()
         sys_tracker.check('before prediction')
         model.eval()
+        # The negative edges can connect to any node of the node types of the target edges,
+        # so only the embeddings of these node types are computed.
+        target_ntypes = set()
+        for etype in data.eval_etypes:
+            target_ntypes.update([etype[0], etype[2]])
         emb = do_full_graph_inference(model, data,
                                       edge_mask=edge_mask_for_gnn_embeddings,
-                                      task_tracker=self.task_tracker)
+                                      task_tracker=self.task_tracker,
+                                      target_nodes=list(target_ntypes))
         sys_tracker.check('compute embeddings')
         device = th.device(f"cuda:{self.dev_id}") \
             if self.dev_id >= 0 else th.device("cpu")
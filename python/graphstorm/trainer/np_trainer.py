@@ -107,19 +107,30 @@ class GSgnnNodePredictionTrainer(GSgnnTrainer):
         early_stop = False # used when early stop is True
         sys_tracker.check('start training')
         g = data.g
+        # The locks that pause prefetching mini-batches when the trainer sends RPC requests.
+        step_lock = self.get_rpc_lock(train_loader, in_step=True)
+        rpc_lock = self.get_rpc_lock(train_loader)
         for epoch in range(n_epochs):
             model.train()
+            # The hit rates of the feature cache are reported per epoch.
+            if data.feat_cache is not None:
+                data.feat_cache.reset_stats()
             t0 = time.time()
-            # TODO(zhengda) the dataloader should return node features and labels directly.
-            for i, (input_nodes, seeds, blocks) in enumerate(train_loader):
+            for i, (input_nodes, seeds, blocks, *batch_data) in enumerate(train_loader):
                 total_steps += 1
                 batch_tic = time.time()
 
                 if not isinstance(input_nodes, dict):
                     assert len(g.ntypes) == 1
                     input_nodes = {g.ntypes[0]: input_nodes}
-                input_feats = data.get_node_feats(input_nodes, device)
-                lbl = data.get_labels(seeds, device)
+                if len(batch_data) > 0:
+                    # The node features and labels are prefetched by the dataloader.
+                    input_feats, lbl = batch_data[0]
+                    input_feats = {ntype: feats.to(device) for ntype, feats in input_feats.items()}
+                    lbl = {ntype: labels.to(device) for ntype, labels in lbl.items()}
+                else:
+                    input_feats = data.get_node_feats(input_nodes, device)
+                    lbl = data.get_labels(seeds, device)
                 blocks = [block.to(device) for block in blocks]
                 for _, feats in input_feats.items():
                     num_input_nodes += feats.shape[0]
@@ -129,13 +140,14 @@ class GSgnnNodePredictionTrainer(GSgnnTrainer):
                     self._model.unfreeze_input_encoder()
                 # TODO(xiangsx) Support unfreezing gnn encoder and decoder
 
-                # TODO(zhengda) we don't support edge features for now.
-                loss = model(blocks, input_feats, None, lbl, input_nodes)
+                with step_lock:
+                    # TODO(zhengda) we don't support edge features for now.
+                    loss = model(blocks, input_feats, None, lbl, input_nodes)
 
-                t3 = time.time()
-                self.optimizer.zero_grad()
-                loss.backward()
-                self.optimizer.step()
+                    t3 = time.time()
+                    self.optimizer.zero_grad()
+                    loss.backward()
+                    self.optimizer.step()
                 forward_time += (t3 - t2)
                 back_time += (time.time() - t3)
 
@@ -150,8 +162,9 @@ class GSgnnNodePredictionTrainer(GSgnnTrainer):
                 if self.evaluator is not None and \
                     self.evaluator.do_eval(total_steps, epoch_end=False) and \
                     val_loader is not None:
-                    val_score = self.eval(model.module, val_loader, test_loader,
-                                          mini_batch_infer, total_steps)
+                    with rpc_lock:
+                        val_score = self.eval(model.module, val_loader, test_loader,
+                                              mini_batch_infer, total_steps)
 
                     if self.evaluator.do_early_stop(val_score):
                         early_stop = True
@@ -168,7 +181,8 @@ class GSgnnNodePredictionTrainer(GSgnnTrainer):
                         #    latest K models.
                         # 2. There is evaluaiton, we need to follow the
                         #    guidance of validation score.
-                        self.save_topk_models(model, epoch, i, val_score, save_model_path)
+                        with rpc_lock:
+                            self.save_topk_models(model, epoch, i, val_score, save_model_path)
 
                 # early_stop, exit current interation.
                 if early_stop is True:
@@ -179,6 +193,10 @@ class GSgnnNodePredictionTrainer(GSgnnTrainer):
             epoch_time = time.time() - t0
             if self.rank == 0:
                 print("Epoch {} take {}".format(epoch, epoch_time))
+                print("Epoch {} waits {:.3f} seconds for mini-batches ({} samplers)".format(
+                    epoch, train_loader.wait_time, train_loader.num_samplers))
+                if data.feat_cache is not None:
+                    print("Epoch {} feature cache: {}".format(epoch, data.feat_cache))
             dur.append(epoch_time)
 
             val_score = None
@@ -235,7 +253,14 @@ class GSgnnNodePredictionTrainer(GSgnnTrainer):
             test_pred, _, test_label = node_mini_batch_gnn_predict(model, test_loader,
                                                                    return_label=True)
         else:
-            emb = do_full_graph_inference(model, val_loader.data, task_tracker=self.task_tracker)
+            # Only the embeddings of the validation and test nodes are computed.
+            target_nodes = {}
+            for loader in [val_loader, test_loader]:
+                for ntype, nids in loader.target_nidx.items():
+                    target_nodes[ntype] = th.cat([target_nodes[ntype], nids]) \
+                            if ntype in target_nodes else nids
+            emb = do_full_graph_inference(model, val_loader.data, task_tracker=self.task_tracker,
+                                          target_nodes=target_nodes)
             val_pred, val_label = node_mini_batch_predict(model, emb, val_loader,
                                                           return_label=True)
             test_pred, test_label = node_mini_batch_predict(model, emb, test_loader,
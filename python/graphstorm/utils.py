@@ -89,7 +89,7 @@ def estimate_mem_train(root, task):
                     'shared mem: {shared_mem_list[-1]:.3f} GB, cli mem: {max_cli_mem:.3f} GB')
     return max(mem_list), max(shared_mem_list)
 
-def estimate_mem_infer(root, graph_name, num_hidden, num_layers):
+def estimate_mem_infer(root, graph_name, num_hidden, num_layers, double_buffer=False):
     ''' Estimate the memory consumption for inference.
 
     Parameters
@@ -102,11 +102,16 @@ def estimate_mem_infer(root, graph_name, num_hidden, num_layers):
         The hidden size for the GNN embeddings.
     num_layers : int
         The number of GNN layers.
+    double_buffer : bool
+        Whether the GNN layers reuse two buffers of node embeddings.
 
     Returns
     -------
     a tuple of max memory size and shared memory size.
     '''
+    # The embeddings of the input layer and each GNN layer are stored unless
+    # the layers reuse two buffers.
+    num_emb_copies = 2 if double_buffer else num_layers + 1
     mem_list = []
     shared_mem_list = []
     parts = []
@@ -141,7 +146,7 @@ def estimate_mem_infer(root, graph_name, num_hidden, num_layers):
             # The shared memory stores the graph structure, the node features, edge features
             # as well as the embeddings of the input layer and each GNN layer.
             shared_mem = (struct_size + node_feats + edge_feats
-                    + num_part_nodes * num_hidden * 4 * (num_layers + 1) / 1024/1024/1024)
+                    + num_part_nodes * num_hidden * 4 * num_emb_copies / 1024/1024/1024)
             # The memory usage when after the server runs.
             # Majority data is stored in shared memory. When saving the GNN embeddings to the disk,
             # we need to extract the GNN node embeddings, which is stored
@@ -19,7 +19,7 @@ python3 $GS_HOME/tests/end2end-tests/data_process/data_gen.py
 
 # Test the DGLGraph format.
 echo "********* Test the DGLGraph format *********"
-python3 $GS_HOME/python/graphstorm/gconstruct/construct_graph.py --conf_file /tmp/test_data/test_data_transform.conf --num_processes 4 --output_dir /tmp/test_out --graph_name test --output_format DGL
+python3 -m graphstorm.gconstruct.construct_graph --conf_file /tmp/test_data/test_data_transform.conf --num_processes 4 --output_dir /tmp/test_out --graph_name test --output_format DGL
 
 error_and_exit $?
 
@@ -29,7 +29,7 @@ error_and_exit $?
 
 # Test the DistDGL graph format.
 echo "********* Test the DistDGL graph format ********"
-python3 $GS_HOME/python/graphstorm/gconstruct/construct_graph.py --conf_file /tmp/test_data/test_data_transform.conf --num_processes 4 --output_dir /tmp/test_partition2 --graph_name test
+python3 -m graphstorm.gconstruct.construct_graph --conf_file /tmp/test_data/test_data_transform.conf --num_processes 4 --output_dir /tmp/test_partition2 --graph_name test
 
 error_and_exit $?
 
@@ -39,6 +39,6 @@ error_and_exit $?
 
 # Test the DistDGL graph format with reverse edges.
 echo "*********** Test the DistDGL graph format with reverse edges *********"
-python3 $GS_HOME/python/graphstorm/gconstruct/construct_graph.py --conf_file /tmp/test_data/test_data_transform.conf --num_processes 4 --output_dir /tmp/test_out --graph_name test --add_reverse_edges
+python3 -m graphstorm.gconstruct.construct_graph --conf_file /tmp/test_data/test_data_transform.conf --num_processes 4 --output_dir /tmp/test_out --graph_name test --add_reverse_edges
 
 error_and_exit $?
@@ -21,6 +21,7 @@ import json
 import yaml
 import math
 import unittest, pytest
+import torch as th
 from argparse import Namespace
 
 from graphstorm.config import GSConfig
@@ -64,8 +65,10 @@ def create_basic_config(tmp_path, file_name):
         "debug" : True,
         "backend": "gloo",
         "num_gpus": 1,
+        "num_samplers": 2,
         "ip_config": os.path.join(tmp_path, "ip.txt"),
         "part_config": os.path.join(tmp_path, "part.json"),
+        "cache_split": True,
         "model_encoder_type": "rgat",
         "evaluation_frequency": 100,
         "no_validation": True,
@@ -95,6 +98,8 @@ def create_basic_config(tmp_path, file_name):
     yaml_object["gsf"]["basic"] = {
         "backend": "error",
         "num_gpus": 0,
+        "num_samplers": -1,
+        "cache_split": "error",
         "evaluation_frequency": 0,
         "model_encoder_type": "abc"
     }
@@ -122,8 +127,10 @@ def test_load_basic_info():
         assert config.debug == True
         assert config.backend == "gloo"
         assert config.num_gpus == 1
+        assert config.num_samplers == 2
         assert config.ip_config == os.path.join(Path(tmpdirname), "ip.txt")
         assert config.part_config == os.path.join(Path(tmpdirname), "part.json")
+        assert config.cache_split == True
         assert config.verbose == False
         assert config.evaluation_frequency == 100
         assert config.no_validation == True
@@ -140,6 +147,8 @@ def test_load_basic_info():
         config = GSConfig(args)
         assert config.debug == False
         assert config.backend == "gloo"
+        assert config.num_samplers == int(os.environ.get("DGL_NUM_SAMPLER", 0))
+        assert config.cache_split == False
         assert config.evaluation_frequency == sys.maxsize
         assert config.no_validation == False
         check_failure(config, "model_encoder_type") # must provide model_encoder_type
@@ -150,6 +159,8 @@ def test_load_basic_info():
         config = GSConfig(args)
         check_failure(config, "backend")
         check_failure(config, "num_gpus")
+        check_failure(config, "num_samplers")
+        check_failure(config, "cache_split")
         check_failure(config, "ip_config")
         check_failure(config, "part_config")
         check_failure(config, "evaluation_frequency")
@@ -400,6 +411,14 @@ def create_train_config(tmp_path, file_name):
         "n_epochs": 10,
         "batch_size": 64,
         "eval_batch_size": 128,
+        "num_prefetch_batches": 4,
+        "sample_cache_variants": 2,
+        "sample_cache_refresh": 4,
+        "sample_cache_path": "/tmp/sample_cache",
+        "feat_cache_size": 512,
+        "feat_cache_policy": "frequency",
+        "fuse_node_feats": True,
+        "node_feat_dtype": "bfloat16",
         "wd_l2norm": 0.1,
         "alpha_l2norm": 0.00001,
         "evaluation_frequency": 1000,
@@ -438,6 +457,13 @@ def create_train_config(tmp_path, file_name):
         "n_epochs": -1,
         "batch_size": 0,
         "eval_batch_size": 0,
+        "num_prefetch_batches": -1,
+        "sample_cache_variants": -1,
+        "sample_cache_refresh": -1,
+        "feat_cache_size": -1,
+        "feat_cache_policy": "lru",
+        "fuse_node_feats": "error",
+        "node_feat_dtype": "int8",
         "sparse_lr": 0.,
         "use_node_embeddings": True,
         "use_self_loop": "error",
@@ -476,6 +502,14 @@ def test_train_info():
         config._batch_size = 32
         assert config.batch_size == 32
         assert config.eval_batch_size == 32
+        assert config.num_prefetch_batches == 0
+        assert config.sample_cache_variants == 0
+        assert config.sample_cache_refresh == 0
+        assert config.sample_cache_path is None
+        assert config.feat_cache_size == 0
+        assert config.feat_cache_policy == "degree"
+        assert config.fuse_node_feats == False
+        assert config.node_feat_dtype is None
         assert config.wd_l2norm == 0
         assert config.alpha_l2norm == 0
         assert config.topk_model_to_save == math.inf
@@ -493,6 +527,14 @@ def test_train_info():
         assert config.n_epochs == 10
         assert config.batch_size == 64
         assert config.eval_batch_size == 128
+        assert config.num_prefetch_batches == 4
+        assert config.sample_cache_variants == 2
+        assert config.sample_cache_refresh == 4
+        assert config.sample_cache_path == "/tmp/sample_cache"
+        assert config.feat_cache_size == 512
+        assert config.feat_cache_policy == "frequency"
+        assert config.fuse_node_feats == True
+        assert config.node_feat_dtype == th.bfloat16
         assert config.wd_l2norm == 0.1
         assert config.alpha_l2norm == 0.00001
         assert config.topk_model_to_save == 3
@@ -518,6 +560,13 @@ def test_train_info():
         check_failure(config, "n_epochs")
         check_failure(config, "batch_size")
         check_failure(config, "eval_batch_size")
+        check_failure(config, "num_prefetch_batches")
+        check_failure(config, "sample_cache_variants")
+        check_failure(config, "sample_cache_refresh")
+        check_failure(config, "feat_cache_size")
+        check_failure(config, "feat_cache_policy")
+        check_failure(config, "fuse_node_feats")
+        check_failure(config, "node_feat_dtype")
         check_failure(config, "sparse_lr")
         assert config.use_node_embeddings == True
         check_failure(config, "use_self_loop")
@@ -1052,6 +1101,8 @@ def create_lp_config(tmp_path, file_name):
         "lp_loss_func": BUILTIN_LP_LOSS_LOGSIGMOID_RANKING,
         "eval_metric": "MRR",
         "use_dot_product": True,
+        "fixed_eval_negatives": True,
+        "eval_negative_cache_path": "/tmp/eval_negatives",
     }
     # config for check default value
     with open(os.path.join(tmp_path, file_name+"1.yaml"), "w") as f:
@@ -1080,6 +1131,7 @@ def create_lp_config(tmp_path, file_name):
         "reverse_edge_types_map": "query,exactmatch,rev-exactmatch,asin",
         "lp_loss_func": "unknown",
         "use_dot_product": "false",
+        "fixed_eval_negatives": "false",
     }
     # config for check default value
     with open(os.path.join(tmp_path, file_name+"_fail1.yaml"), "w") as f:
@@ -1120,6 +1172,8 @@ def test_lp_info():
         assert config.num_negative_edges == 16
         assert config.num_negative_edges_eval == 1000
         assert config.use_dot_product == False
+        assert config.fixed_eval_negatives == False
+        assert config.eval_negative_cache_path == None
         assert config.train_etype == None
         assert config.eval_etype == None
         assert config.separate_eval == False
@@ -1137,6 +1191,8 @@ def test_lp_info():
         assert config.num_negative_edges == 4
         assert config.num_negative_edges_eval == 100
         assert config.use_dot_product == True
+        assert config.fixed_eval_negatives == True
+        assert config.eval_negative_cache_path == "/tmp/eval_negatives"
         assert len(config.train_etype) == 1
         assert config.train_etype[0] == ("query", "exactmatch", "asin")
         assert len(config.eval_etype) == 1
@@ -1177,6 +1233,7 @@ def test_lp_info():
         check_failure(config, "reverse_edge_types_map")
         check_failure(config, "lp_loss_func")
         check_failure(config, "use_dot_product")
+        check_failure(config, "fixed_eval_negatives")
 
         args = Namespace(yaml_config_file=os.path.join(Path(tmpdirname), 'lp_test_fail2.yaml'), local_rank=0)
         config = GSConfig(args)
@@ -1204,7 +1261,11 @@ def create_gnn_config(tmp_path, file_name):
         "fanout": "10,20,30",
         "n_layers": 3,
         "n_hidden": 128,
-        "mini_batch_infer": False
+        "mini_batch_infer": False,
+        "double_buffer_infer": True,
+        "emb_dtype": "float16",
+        "reuse_infer_blocks": True,
+        "infer_block_cache_path": "/tmp/infer_blocks"
     }
     with open(os.path.join(tmp_path, file_name+"1.yaml"), "w") as f:
         yaml.dump(yaml_object, f)
@@ -1261,7 +1322,11 @@ def create_gnn_config(tmp_path, file_name):
         "eval_fanout": "error",
         "n_hidden": 0,
         "n_layers": 0,
-        "mini_batch_infer": "error"
+        "mini_batch_infer": "error",
+        "double_buffer_infer": "error",
+        "emb_dtype": "float64",
+        "reuse_infer_blocks": "error",
+        "infer_block_cache_path": "/tmp/infer_blocks"
     }
     with open(os.path.join(tmp_path, file_name+"_error1.yaml"), "w") as f:
         yaml.dump(yaml_object, f)
@@ -1290,6 +1355,10 @@ def test_gnn_info():
         assert config.n_layers == 3
         assert config.n_hidden == 128
         assert config.mini_batch_infer == False
+        assert config.double_buffer_infer == True
+        assert config.emb_dtype == th.float16
+        assert config.reuse_infer_blocks == True
+        assert config.infer_block_cache_path == "/tmp/infer_blocks"
 
         args = Namespace(yaml_config_file=os.path.join(Path(tmpdirname), 'gnn_test2.yaml'),
                          local_rank=0)
@@ -1339,6 +1408,10 @@ def test_gnn_info():
         assert config.n_layers == 0 # lm model does not need n layers
         check_failure(config, "n_hidden") # lm model may not need n hidden
         assert config.mini_batch_infer == True
+        assert config.double_buffer_infer == False
+        assert config.emb_dtype == th.float32
+        assert config.reuse_infer_blocks == False
+        assert config.infer_block_cache_path is None
         check_failure(config, "fanout") # fanout must be provided if used
         check_failure(config, "eval_fanout")
 
@@ -1351,6 +1424,10 @@ def test_gnn_info():
         check_failure(config, "n_hidden")
         check_failure(config, "n_layers")
         check_failure(config, "mini_batch_infer")
+        check_failure(config, "double_buffer_infer")
+        check_failure(config, "emb_dtype")
+        check_failure(config, "reuse_infer_blocks")
+        check_failure(config, "infer_block_cache_path")
 
         args = Namespace(yaml_config_file=os.path.join(Path(tmpdirname), 'gnn_test_error2.yaml'),
                          local_rank=0)
@@ -1389,11 +1466,28 @@ def create_io_config(tmp_path, file_name):
         "save_model_per_iters": 100,
         "save_embed_path": "./save_emb",
         "save_predict_path": "./prediction",
+        "layer_embed_path": "./layer_emb",
+        "incremental_changes": os.path.join(tmp_path, "changes.pt"),
     }
 
     with open(os.path.join(tmp_path, file_name+"2.yaml"), "w") as f:
         yaml.dump(yaml_object, f)
 
+    yaml_object["gsf"]["output"] = {
+        "incremental_changes": os.path.join(tmp_path, "changes.pt"),
+    }
+
+    with open(os.path.join(tmp_path, file_name+"_fail.yaml"), "w") as f:
+        yaml.dump(yaml_object, f)
+
+    yaml_object["gsf"]["output"] = {
+        "layer_embed_path": "./layer_emb",
+        "incremental_changes": os.path.join(tmp_path, "missing.pt"),
+    }
+
+    with open(os.path.join(tmp_path, file_name+"_fail2.yaml"), "w") as f:
+        yaml.dump(yaml_object, f)
+
 def test_load_io_info():
     import tempfile
     with tempfile.TemporaryDirectory() as tmpdirname:
@@ -1406,6 +1500,8 @@ def test_load_io_info():
         assert config.save_model_path == None
         assert config.save_model_per_iters == -1
         assert config.save_embed_path == None
+        assert config.layer_embed_path == None
+        assert config.incremental_changes == None
 
         args = Namespace(yaml_config_file=os.path.join(Path(tmpdirname), 'io_test.yaml'),
                          local_rank=0)
@@ -1417,11 +1513,24 @@ def test_load_io_info():
         assert config.save_embed_path == "./save_emb"
         assert config.save_predict_path == "./save_emb"
 
+        th.save({"nodes": {}, "edges": {}}, os.path.join(tmpdirname, "changes.pt"))
         args = Namespace(yaml_config_file=os.path.join(Path(tmpdirname), 'io_test2.yaml'),
                          local_rank=0)
         config = GSConfig(args)
         assert config.save_embed_path == "./save_emb"
         assert config.save_predict_path == "./prediction"
+        assert config.layer_embed_path == "./layer_emb"
+        assert config.incremental_changes == os.path.join(tmpdirname, "changes.pt")
+
+        args = Namespace(yaml_config_file=os.path.join(Path(tmpdirname), 'io_test_fail.yaml'),
+                         local_rank=0)
+        config = GSConfig(args)
+        check_failure(config, "incremental_changes")
+
+        args = Namespace(yaml_config_file=os.path.join(Path(tmpdirname), 'io_test_fail2.yaml'),
+                         local_rank=0)
+        config = GSConfig(args)
+        check_failure(config, "incremental_changes")
 
 def create_lm_config(tmp_path, file_name):
     yaml_object = create_dummpy_config_obj()
@@ -16,6 +16,7 @@
 import os
 import tempfile
 import numpy as np
+import torch as th
 import graphstorm as gs
 
 def test_parquet():
@@ -34,6 +35,68 @@ def test_parquet():
     assert np.all(data1['data1'] == data['data1'])
     assert np.all(data1['data2'] == data['data2'])
 
+    # Matrices are stored as fixed-size lists in Parquet.
+    import pyarrow.parquet as pq
+    import pyarrow as pa
+    schema = pq.read_schema(tmpfile)
+    assert pa.types.is_fixed_size_list(schema.field("data1").type)
+
+    # Only read the requested columns.
+    data1 = read_data_parquet(tmpfile, data_fields=['data1'])
+    assert len(data1) == 1
+    assert "data1" in data1
+    assert np.all(data1['data1'] == data['data1'])
+
+    # Read the matrices stored as variable-length lists.
+    arr = [data['data1'][i] for i in range(len(data['data1']))]
+    table = pa.Table.from_arrays([arr, data['data2']], names=['data1', 'data2'])
+    pq.write_table(table, tmpfile)
+    data1 = read_data_parquet(tmpfile)
+    assert data1['data1'].shape == data['data1'].shape
+    assert np.all(data1['data1'] == data['data1'])
+    assert np.all(data1['data2'] == data['data2'])
+    os.remove(tmpfile)
+
+def test_csv_json():
+    from graphstorm.gconstruct.construct_graph import parse_file_format
+
+    ids = np.arange(100)
+    vals = np.random.rand(100)
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        csv_file = os.path.join(tmpdirname, "data.csv")
+        with open(csv_file, "w") as f:
+            f.write("id|val|text\n")
+            for i, val in zip(ids, vals):
+                f.write("{}|{!r}|text{}\n".format(i, val, i))
+        json_file = os.path.join(tmpdirname, "data.json")
+        with open(json_file, "w") as f:
+            for i, val in zip(ids, vals):
+                f.write('{{"id": {}, "val": {!r}, "emb": [{}, {}]}}\n'.format(i, val, i, i + 1))
+
+        read_csv = parse_file_format({"name": "csv", "separator": "|",
+                                      "schema": {"id": "string"}})
+        data = list(read_csv(csv_file))
+        assert len(data) == 1
+        assert np.all(data[0]["id"] == ids.astype(str))
+        assert np.all(data[0]["val"] == vals)
+        assert np.all(data[0]["text"] == np.array(["text{}".format(i) for i in ids]))
+        chunks = list(read_csv(csv_file, ["id", "val"], chunk_size=30))
+        assert [len(chunk["id"]) for chunk in chunks] == [30, 30, 30, 10]
+        assert all(len(chunk) == 2 for chunk in chunks)
+        assert np.all(np.concatenate([chunk["val"] for chunk in chunks]) == vals)
+
+        read_json = parse_file_format({"name": "json", "schema": {"id": "int32"}})
+        data = list(read_json(json_file))
+        assert len(data) == 1
+        assert data[0]["id"].dtype == np.int32
+        assert np.all(data[0]["id"] == ids)
+        assert np.all(data[0]["val"] == vals)
+        assert data[0]["emb"].shape == (100, 2)
+        assert np.all(data[0]["emb"][:, 1] == ids + 1)
+        chunks = list(read_json(json_file, ["emb"], chunk_size=40))
+        assert [len(chunk["emb"]) for chunk in chunks] == [40, 40, 20]
+        assert np.all(np.concatenate([chunk["emb"] for chunk in chunks]) == data[0]["emb"])
+
 def test_feat_ops():
     from graphstorm.gconstruct import parse_feat_ops, process_features
 
@@ -89,6 +152,121 @@ def test_feat_ops():
     assert "attention_mask" in proc_res
     assert "token_type_ids" in proc_res
 
+def test_tokenizer():
+    from transformers import BertTokenizer, BertTokenizerFast
+    from graphstorm.gconstruct.construct_graph import Tokenizer
+
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        vocab_file = os.path.join(tmpdirname, "vocab.txt")
+        with open(vocab_file, "w") as f:
+            f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]",
+                               "hello", "world", "graph"]))
+        slow_tokenizer = BertTokenizer(vocab_file)
+        fast_tokenizer = BertTokenizerFast(vocab_file)
+        no_type_tokenizer = BertTokenizerFast(
+            vocab_file, model_input_names=["input_ids", "attention_mask"])
+
+    strs = np.array(["hello world", "graph", "hello world hello world graph", ""],
+                    dtype=object)
+    # Tokenize in batches that don't divide the number of strings.
+    tokens = Tokenizer(fast_tokenizer, 6, batch_size=3)(strs)
+    for i, s in enumerate(strs):
+        t = slow_tokenizer(s, max_length=6, truncation=True, padding='max_length',
+                           return_tensors='pt')
+        assert np.all(tokens['token_ids'][i].numpy() == t['input_ids'][0].numpy())
+        assert np.all(tokens['attention_mask'][i].numpy() == t['attention_mask'][0].numpy())
+        assert np.all(tokens['token_type_ids'][i].numpy() == t['token_type_ids'][0].numpy())
+    assert tokens['token_ids'].dtype == th.int64
+
+    # The token type IDs are zeros if the tokenizer doesn't return them.
+    no_type_tokens = Tokenizer(no_type_tokenizer, 6, batch_size=3)(strs)
+    assert np.all(no_type_tokens['token_ids'].numpy() == tokens['token_ids'].numpy())
+    assert np.all(no_type_tokens['token_type_ids'].numpy() == 0)
+
+    compact_tokens = Tokenizer(fast_tokenizer, 6, batch_size=2,
+                               token_dtype='int16', compact=True)(strs)
+    assert len(compact_tokens) == 2
+    assert compact_tokens['token_ids'].dtype == th.int16
+    assert np.all(compact_tokens['token_ids'].numpy() == tokens['token_ids'].numpy())
+    assert np.all(compact_tokens['valid_len'].numpy()
+                  == tokens['attention_mask'].numpy().sum(axis=1))
+
+def test_two_phase_transforms():
+    from graphstorm.gconstruct.construct_graph import parse_feat_ops, process_features
+    from graphstorm.gconstruct.construct_graph import collect_feat_stats, apply_feat_stats
+
+    confs = [
+        {"feature_col": "num", "feature_name": "max_min",
+         "transform": {"name": "max_min_norm"}},
+        {"feature_col": "num", "feature_name": "standard",
+         "transform": {"name": "standard_norm"}, "data_type": "float16"},
+        {"feature_col": "cat", "feature_name": "one_hot",
+         "transform": {"name": "to_categorical"}},
+        {"feature_col": "cat", "feature_name": "cat_id",
+         "transform": {"name": "to_categorical", "output": "id"}},
+    ]
+    data = {"num": np.random.rand(100, 3) * 10,
+            "cat": np.random.choice(np.array(["a", "b", "c", "d"], dtype=object), 100)}
+    # Each half of the data is processed by a different worker.
+    type_data = {}
+    type_stats = []
+    for part in [slice(0, 40), slice(40, 100)]:
+        ops = parse_feat_ops(confs)
+        feats = process_features({key: val[part] for key, val in data.items()}, ops)
+        type_stats.append(collect_feat_stats({key: [val] for key, val in feats.items()}, ops))
+        for key, val in feats.items():
+            type_data.setdefault(key, []).append(val)
+    apply_feat_stats(type_data, type_stats, parse_feat_ops(confs))
+    res = {key: np.concatenate(val) for key, val in type_data.items()}
+
+    num = data["num"]
+    max_min = (num - num.min(axis=0)) / (num.max(axis=0) - num.min(axis=0))
+    assert np.allclose(res["max_min"], max_min)
+    assert res["standard"].dtype == np.float16
+    assert np.allclose(res["standard"], (num - num.mean(axis=0)) / num.std(axis=0), atol=1e-2)
+    vocab = np.unique(data["cat"].astype(str))
+    assert res["one_hot"].shape == (100, len(vocab))
+    assert np.all(vocab[res["cat_id"]] == data["cat"].astype(str))
+    assert np.all(np.argmax(res["one_hot"], axis=1) == res["cat_id"])
+
+    # The statistics provided in the configuration are used directly.
+    ops = parse_feat_ops([
+        {"feature_col": "num", "feature_name": "max_min",
+         "transform": {"name": "max_min_norm", "max_val": 5, "min_val": 0}},
+        {"feature_col": "cat", "feature_name": "cat_id",
+         "transform": {"name": "to_categorical", "mapping": ["b", "a"], "output": "id"}},
+    ])
+    res = process_features(data, ops)
+    assert np.all(res["max_min"] == np.clip(num / 5, 0, 1).astype(np.float32))
+    # The vocabulary provided by users keeps its order.
+    cat_id = np.array([{"b": 0, "a": 1}.get(val, -1) for val in data["cat"]])
+    assert np.all(res["cat_id"] == cat_id)
+
+def test_stateless_transforms():
+    from graphstorm.gconstruct.construct_graph import parse_feat_ops, process_features
+
+    data = {"num": np.array([-1, 0, 2.5, 5, 9.9, 10, 20]),
+            "str": np.array(["x", "y", "x", "z", "y", "x", "w"], dtype=object),
+            "col1": np.arange(7), "col2": np.arange(7) * 2}
+    ops = parse_feat_ops([
+        {"feature_col": "num", "feature_name": "bucket",
+         "transform": {"name": "bucket_numerical", "range": [0, 10], "bucket_cnt": 4}},
+        {"feature_col": "str", "feature_name": "hash",
+         "transform": {"name": "feature_hash", "num_buckets": 3}},
+        {"feature_col": "col1", "feature_name": "int_hash",
+         "transform": {"name": "feature_hash", "num_buckets": 5}},
+        {"feature_col": ["col1", "col2"], "feature_name": "cols", "data_type": "int8"},
+    ])
+    res = process_features(data, ops)
+    assert np.all(np.argmax(res["bucket"], axis=1) == np.array([0, 0, 1, 2, 3, 3, 3]))
+    assert np.all(res["bucket"].sum(axis=1) == 1)
+    # The same values have the same hash.
+    assert res["hash"][0] == res["hash"][2] == res["hash"][5]
+    assert np.all((res["hash"] >= 0) & (res["hash"] < 3))
+    assert np.all((res["int_hash"] >= 0) & (res["int_hash"] < 5))
+    assert res["cols"].dtype == np.int8
+    assert np.all(res["cols"] == np.stack([data["col1"], data["col2"]], axis=1))
+
 def test_label():
     from graphstorm.gconstruct import process_labels
     data = {
@@ -110,7 +288,243 @@ def test_label():
     assert np.sum(res['val_mask']) == 1
     assert np.sum(res['test_mask']) == 1
 
+def test_id_map():
+    from graphstorm.gconstruct import IdMap
+    # Test integer IDs.
+    ids = np.random.permutation(100) * 3
+    id_map = IdMap(ids)
+    assert len(id_map) == len(ids)
+    query = np.random.choice(ids, 50)
+    new_ids = id_map.map_id(query)
+    assert np.all(ids[new_ids] == query)
+
+    # Test string IDs.
+    str_ids = np.array([str(i) for i in ids], dtype=object)
+    id_map = IdMap(str_ids)
+    new_ids = id_map.map_id(np.array([str(i) for i in query], dtype=object))
+    assert np.all(ids[new_ids] == query)
+
+    # Unknown IDs are reported together.
+    new_ids, found = id_map.find_ids(np.array(["1", "3", "abc"]))
+    assert np.sum(found) == 1
+    try:
+        id_map.map_id(np.array(["1", "abc"]))
+        assert False, "Unknown IDs should be reported."
+    except ValueError:
+        pass
+
+    # The IDs of a different type are rejected.
+    try:
+        id_map.map_id(query)
+        assert False, "Integer IDs can't be looked up in a map of string IDs."
+    except AssertionError as e:
+        assert "can't be looked up" in str(e)
+    # Signed and unsigned integers can be looked up in the same ID map.
+    int_map = IdMap(ids)
+    assert np.all(int_map.map_id(query.astype(np.uint32)) == int_map.map_id(query))
+
+    # Test saving and loading the ID map.
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        id_map.save(tmpdirname)
+        id_map1 = IdMap.load(tmpdirname)
+        assert len(id_map1) == len(id_map)
+        new_ids = id_map1.map_id(np.array([str(i) for i in query]))
+        assert np.all(ids[new_ids] == query)
+
+def test_parse_data_chunks():
+    from graphstorm.gconstruct import write_data_parquet, IdMap
+    from graphstorm.gconstruct.construct_graph import read_data_parquet_chunks
+    from graphstorm.gconstruct.construct_graph import parse_node_data, parse_edge_data
+
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        node_file = os.path.join(tmpdirname, "node.parquet")
+        node_ids = np.random.permutation(100) + 1000
+        data = {
+            "id": node_ids,
+            "feat": np.random.rand(100, 4),
+            "label": np.random.randint(5, size=100),
+        }
+        write_data_parquet(data, node_file)
+        chunks = list(read_data_parquet_chunks(node_file, ["id", "feat"], chunk_size=30))
+        assert len(chunks) == 4
+        assert len(chunks[0]) == 2
+        assert np.all(np.concatenate([chunk["id"] for chunk in chunks]) == node_ids)
+        assert np.all(np.concatenate([chunk["feat"] for chunk in chunks]) == data["feat"])
+
+        feat_ops = [("feat", "feat", None, None)]
+        label_conf = [{"label_col": "label", "task_type": "classification",
+                       "split_type": [0.8, 0.1, 0.1]}]
+        ids, feat_data = parse_node_data(node_file, feat_ops, "id", label_conf,
+                                         read_data_parquet_chunks, chunk_size=30)
+        # The chunks are kept separately until the data of a type are written.
+        assert len(ids) == 4
+        assert len(feat_data["feat"]) == 4
+        assert np.all(np.concatenate(ids) == node_ids)
+        assert np.all(np.concatenate(feat_data["feat"]) == data["feat"])
+        assert np.all(np.concatenate(feat_data["label"]) == data["label"])
+        assert np.sum(np.concatenate(feat_data["train_mask"])) == 80
+
+        edge_file = os.path.join(tmpdirname, "edge.parquet")
+        src = np.random.choice(node_ids, 200)
+        dst = np.random.choice(node_ids, 200)
+        write_data_parquet({"src": src, "dst": dst}, edge_file)
+        id_map = {"node": IdMap(node_ids)}
+        src_ids, dst_ids, _ = parse_edge_data(edge_file, None, "src", "dst",
+                                              ("node", "rel", "node"), id_map, None,
+                                              read_data_parquet_chunks, chunk_size=64)
+        assert len(src_ids) == 4
+        assert np.all(node_ids[np.concatenate(src_ids)] == src)
+        assert np.all(node_ids[np.concatenate(dst_ids)] == dst)
+
+def test_worker_result():
+    from graphstorm.gconstruct.utils import save_worker_result, load_worker_result
+
+    result = (np.array(["a", "bb", "ccc"], dtype=object),
+              {"feat": np.random.rand(3, 4), "label": np.arange(3)},
+              [np.arange(2), np.arange(3)])
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        meta = save_worker_result(result, tmpdirname)
+        # Only the file paths are returned.
+        assert isinstance(meta[0], str)
+        assert isinstance(meta[1]["feat"], str)
+        ids, data, chunks = load_worker_result(meta)
+        assert np.all(ids == result[0])
+        assert len(chunks) == 2
+        assert np.all(chunks[1] == result[2][1])
+        assert isinstance(data["feat"], np.memmap)
+        assert np.all(data["feat"] == result[1]["feat"])
+        assert np.all(data["label"] == result[1]["label"])
+
+def test_construction_cache():
+    from graphstorm.gconstruct.utils import get_cache_key, save_worker_result
+    from graphstorm.gconstruct.utils import load_cached_result, save_cached_result
+    from graphstorm.gconstruct.utils import load_worker_result, fingerprint_array
+    from graphstorm.gconstruct import utils
+
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        in_file = os.path.join(tmpdirname, "input.npy")
+        np.save(in_file, np.arange(10))
+        conf = {"node_type": "n1", "node_id_col": "id"}
+        key = get_cache_key(in_file, conf)
+        assert key == get_cache_key(in_file, conf)
+        # The key changes if the configuration changes.
+        assert key != get_cache_key(in_file, {"node_type": "n2", "node_id_col": "id"})
+        # The key changes if the cache format changes.
+        utils.CACHE_FORMAT_VERSION += 1
+        try:
+            assert key != get_cache_key(in_file, conf)
+        finally:
+            utils.CACHE_FORMAT_VERSION -= 1
+        cache_dir = os.path.join(tmpdirname, "cache")
+        assert load_cached_result(cache_dir, key) is None
+
+        result = (np.arange(10), {"feat": np.random.rand(10, 2)})
+        meta = save_worker_result(result, os.path.join(cache_dir, key))
+        # The result isn't reused until its metadata is saved.
+        assert load_cached_result(cache_dir, key) is None
+        save_cached_result(cache_dir, key, meta)
+        ids, data = load_worker_result(load_cached_result(cache_dir, key))
+        assert np.all(ids == result[0])
+        assert np.all(data["feat"] == result[1]["feat"])
+
+        # The key changes if the file is modified.
+        np.save(in_file, np.arange(20))
+        os.utime(in_file, ns=(0, 0))
+        assert key != get_cache_key(in_file, conf)
+
+    ids = np.array(["a", "b", "c"])
+    assert fingerprint_array(ids) == fingerprint_array(ids.copy())
+    assert fingerprint_array(ids) != fingerprint_array(np.array(["a", "b", "d"]))
+
+def _sum_file(in_file, scale):
+    return np.load(in_file).sum() * scale
+
+def test_worker_pool():
+    from graphstorm.gconstruct.utils import WorkerPool
+
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        tasks = []
+        for i in range(5):
+            in_file = os.path.join(tmpdirname, "{}.npy".format(i))
+            # The files have different sizes.
+            np.save(in_file, np.arange(i * 100))
+            tasks.append((("test", i), in_file, _sum_file, (in_file, 2)))
+        for num_processes in [1, 2]:
+            pool = WorkerPool(num_processes)
+            res = pool.run(tasks)
+            pool.close()
+            assert len(res) == 5
+            for i in range(5):
+                assert res[("test", i)] == np.arange(i * 100).sum() * 2
+
+def test_write_dist_partitions():
+    import dgl
+    from graphstorm.gconstruct.partition import write_dist_partitions
+
+    num_nodes = {"n1": 100, "n2": 50}
+    edges = {("n1", "r1", "n2"): (np.random.randint(100, size=500),
+                                  np.random.randint(50, size=500)),
+             ("n2", "r2", "n1"): (np.random.randint(50, size=200),
+                                  np.random.randint(100, size=200))}
+    node_data = {"n1": {"feat": np.random.rand(100, 3), "label": np.arange(100)}}
+    edge_data = {("n1", "r1", "n2"): {"weight": np.arange(500)}}
+    for part_method in ["random", "hash"]:
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            workspace = os.path.join(tmpdirname, "workspace")
+            os.makedirs(workspace)
+            out_dir = os.path.join(tmpdirname, "out")
+            # Use a small buffer so that the data are scattered in multiple blocks.
+            node_orders = write_dist_partitions("test", 2, out_dir, workspace, num_nodes,
+                                                edges, node_data, edge_data,
+                                                part_method=part_method, buffer_size=64)
+            part_config = os.path.join(out_dir, "test.json")
+            feats = {}
+            num_edges = {etype: 0 for etype in edges}
+            for part_id in range(2):
+                part, node_feats, edge_feats, gpb, _, _, etypes = \
+                        dgl.distributed.load_partition(part_config, part_id)
+                inner_nodes = part.ndata[dgl.NID][part.ndata['inner_node'].bool()]
+                assert np.all(gpb.nid2partid(inner_nodes).numpy() == part_id)
+                for key, val in node_feats.items():
+                    feats.setdefault(key, []).append(val.numpy())
+                for key, val in edge_feats.items():
+                    feats.setdefault(key, []).append(val.numpy())
+                src, dst = part.edges()
+                src = part.ndata[dgl.NID][src]
+                dst = part.ndata[dgl.NID][dst]
+                for etype_id, etype in enumerate(etypes):
+                    mask = part.edata[dgl.ETYPE] == etype_id
+                    # An edge is in the partition of its destination node.
+                    assert np.all(gpb.nid2partid(dst[mask]).numpy() == part_id)
+                    _, src_ids = gpb.map_to_per_ntype(src[mask])
+                    _, dst_ids = gpb.map_to_per_ntype(dst[mask])
+                    orig_src = node_orders[etype[0]][src_ids.numpy()]
+                    orig_dst = node_orders[etype[2]][dst_ids.numpy()]
+                    orig_edges = set(zip(*edges[etype]))
+                    assert all((s, d) in orig_edges for s, d in zip(orig_src, orig_dst))
+                    if etype == ("n1", "r1", "n2"):
+                        weights = edge_feats["n1:r1:n2/weight"].numpy()
+                        assert np.all(edges[etype][0][weights] == orig_src)
+                        assert np.all(edges[etype][1][weights] == orig_dst)
+                    num_edges[etype] += int(mask.sum())
+            for etype in edges:
+                assert num_edges[etype] == len(edges[etype][0])
+            # The node data are reordered by the new node IDs.
+            assert np.all(np.concatenate(feats["n1/feat"]) \
+                    == node_data["n1"]["feat"][node_orders["n1"]])
+            assert np.all(np.concatenate(feats["n1/label"]) == node_orders["n1"])
+
 if __name__ == '__main__':
     test_parquet()
+    test_csv_json()
     test_feat_ops()
+    test_tokenizer()
+    test_two_phase_transforms()
+    test_stateless_transforms()
     test_label()
+    test_id_map()
+    test_parse_data_chunks()
+    test_worker_result()
+    test_worker_pool()
+    test_construction_cache()
+    test_write_dist_partitions()
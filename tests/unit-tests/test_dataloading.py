@@ -15,6 +15,10 @@
 
     Test functions and classes in the dataloading.py
 """
+import os
+import json
+import math
+import multiprocessing as mp
 import tempfile
 import numpy as np
 
@@ -28,10 +32,22 @@ from graphstorm.dataloading import GSgnnEdgeTrainData, GSgnnEdgeInferData
 from graphstorm.dataloading import GSgnnAllEtypeLinkPredictionDataLoader
 from graphstorm.dataloading import GSgnnNodeDataLoader, GSgnnEdgeDataLoader
 from graphstorm.dataloading import GSgnnLinkPredictionDataLoader
+from graphstorm.dataloading import GSgnnLPLocalDegreeNegDataLoader
+from graphstorm.dataloading import GSgnnLPJointLocalDegreeNegDataLoader
 from graphstorm.dataloading import GSgnnLinkPredictionTestDataLoader
 from graphstorm.dataloading import GSgnnLinkPredictionJointTestDataLoader
 from graphstorm.dataloading import BUILTIN_LP_UNIFORM_NEG_SAMPLER
 from graphstorm.dataloading import BUILTIN_LP_JOINT_NEG_SAMPLER
+from graphstorm.dataloading.dataloading import _PrefetchIterator, AllEtypeDistEdgeDataLoader
+from graphstorm.dataloading.dataloading import _GroupedEdgeCollator
+from graphstorm.dataloading.dataloading import GSgnnDataLoaderBase
+from graphstorm.dataloading.sampler import build_alias_table, sample_alias_table
+from graphstorm.dataloading.sampler import LocalDegree, JointLocalDegree, InBatch
+from graphstorm.dataloading.utils import get_local_first_plan, split_local_first
+from graphstorm.dataloading.utils import get_part_targets
+from graphstorm.dataloading.sample_cache import SampleCache, pack_batch, unpack_batch
+from graphstorm.dataloading.feat_cache import NodeFeatCache, select_cached_nodes
+from graphstorm.dataloading.dataset import fuse_node_feats, prepare_batch_input, SplitCache
 
 from numpy.testing import assert_equal
 
@@ -261,6 +277,400 @@ def test_GSgnnAllEtypeLinkPredictionDataLoader(batch_size):
         assert ("n0", "r0", "n1") in etypes
     th.distributed.destroy_process_group()
 
+def test_all_etype_dist_edge_dataloader():
+    # initialize the torch distributed environment
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23456',
+                                      rank=0,
+                                      world_size=1)
+
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        # get the test dummy distributed graph
+        g, _ = generate_dummy_dist_graph(graph_name='dummy', dirname=tmpdirname)
+
+    etypes = [("n0", "r1", "n1"), ("n0", "r0", "n1")]
+    target_idx = {etypes[0]: th.arange(10), etypes[1]: th.arange(100)}
+    dataloader = AllEtypeDistEdgeDataLoader(g, target_idx,
+                                            dgl.dataloading.MultiLayerFullNeighborSampler(1),
+                                            batch_size=16, shuffle=True, drop_last=False)
+    assert dataloader.expected_idxs == 7
+    for _ in range(2):
+        num_batches = 0
+        eids = {etype: [] for etype in etypes}
+        for _, pos_graph, _ in dataloader:
+            num_batches += 1
+            for etype in etypes:
+                # Every mini-batch has the edges of all edge types.
+                assert pos_graph.num_edges(etype) > 0
+                eids[etype].append(pos_graph.edges[etype].data[dgl.EID])
+        assert num_batches == 7
+        # The exhausted edge type is padded with random edges.
+        eids = {etype: th.cat(eids[etype]) for etype in etypes}
+        assert len(eids[etypes[0]]) > 10
+        for etype in etypes:
+            assert_equal(th.unique(eids[etype]).numpy(), target_idx[etype].numpy())
+
+    # The grouped edge IDs are collated in the same way as the (etype, eid) pairs.
+    def neg_sampler(g, eids):
+        return {etype: (g.find_edges(ids, etype=etype)[0], ids % 10) \
+                for etype, ids in eids.items()}
+    sampler = dgl.dataloading.MultiLayerFullNeighborSampler(1)
+    collator = _GroupedEdgeCollator(g, target_idx, sampler, negative_sampler=neg_sampler,
+                                    exclude='self')
+    dgl_collator = dgl.dataloading.EdgeCollator(g, target_idx, sampler,
+                                                negative_sampler=neg_sampler, exclude='self')
+    batch = {etypes[0]: th.arange(3, 6), etypes[1]: th.arange(20, 30)}
+    input_nodes, pos_graph, neg_graph, blocks = collator.collate(batch)
+    dgl_input_nodes, dgl_pos_graph, dgl_neg_graph, dgl_blocks = dgl_collator.collate(
+        [(etype, eid) for etype, eids in batch.items() for eid in eids.tolist()])
+    for ntype in g.ntypes:
+        assert_equal(input_nodes[ntype].numpy(), dgl_input_nodes[ntype].numpy())
+        assert_equal(pos_graph.nodes[ntype].data[dgl.NID].numpy(),
+                     dgl_pos_graph.nodes[ntype].data[dgl.NID].numpy())
+    for etype in etypes:
+        assert_equal(pos_graph.edges[etype].data[dgl.EID].numpy(), batch[etype].numpy())
+        for graph, dgl_graph in [(pos_graph, dgl_pos_graph), (neg_graph, dgl_neg_graph),
+                                 (blocks[0], dgl_blocks[0])]:
+            src, dst = graph.edges(etype=etype)
+            dgl_src, dgl_dst = dgl_graph.edges(etype=etype)
+            assert_equal(src.numpy(), dgl_src.numpy())
+            assert_equal(dst.numpy(), dgl_dst.numpy())
+        assert_equal(blocks[0].edges[etype].data[dgl.EID].numpy(),
+                     dgl_blocks[0].edges[etype].data[dgl.EID].numpy())
+
+    th.distributed.destroy_process_group()
+
+def test_alias_table():
+    weights = th.tensor([0., 1., 2., 3., 4., 100.])
+    prob, alias = build_alias_table(weights)
+    # The alias table keeps the distribution of the weights.
+    dist = prob.double() / len(weights)
+    dist = dist.index_add(0, alias, (1 - prob.double()) / len(weights))
+    assert th.allclose(dist, weights.double() / weights.sum())
+
+    samples = sample_alias_table(prob, alias, 100000)
+    assert th.all(samples != 0)
+    freq = th.bincount(samples, minlength=len(weights)) / len(samples)
+    assert th.allclose(freq, (weights / weights.sum()).float(), atol=0.01)
+
+    # All-zero weights fall back to the uniform distribution.
+    prob, alias = build_alias_table(th.zeros(3))
+    assert_equal(prob.numpy(), np.ones(3))
+
+def test_degree_negative_sampler():
+    # initialize the torch distributed environment
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23456',
+                                      rank=0,
+                                      world_size=1)
+
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        # get the test dummy distributed graph
+        g, _ = generate_dummy_dist_graph(graph_name='dummy', dirname=tmpdirname)
+
+    etype = ("n0", "r1", "n1")
+    eids = {etype: th.arange(10)}
+    src, _ = g.find_edges(eids[etype], etype=etype)
+    degs = th.zeros(g.number_of_nodes("n1"), dtype=th.int64)
+    for canonical_etype in g.canonical_etypes:
+        if canonical_etype[2] == "n1":
+            _, dst = g.find_edges(th.arange(g.number_of_edges(canonical_etype)),
+                                  etype=canonical_etype)
+            degs += th.bincount(dst, minlength=len(degs))
+    for sampler in [LocalDegree(4), JointLocalDegree(4)]:
+        neg_src, neg_dst = sampler(g, eids)[etype]
+        assert len(neg_src) == 40
+        assert len(neg_dst) == 40
+        assert_equal(neg_src.numpy(), src.repeat_interleave(4).numpy())
+        # The nodes without in-edges are never sampled.
+        assert th.all(degs[neg_dst] > 0)
+
+    neg_src, neg_dst = InBatch(4)(g, eids)[etype]
+    _, dst = g.find_edges(eids[etype], etype=etype)
+    assert_equal(neg_src.numpy(), src.repeat_interleave(4).numpy())
+    # The negative nodes come from the mini-batch and differ from the positive nodes.
+    assert np.all(np.isin(neg_dst.numpy(), dst.numpy()))
+    if len(th.unique(dst)) == len(dst):
+        assert th.all(neg_dst.reshape(10, 4) != dst.reshape(10, 1))
+    # A single edge has no other edges to be corrupted with.
+    neg_src, neg_dst = InBatch(4)(g, {etype: th.arange(1)})[etype]
+    assert len(neg_src) == 0
+    assert len(neg_dst) == 0
+
+    # The alias tables can be built in advance.
+    sampler = LocalDegree(4)
+    sampler.build_alias_tables(g, ["n0", "n1"])
+    nids, prob, alias = sampler._get_alias_table(g, "n1")
+    assert_equal(nids.numpy(), np.arange(g.number_of_nodes("n1")))
+    assert th.all(prob[degs == 0] == 0)
+    neg_src, neg_dst = sampler(g, eids)[etype]
+    assert th.all(degs[neg_dst] > 0)
+
+    th.distributed.destroy_process_group()
+
+def test_local_first_plan():
+    # 3 partitions with 2 trainers per partition.
+    plan = get_local_first_plan([10, 2, 6], 2)
+    sizes = [sum(end - start for _, start, end in slices) for slices in plan]
+    assert sizes == [3, 3, 3, 3, 3, 3]
+    # The trainers of the first partition keep 3 local targets and hand over the rest.
+    assert plan[0] == [(0, 0, 3)]
+    assert plan[1] == [(1, 0, 3)]
+    # The trainers of the second partition get their own targets first.
+    assert plan[2][0] == (2, 0, 1)
+    assert plan[3][0] == (3, 0, 1)
+    # Every target is assigned exactly once.
+    local_sizes = [5, 5, 1, 1, 3, 3]
+    for src, num in enumerate(local_sizes):
+        covered = np.zeros(num, dtype=np.int64)
+        for slices in plan:
+            for rank, start, end in slices:
+                if rank == src:
+                    covered[start:end] += 1
+        assert np.all(covered == 1)
+
+    # The remainder is dropped, so that all trainers get the same number of targets.
+    plan = get_local_first_plan([7], 2)
+    assert plan == [[(0, 0, 3)], [(1, 0, 3)]]
+    plan = get_local_first_plan([9, 0], 2)
+    assert plan == [[(0, 0, 2)], [(1, 0, 2)], [(0, 2, 4)], [(1, 2, 4)]]
+
+def test_split_local_first():
+    # initialize the torch distributed environment
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23456',
+                                      rank=0,
+                                      world_size=1)
+
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        # get the test dummy distributed graph
+        g, _ = generate_dummy_dist_graph(graph_name='dummy', dirname=tmpdirname)
+
+    pb = g.get_partition_book()
+    etype = ("n0", "r1", "n1")
+    train_idx = split_local_first(pb, etype=etype)
+    assert_equal(train_idx.numpy(), np.arange(g.number_of_edges(etype)))
+    mask = g.edges[etype].data['train_mask'][0:g.number_of_edges(etype)]
+    train_idx = split_local_first(pb, g.edges[etype].data['train_mask'], etype=etype)
+    assert_equal(train_idx.numpy(), th.nonzero(mask, as_tuple=True)[0].numpy())
+    mask = g.nodes['n1'].data['train_mask'][0:g.number_of_nodes('n1')]
+    train_idx = split_local_first(pb, g.nodes['n1'].data['train_mask'], ntype='n1')
+    assert_equal(train_idx.numpy(), th.nonzero(mask, as_tuple=True)[0].numpy())
+
+    # The masks are read from the local shard or pulled from the servers.
+    num_nodes = g.number_of_nodes('n1')
+    for mask in [g.nodes['n1'].data['val_mask'], g.nodes['n1'].data['val_mask'][0:num_nodes]]:
+        val_idx = get_part_targets(pb, pb.partid, mask, ntype='n1')
+        assert_equal(val_idx.numpy(),
+                     th.nonzero(mask[0:num_nodes], as_tuple=True)[0].numpy())
+
+    th.distributed.destroy_process_group()
+
+class _DummyPartitionBook():
+    def __init__(self, part_id, part_ends):
+        self.partid = part_id
+        self._part_ends = part_ends
+
+    def num_partitions(self):
+        return len(self._part_ends)
+
+    def partid2nids(self, part_id, ntype):
+        start = self._part_ends[part_id - 1] if part_id > 0 else 0
+        return th.arange(start, self._part_ends[part_id])
+
+def _run_split_local_first(rank, mask, conn):
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23457',
+                                      rank=rank,
+                                      world_size=2)
+    pb = _DummyPartitionBook(rank, [60, 100])
+    conn.send(split_local_first(pb, mask, ntype='n1').numpy())
+    th.distributed.destroy_process_group()
+
+def test_split_local_first_multi_ranks():
+    # The partition 0 has 40 targets and the partition 1 has 11 targets.
+    mask = th.zeros((100,), dtype=th.bool)
+    mask[th.arange(0, 60, 2)] = True
+    mask[th.arange(40, 60)] = True
+    mask[th.arange(60, 100, 4)] = True
+    mask[99] = True
+    ctx = mp.get_context('spawn')
+    conns = [ctx.Pipe() for _ in range(2)]
+    procs = [ctx.Process(target=_run_split_local_first, args=(rank, mask, conns[rank][1])) \
+            for rank in range(2)]
+    for proc in procs:
+        proc.start()
+    targets = [th.tensor(conn.recv()) for conn, _ in conns]
+    for proc in procs:
+        proc.join()
+        assert proc.exitcode == 0
+
+    # Both ranks get the same number of targets and the remainder is dropped.
+    assert len(targets[0]) == 25
+    assert len(targets[1]) == 25
+    # The rank 0 only gets local targets and the rank 1 gets all of its local targets.
+    assert th.all(targets[0] < 60)
+    assert_equal(targets[1][0:11].numpy(), np.append(np.arange(60, 100, 4), 99))
+    # The targets are assigned once.
+    all_targets = th.cat(targets)
+    assert len(th.unique(all_targets)) == 50
+    assert th.all(mask[all_targets])
+
+def test_split_cache():
+    # initialize the torch distributed environment
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23456',
+                                      rank=0,
+                                      world_size=1)
+
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        _, part_config = generate_dummy_dist_graph(graph_name='dummy', dirname=tmpdirname)
+        num_calls = [0]
+        def split_fn():
+            num_calls[0] += 1
+            return th.arange(10)
+
+        cache = SplitCache(part_config)
+        assert_equal(cache.get(("train", "n1"), split_fn).numpy(), np.arange(10))
+        assert_equal(cache.get(("train", "n1"), split_fn).numpy(), np.arange(10))
+        assert num_calls[0] == 1
+        cache.save()
+        assert os.path.exists(os.path.join(tmpdirname, "split_cache", "1", "rank-0.pt"))
+
+        # A later job loads the splits from the cache.
+        cache = SplitCache(part_config)
+        assert_equal(cache.get(("train", "n1"), split_fn).numpy(), np.arange(10))
+        assert num_calls[0] == 1
+
+        # The cache is invalidated when the partitions change.
+        with open(part_config, "a", encoding="utf8") as f:
+            f.write("\n")
+        cache = SplitCache(part_config)
+        cache.get(("train", "n1"), split_fn)
+        assert num_calls[0] == 2
+
+    th.distributed.destroy_process_group()
+
+def _run_split_cache(rank, part_config, conn):
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23458',
+                                      rank=rank,
+                                      world_size=2)
+    num_calls = [0]
+    def split_fn():
+        num_calls[0] += 1
+        return th.arange(10)
+
+    cache = SplitCache(part_config)
+    cache.get(("train", "n1"), split_fn)
+    cache.save()
+    th.distributed.barrier()
+    # The rank 1 fails to save a split.
+    cache.get(("val", "n1"), split_fn)
+    if rank == 0:
+        cache.save()
+    th.distributed.barrier()
+    # The ranks cached different splits, so all of them compute the splits again.
+    cache = SplitCache(part_config)
+    cache.get(("train", "n1"), split_fn)
+    conn.send(num_calls[0])
+    th.distributed.destroy_process_group()
+
+def test_split_cache_multi_ranks():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        part_config = os.path.join(tmpdirname, "dummy.json")
+        with open(part_config, "w", encoding="utf8") as f:
+            json.dump({"num_parts": 1}, f)
+        ctx = mp.get_context('spawn')
+        conns = [ctx.Pipe() for _ in range(2)]
+        procs = [ctx.Process(target=_run_split_cache, args=(rank, part_config, conns[rank][1])) \
+                for rank in range(2)]
+        for proc in procs:
+            proc.start()
+        num_calls = [conn.recv() for conn, _ in conns]
+        for proc in procs:
+            proc.join()
+            assert proc.exitcode == 0
+    assert num_calls == [3, 3]
+
+def _check_same_graph(g1, g2):
+    assert g1.is_block == g2.is_block
+    assert g1.canonical_etypes == g2.canonical_etypes
+    for etype in g1.canonical_etypes:
+        for arr1, arr2 in zip(g1.edges(etype=etype, order='eid'),
+                              g2.edges(etype=etype, order='eid')):
+            assert_equal(arr1.numpy(), arr2.numpy())
+        assert_equal(g1.edges[etype].data[dgl.EID].numpy(),
+                     g2.edges[etype].data[dgl.EID].numpy())
+    if g1.is_block:
+        for ntype in g1.srctypes:
+            assert_equal(g1.srcnodes[ntype].data[dgl.NID].numpy(),
+                         g2.srcnodes[ntype].data[dgl.NID].numpy())
+        for ntype in g1.dsttypes:
+            assert_equal(g1.dstnodes[ntype].data[dgl.NID].numpy(),
+                         g2.dstnodes[ntype].data[dgl.NID].numpy())
+    else:
+        for ntype in g1.ntypes:
+            assert_equal(g1.nodes[ntype].data[dgl.NID].numpy(),
+                         g2.nodes[ntype].data[dgl.NID].numpy())
+
+def test_sample_cache():
+    g = dgl.heterograph({
+        ("n0", "r0", "n1"): (th.randint(100, (1000,)), th.randint(50, (1000,))),
+        ("n1", "r1", "n0"): (th.randint(50, (500,)), th.randint(100, (500,))),
+    })
+    sampler = dgl.dataloading.MultiLayerNeighborSampler([5, 5])
+    batch_graph = dgl.edge_subgraph(g, {("n0", "r0", "n1"): th.arange(10)})
+    input_nodes, seeds, blocks = sampler.sample(g, {"n1": th.arange(10)})
+    batch = pack_batch((input_nodes, batch_graph, blocks))
+    new_input_nodes, new_batch_graph, new_blocks = unpack_batch(batch)
+    for ntype in input_nodes:
+        assert_equal(input_nodes[ntype].numpy(), new_input_nodes[ntype].numpy())
+    _check_same_graph(batch_graph, new_batch_graph)
+    assert len(blocks) == len(new_blocks)
+    for block, new_block in zip(blocks, new_blocks):
+        _check_same_graph(block, new_block)
+
+    class DummyLoader():
+        def __init__(self):
+            self.num_epochs = 0
+        def __iter__(self):
+            self.num_epochs += 1
+            for i in range(5):
+                yield sampler.sample(g, {"n1": th.arange(i * 10, (i + 1) * 10)})
+
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        for cache_path in [None, tmpdirname]:
+            loader = DummyLoader()
+            cache = SampleCache(2, refresh_epochs=4, cache_path=cache_path)
+            epochs = [list(cache.epoch_iter(loader)) for _ in range(6)]
+            # The epochs 0, 1, 4 and 5 sample mini-batches.
+            assert loader.num_epochs == 4
+            # The epoch 2 replays the mini-batches of the epoch 0 in a random order.
+            seeds0 = sorted(int(batch[1]["n1"][0]) for batch in epochs[0])
+            seeds2 = sorted(int(batch[1]["n1"][0]) for batch in epochs[2])
+            assert seeds0 == seeds2
+            for batch in epochs[2]:
+                orig = epochs[0][int(batch[1]["n1"][0]) // 10]
+                for block, orig_block in zip(batch[2], orig[2]):
+                    _check_same_graph(block, orig_block)
+
+            # A variant is only kept if the epoch is complete.
+            loader = DummyLoader()
+            cache = SampleCache(1, cache_path=cache_path)
+            next(iter(cache.epoch_iter(loader)))
+            list(cache.epoch_iter(loader))
+            list(cache.epoch_iter(loader))
+            assert loader.num_epochs == 2
+
+            # Without shuffling, the mini-batches are replayed in the sampled order.
+            loader = DummyLoader()
+            cache = SampleCache(1, cache_path=cache_path, shuffle=False)
+            epochs = [list(cache.epoch_iter(loader)) for _ in range(3)]
+            assert loader.num_epochs == 1
+            for epoch in epochs[1:]:
+                assert [int(batch[1]["n1"][0]) for batch in epoch] == [0, 10, 20, 30, 40]
+
 def test_node_dataloader():
     # initialize the torch distributed environment
     th.distributed.init_process_group(backend='gloo',
@@ -408,6 +818,224 @@ def test_lp_dataloader():
     all_edges2 = th.cat(all_edges2)
     assert not np.all(all_edges1.numpy() == all_edges2.numpy())
 
+    # The alias tables of the degree-based negative samplers are built with the dataloaders.
+    for loader_cls in [GSgnnLPLocalDegreeNegDataLoader, GSgnnLPJointLocalDegreeNegDataLoader]:
+        dataloader = loader_cls(ep_data, target_idx, [10], 10, num_negative_edges=2,
+                                device='cuda:0', train_task=True)
+        assert list(dataloader.dataloader.collator.negative_sampler._alias_tables) == ['n1']
+
+    # The mini-batches with negative edges cannot be cached.
+    with pytest.raises(NotImplementedError):
+        dataloader.setup_sample_cache(1)
+
+    # after test pass, destroy all process group
+    th.distributed.destroy_process_group()
+
+def test_prefetch_iterator():
+    import threading
+    lock = threading.Lock()
+    batches = [(th.arange(i), i) for i in range(10)]
+    fetch_fn = lambda batch: batch[0].sum()
+
+    # The fetched data are appended to the mini-batches in the original order.
+    for num_prefetch_batches in [1, 3, 20]:
+        res = list(_PrefetchIterator(iter(batches), fetch_fn, num_prefetch_batches, lock))
+        assert len(res) == len(batches)
+        for batch, (ids, i, data) in zip(batches, res):
+            assert th.all(ids == batch[0])
+            assert i == batch[1]
+            assert data == batch[0].sum()
+
+    # The error in the background thread is raised in the training loop.
+    def fetch_error(batch):
+        if batch[1] == 5:
+            raise ValueError("fetch error")
+        return None
+    with pytest.raises(ValueError):
+        for _ in _PrefetchIterator(iter(batches), fetch_error, 2, lock):
+            pass
+
+    # Stopping the iteration early stops the background thread.
+    prefetch_iter = _PrefetchIterator(iter(batches), fetch_fn, 2, lock)
+    next(prefetch_iter)
+    prefetch_iter.close()
+    assert not prefetch_iter._thread.is_alive()
+    with pytest.raises(StopIteration):
+        next(prefetch_iter)
+
+def test_loader_wait_time():
+    import time
+    class SlowLoader():
+        def __iter__(self):
+            for i in range(5):
+                time.sleep(0.02)
+                yield (th.arange(i), i)
+
+    loader = GSgnnDataLoaderBase(None)
+    loader.dataloader = SlowLoader()
+    # The mini-batches are sampled in the trainer process.
+    assert loader.num_samplers == 0
+    assert loader.wait_time == 0
+    assert len(list(loader)) == 5
+    wait_time = loader.wait_time
+    assert wait_time >= 0.1
+
+    # The waiting time is measured for every epoch.
+    batch_iter = iter(loader)
+    assert loader.wait_time == 0
+    next(batch_iter)
+    assert 0.02 <= loader.wait_time < wait_time
+
+    # The waiting time includes the time of fetching the prefetched data.
+    loader = GSgnnDataLoaderBase(None, num_prefetch_batches=2)
+    loader.dataloader = SlowLoader()
+    loader._fetch_batch_data = lambda batch: batch[0].sum()
+    res = list(loader)
+    assert len(res) == 5
+    for ids, _, data in res:
+        assert data == ids.sum()
+    assert loader.wait_time > 0
+
+def test_prefetch_dataloader():
+    # initialize the torch distributed environment
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23456',
+                                      rank=0,
+                                      world_size=1)
+
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        # get the test dummy distributed graph
+        _, part_config = generate_dummy_dist_graph(graph_name='dummy', dirname=tmpdirname)
+        np_data = GSgnnNodeTrainData(graph_name='dummy', part_config=part_config,
+                                     train_ntypes=['n1'], label_field='label',
+                                     node_feat_field='feat')
+        ep_data = GSgnnEdgeTrainData(graph_name='dummy', part_config=part_config,
+                                     train_etypes=[('n0', 'r1', 'n1')], label_field='label',
+                                     node_feat_field='feat')
+
+    target_idx = {'n1': th.arange(np_data.g.number_of_nodes('n1'))}
+    dataloader = GSgnnNodeDataLoader(np_data, target_idx, [10], 10, 'cuda:0',
+                                     train_task=True, num_prefetch_batches=2)
+    num_batches = 0
+    for input_nodes, seeds, blocks, (input_feats, lbl) in dataloader:
+        feats = np_data.get_node_feats(input_nodes, 'cuda:0')
+        labels = np_data.get_labels(seeds, 'cuda:0')
+        for ntype in feats:
+            assert th.all(input_feats[ntype] == feats[ntype])
+        assert th.all(lbl['n1'] == labels['n1'])
+        num_batches += 1
+    assert num_batches == math.ceil(np_data.g.number_of_nodes('n1') / 10)
+
+    target_idx = {('n0', 'r1', 'n1'): th.arange(ep_data.g.number_of_edges('r1'))}
+    dataloader = GSgnnEdgeDataLoader(ep_data, target_idx, [10], 10, 'cuda:0',
+                                     train_task=True, remove_target_edge_type=False,
+                                     num_prefetch_batches=2)
+    for input_nodes, batch_graph, blocks, (input_feats, lbl) in dataloader:
+        feats = ep_data.get_node_feats(input_nodes, 'cuda:0')
+        for ntype in feats:
+            assert th.all(input_feats[ntype] == feats[ntype])
+        etype = ('n0', 'r1', 'n1')
+        labels = ep_data.get_labels({etype: batch_graph.edges['r1'].data[dgl.EID]}, 'cuda:0')
+        assert th.all(lbl[etype] == labels[etype])
+
+    dataloader = GSgnnLinkPredictionDataLoader(ep_data, target_idx, [10], 10,
+                                               num_negative_edges=2, device='cuda:0',
+                                               train_task=True, num_prefetch_batches=2)
+    for input_nodes, pos_graph, neg_graph, blocks, (input_feats,) in dataloader:
+        feats = ep_data.get_node_feats(input_nodes, 'cuda:0')
+        for ntype in feats:
+            assert th.all(input_feats[ntype] == feats[ntype])
+
+    # after test pass, destroy all process group
+    th.distributed.destroy_process_group()
+
+def test_select_cached_nodes():
+    candidates = {'n0': (th.tensor([3, 1, 2]), th.tensor([5, 10, 0])),
+                  'n1': (th.tensor([7, 4]), th.tensor([8, 6])),
+                  'n2': (th.tensor([], dtype=th.int64), th.tensor([]))}
+    row_bytes = {'n0': 8, 'n1': 16, 'n2': 4}
+    # The nodes are selected by their scores until the budget is used up.
+    selected = select_cached_nodes(candidates, row_bytes, 8 + 16)
+    assert_equal(selected['n0'].numpy(), [1])
+    assert_equal(selected['n1'].numpy(), [7])
+    selected = select_cached_nodes(candidates, row_bytes, 8 + 16 + 16 + 7)
+    assert_equal(selected['n0'].numpy(), [1])
+    assert_equal(selected['n1'].numpy(), [4, 7])
+    # The nodes with zero scores are never selected.
+    selected = select_cached_nodes(candidates, row_bytes, 1024)
+    assert_equal(selected['n0'].numpy(), [1, 3])
+    assert_equal(selected['n1'].numpy(), [4, 7])
+    assert len(select_cached_nodes(candidates, row_bytes, 0)['n0']) == 0
+
+def test_node_feat_cache():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        # get the test dummy distributed graph
+        g, _ = generate_dummy_dist_graph(graph_name='dummy', dirname=tmpdirname)
+
+    feat_names = {'n0': ['feat'], 'n1': ['feat', 'feat']}
+    # All nodes are local with one partition, so nothing is cached by the policies.
+    for policy in ['degree', 'frequency']:
+        feat_cache = NodeFeatCache(g, feat_names, 1, policy=policy, num_warmup_batches=1)
+        feat_cache.fetch({'n0': th.arange(10)})
+        assert feat_cache.num_cached_nodes == {'n0': 0, 'n1': 0}
+
+    feat_cache = NodeFeatCache(g, feat_names, 1, policy='frequency', num_warmup_batches=1)
+    feat_cache.fill({'n0': th.tensor([5, 1, 3]), 'n1': th.arange(g.number_of_nodes('n1'))})
+    assert feat_cache.num_cached_nodes == {'n0': 3, 'n1': g.number_of_nodes('n1')}
+    for _ in range(2):
+        input_nodes = {'n0': th.tensor([0, 1, 2, 3, 9, 5]), 'n1': th.tensor([8, 2, 4])}
+        feats = feat_cache.fetch(input_nodes)
+        assert th.all(feats['n0'] == g.nodes['n0'].data['feat'][input_nodes['n0']])
+        n1_feat = g.nodes['n1'].data['feat'][input_nodes['n1']]
+        assert th.all(feats['n1'] == th.cat([n1_feat, n1_feat], dim=1))
+    assert feat_cache.hit_rates['n0'] == 0.5
+    assert feat_cache.hit_rates['n1'] == 1
+    # All the nodes are served by the cache or the graph.
+    feats = feat_cache.fetch({'n0': th.tensor([1, 3]), 'n1': th.tensor([], dtype=th.int64)})
+    assert th.all(feats['n0'] == g.nodes['n0'].data['feat'][th.tensor([1, 3])])
+    feats = feat_cache.fetch({'n0': th.tensor([0, 2])})
+    assert th.all(feats['n0'] == g.nodes['n0'].data['feat'][th.tensor([0, 2])])
+    feat_cache.reset_stats()
+    assert len(feat_cache.hit_rates) == 0
+
+def test_fuse_node_feats():
+    # initialize the torch distributed environment
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23456',
+                                      rank=0,
+                                      world_size=1)
+
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        # get the test dummy distributed graph
+        g, _ = generate_dummy_dist_graph(graph_name='dummy', dirname=tmpdirname)
+    num_nodes = g.number_of_nodes('n1')
+    g.nodes['n1'].data['feat1'] = dgl.distributed.DistTensor(
+        (num_nodes, 3), th.float32, name='n1_feat1',
+        part_policy=g.get_node_partition_policy('n1'))
+    g.nodes['n1'].data['feat1'][th.arange(num_nodes)] = th.randn(num_nodes, 3)
+    feat_field = {'n0': ['feat'], 'n1': ['feat', 'feat1']}
+    input_nodes = {'n0': th.tensor([3, 0, 7]), 'n1': th.tensor([1, 9, 4, 2])}
+    feats = prepare_batch_input(g, input_nodes, feat_field=feat_field)
+
+    # Only the node type with multiple fields is fused.
+    fused_field = fuse_node_feats(g, feat_field)
+    assert fused_field['n0'] == ['feat']
+    assert len(fused_field['n1']) == 1
+    assert g.nodes['n1'].data[fused_field['n1'][0]].dtype == th.float32
+    fused_feats = prepare_batch_input(g, input_nodes, feat_field=fused_field)
+    for ntype in feats:
+        assert th.all(fused_feats[ntype] == feats[ntype])
+
+    # The features stored in half precision are returned in float32.
+    for dtype in [th.float16, th.bfloat16]:
+        fused_field = fuse_node_feats(g, feat_field, dtype=dtype)
+        assert g.nodes['n0'].data[fused_field['n0'][0]].dtype == dtype
+        assert g.nodes['n1'].data[fused_field['n1'][0]].dtype == dtype
+        fused_feats = prepare_batch_input(g, input_nodes, feat_field=fused_field)
+        for ntype in feats:
+            assert fused_feats[ntype].dtype == th.float32
+            assert th.allclose(fused_feats[ntype], feats[ntype], rtol=1e-2, atol=1e-2)
+
     # after test pass, destroy all process group
     th.distributed.destroy_process_group()
 
@@ -522,15 +1150,71 @@ def test_GSgnnLinkPredictionJointTestDataLoader(batch_size, num_negative_edges):
     # after test pass, destroy all process group
     th.distributed.destroy_process_group()
 
+@pytest.mark.parametrize("cache_on_disk", [False, True])
+def test_fixed_eval_negatives(cache_on_disk):
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23456',
+                                      rank=0,
+                                      world_size=1)
+    test_etypes = [("n0", "r1", "n1"), ("n0", "r0", "n1")]
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        # get the test dummy distributed graph
+        _, part_config = generate_dummy_dist_graph(graph_name='dummy', dirname=tmpdirname)
+        lp_data = GSgnnEdgeTrainData(graph_name='dummy', part_config=part_config,
+                                     train_etypes=test_etypes, label_field='label')
+        cache_path = os.path.join(tmpdirname, "neg") if cache_on_disk else None
+
+        for loader_cls in [GSgnnLinkPredictionTestDataLoader,
+                           GSgnnLinkPredictionJointTestDataLoader]:
+            dataloader = loader_cls(lp_data, target_idx=lp_data.train_idxs,
+                                    batch_size=10, num_negative_edges=4,
+                                    fixed_negatives=True, negative_cache_path=cache_path)
+            batches1 = list(dataloader)
+            batches2 = list(dataloader)
+            # A new dataloader generates the same negative edges with the fixed seed.
+            batches3 = list(loader_cls(lp_data, target_idx=lp_data.train_idxs,
+                                       batch_size=10, num_negative_edges=4,
+                                       fixed_negatives=True, negative_cache_path=cache_path))
+            assert len(batches1) == len(batches2) == len(batches3)
+            for (pos_neg1, _), (pos_neg2, _), (pos_neg3, _) in \
+                    zip(batches1, batches2, batches3):
+                for etype, pos_neg in pos_neg1.items():
+                    assert pos_neg[0].dtype == th.int64
+                    for arr1, arr2, arr3 in zip(pos_neg, pos_neg2[etype], pos_neg3[etype]):
+                        assert_equal(arr1.numpy(), arr2.numpy())
+                        assert_equal(arr1.numpy(), arr3.numpy())
+            if cache_on_disk:
+                assert os.path.exists(os.path.join(cache_path, "0", "n0-r1-n1", "0.npy"))
+
+    # after test pass, destroy all process group
+    th.distributed.destroy_process_group()
+
 if __name__ == '__main__':
     test_GSgnnNodeData()
     test_GSgnnEdgeData()
     test_lp_dataloader()
     test_edge_dataloader()
     test_node_dataloader()
+    test_prefetch_iterator()
+    test_loader_wait_time()
+    test_prefetch_dataloader()
+    test_select_cached_nodes()
+    test_node_feat_cache()
+    test_fuse_node_feats()
+    test_all_etype_dist_edge_dataloader()
+    test_alias_table()
+    test_local_first_plan()
+    test_split_local_first()
+    test_split_local_first_multi_ranks()
+    test_split_cache()
+    test_split_cache_multi_ranks()
+    test_sample_cache()
+    test_degree_negative_sampler()
     test_GSgnnAllEtypeLinkPredictionDataLoader(10)
     test_GSgnnAllEtypeLinkPredictionDataLoader(1)
     test_GSgnnLinkPredictionTestDataLoader(1, 1)
     test_GSgnnLinkPredictionTestDataLoader(10, 20)
     test_GSgnnLinkPredictionJointTestDataLoader(1, 1)
     test_GSgnnLinkPredictionJointTestDataLoader(10, 20)
+    test_fixed_eval_negatives(False)
+    test_fixed_eval_negatives(True)
@@ -353,8 +353,39 @@ def test_LinkPredictDotDecoder(h_dim, num_pos, num_neg, device):
     check_calc_test_scores_dot_uniform_neg(decoder, etype, h_dim, num_pos, num_neg, device)
     check_calc_test_scores_dot_joint_neg(decoder, etype, h_dim, num_pos, num_neg, device)
 
+@pytest.mark.parametrize("dtype", [th.float16, th.bfloat16])
+@pytest.mark.parametrize("device",["cpu", "cuda:0"])
+def test_calc_test_scores_half_precision(dtype, device):
+    th.manual_seed(2)
+    etypes = [('a', 'r1', 'b'), ('a', 'r2', 'b')]
+    emb = {
+        'a': th.rand((128, 16)),
+        'b': th.rand((128, 16)),
+    }
+    # The embeddings of full-graph inference can be stored in half precision.
+    half_emb = {ntype: val.to(dtype) for ntype, val in emb.items()}
+    emb = {ntype: val.float() for ntype, val in half_emb.items()}
+    pos_src = th.randint(100, (8,))
+    pos_dst = th.randint(100, (8,))
+    neg_dst = th.randint(128, (8, 4))
+    distmult = LinkPredictDistMultDecoder(etypes, 16)
+    distmult.trained_rels[0] = 1
+    dot = LinkPredictDotDecoder(16)
+    with th.no_grad():
+        for decoder in [distmult, dot]:
+            pos_neg_tuple = {etypes[0]: (pos_src, None, pos_dst, neg_dst)}
+            score = decoder.calc_test_scores(emb, pos_neg_tuple,
+                                             BUILTIN_LP_UNIFORM_NEG_SAMPLER, device)
+            half_score = decoder.calc_test_scores(half_emb, pos_neg_tuple,
+                                                  BUILTIN_LP_UNIFORM_NEG_SAMPLER, device)
+            for i in range(2):
+                assert half_score[etypes[0]][i].dtype == th.float32
+                assert_almost_equal(half_score[etypes[0]][i].numpy(),
+                                    score[etypes[0]][i].numpy(), decimal=5)
+
 if __name__ == '__main__':
     test_LinkPredictDistMultDecoder(16, 8, 1, "cpu")
     test_LinkPredictDistMultDecoder(16, 32, 32, "cuda:0")
     test_LinkPredictDotDecoder(16, 8, 1, "cpu")
     test_LinkPredictDotDecoder(16, 32, 32, "cuda:0")
+    test_calc_test_scores_half_precision(th.float16, "cpu")
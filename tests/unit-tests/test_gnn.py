@@ -18,6 +18,7 @@ import os
 import yaml
 import tempfile
 from argparse import Namespace
+from unittest.mock import patch
 
 import torch as th
 from torch import nn
@@ -34,13 +35,17 @@ from graphstorm.model.rgat_encoder import RelationalGATEncoder
 from graphstorm.model.edge_decoder import DenseBiDecoder, MLPEdgeDecoder, LinkPredictDotDecoder
 from graphstorm.model.node_decoder import EntityRegression, EntityClassifier
 from graphstorm.dataloading import GSgnnNodeTrainData, GSgnnEdgeTrainData
+from graphstorm.dataloading import GSgnnNodeInferData
 from graphstorm.dataloading import GSgnnNodeDataLoader, GSgnnEdgeDataLoader
 from graphstorm import create_builtin_edge_gnn_model, create_builtin_node_gnn_model
 from graphstorm import create_builtin_lp_gnn_model
 from graphstorm import get_feat_size
-from graphstorm.model.gnn import do_full_graph_inference
+from graphstorm.model.gnn import do_full_graph_inference, do_incremental_inference
+from graphstorm.model.gnn_encoder_base import get_khop_scope, get_affected_nodes
+from graphstorm.model.gnn_encoder_base import find_affected_dst_nodes, _filter_block_dst
 from graphstorm.model.node_gnn import node_mini_batch_predict, node_mini_batch_gnn_predict
 from graphstorm.model.edge_gnn import edge_mini_batch_predict, edge_mini_batch_gnn_predict
+from graphstorm.inference import GSgnnNodePredictionInfer
 
 from data_utils import generate_dummy_dist_graph
 
@@ -127,6 +132,358 @@ def test_rgat_node_prediction():
     th.distributed.destroy_process_group()
     dgl.distributed.kvstore.close_kvstore()
 
+def test_scoped_inference():
+    # initialize the torch distributed environment
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23456',
+                                      rank=0,
+                                      world_size=1)
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        # get the test dummy distributed graph
+        _, part_config = generate_dummy_dist_graph(tmpdirname)
+        np_data = GSgnnNodeTrainData(graph_name='dummy', part_config=part_config,
+                                     train_ntypes=['n1'], label_field='label',
+                                     node_feat_field='feat')
+    g = np_data.g
+    model = create_rgcn_node_model(g)
+    embs = do_full_graph_inference(model, np_data)
+
+    # The n1 nodes only have in-edges from the n0 nodes, which don't have in-edges.
+    target_nodes = {'n1': th.arange(10)}
+    scope = get_khop_scope(g, target_nodes, 2)
+    n1_hops = scope['n1'][0:g.number_of_nodes('n1')]
+    assert th.all(n1_hops[0:10] == 0)
+    assert th.all(n1_hops[10:] == 3)
+    neighbors = []
+    for etype in ['r0', 'r1']:
+        src, dst = g.find_edges(th.arange(g.number_of_edges(etype)), etype=etype)
+        neighbors.append(src[dst < 10])
+    neighbors = th.unique(th.cat(neighbors))
+    n0_hops = scope['n0'][0:g.number_of_nodes('n0')]
+    assert th.all(n0_hops[neighbors] == 1)
+    assert th.sum(n0_hops == 1) == len(neighbors)
+    assert th.all(n0_hops[n0_hops != 1] == 3)
+
+    # The embeddings of the target nodes are the same as the full-graph inference.
+    for target_nodes in [{'n1': th.arange(10)}, ['n1']]:
+        scoped_embs = do_full_graph_inference(model, np_data, target_nodes=target_nodes)
+        nids = target_nodes['n1'] if isinstance(target_nodes, dict) \
+                else th.arange(g.number_of_nodes('n1'))
+        assert_almost_equal(scoped_embs['n1'][nids].numpy(), embs['n1'][nids].numpy(),
+                            decimal=5)
+
+    # The inference isn't scoped if the targets are all node types.
+    with patch("graphstorm.model.gnn.get_khop_scope") as mock_get_khop_scope:
+        all_embs = do_full_graph_inference(model, np_data, target_nodes=list(g.ntypes))
+        mock_get_khop_scope.assert_not_called()
+    for ntype in g.ntypes:
+        num_nodes = g.number_of_nodes(ntype)
+        assert_almost_equal(all_embs[ntype][0:num_nodes].numpy(),
+                            embs[ntype][0:num_nodes].numpy(), decimal=5)
+    th.distributed.destroy_process_group()
+    dgl.distributed.kvstore.close_kvstore()
+
+def test_incremental_inference():
+    # initialize the torch distributed environment
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23456',
+                                      rank=0,
+                                      world_size=1)
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        # get the test dummy distributed graph
+        _, part_config = generate_dummy_dist_graph(tmpdirname)
+        np_data = GSgnnNodeTrainData(graph_name='dummy', part_config=part_config,
+                                     train_ntypes=['n1'], label_field='label',
+                                     node_feat_field='feat')
+        g = np_data.g
+        model = create_rgcn_node_model(g)
+        # The edge mask simulates adding and removing edges.
+        masks = {}
+        for etype in ['r0', 'r1']:
+            masks[etype] = th.randint(0, 2, (g.number_of_edges(etype),), dtype=th.uint8)
+            g.edges[etype].data['gnn_mask'] = dgl.distributed.DistTensor(
+                (g.number_of_edges(etype),), th.uint8, 'gnn_mask_' + etype,
+                part_policy=g.get_edge_partition_policy(etype))
+            g.edges[etype].data['gnn_mask'][0:g.number_of_edges(etype)] = masks[etype]
+        layer_embed_path = os.path.join(tmpdirname, "layer_embs")
+        do_full_graph_inference(model, np_data, edge_mask='gnn_mask',
+                                layer_embed_path=layer_embed_path)
+        for layer in range(3):
+            assert os.path.exists(os.path.join(layer_embed_path, f"layer-{layer}",
+                                               "emb_info.json"))
+
+        # Update the features of some n0 nodes.
+        changed_nodes = {'n0': th.arange(5)}
+        feat = g.nodes['n0'].data['feat']
+        feat[th.arange(5)] = th.rand((5,) + feat.shape[1:], dtype=feat.dtype)
+        # Add some r1 edges and remove some r0 edges.
+        added = th.nonzero(masks['r1'] == 0, as_tuple=True)[0][:5]
+        g.edges['r1'].data['gnn_mask'][added] = th.ones((len(added),), dtype=th.uint8)
+        removed = th.nonzero(masks['r0'] == 1, as_tuple=True)[0][:5]
+        g.edges['r0'].data['gnn_mask'][removed] = th.zeros((len(removed),), dtype=th.uint8)
+        _, removed_dst = g.find_edges(removed, etype='r0')
+        changed_nodes['n1'] = removed_dst
+        changed_edges = {('n0', 'r1', 'n1'): added}
+
+        # The n1 nodes only have in-edges from the n0 nodes, which don't have in-edges.
+        levels = get_affected_nodes(g, changed_nodes, changed_edges, 2, edge_mask='gnn_mask')
+        n0_levels = levels['n0'][0:g.number_of_nodes('n0')]
+        assert th.all(n0_levels[0:5] == 0)
+        assert th.all(n0_levels[5:] == 3)
+        neighbors = [removed_dst]
+        for etype in ['r0', 'r1']:
+            src, dst = g.find_edges(th.arange(g.number_of_edges(etype)), etype=etype)
+            mask = g.edges[etype].data['gnn_mask'][0:g.number_of_edges(etype)].bool()
+            neighbors.append(dst[mask & (src < 5)])
+        neighbors.append(g.find_edges(added, etype='r1')[1])
+        n1_levels = levels['n1'][0:g.number_of_nodes('n1')]
+        neighbors = th.unique(th.cat(neighbors))
+        assert th.all(n1_levels[removed_dst] == 0)
+        assert th.sum(n1_levels <= 1) == len(neighbors)
+        assert th.all(n1_levels[n1_levels > 1] == 3)
+
+        # The refreshed embeddings are the same as the full-graph inference
+        # and they are saved in place.
+        embs = do_incremental_inference(model, np_data, layer_embed_path,
+                                        changed_nodes, changed_edges, edge_mask='gnn_mask')
+        expected = do_full_graph_inference(model, np_data, edge_mask='gnn_mask')
+        for ntype in g.ntypes:
+            num_nodes = g.number_of_nodes(ntype)
+            assert_almost_equal(embs[ntype][0:num_nodes].numpy(),
+                                expected[ntype][0:num_nodes].numpy(), decimal=5)
+            saved = th.load(os.path.join(layer_embed_path, "layer-2", f"{ntype}_emb.part0.bin"))
+            assert_almost_equal(saved.numpy(), expected[ntype][0:num_nodes].numpy(),
+                                decimal=5)
+    th.distributed.destroy_process_group()
+    dgl.distributed.kvstore.close_kvstore()
+
+def test_affected_nodes_multi_partitions():
+    src = th.randint(100, (1000,))
+    dst = th.randint(100, (1000,))
+    g = dgl.heterograph({
+        ('n0', 'r0', 'n1'): (src[:500], dst[:500]),
+        ('n1', 'r1', 'n1'): (src[500:], dst[500:]),
+    })
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        dgl.distributed.partition_graph(g, 'dummy', 2, tmpdirname, part_method='random')
+        parts = [dgl.distributed.load_partition(os.path.join(tmpdirname, 'dummy.json'), i) \
+                 for i in range(2)]
+
+    # The trainer of a partition samples the in-edges of the nodes in the partition,
+    # which are all stored in the partition.
+    blocks = []
+    all_edges = {etype: [] for etype in g.canonical_etypes}
+    for local_g, _, _, gpb, _, _, _ in parts:
+        ntype_ids, nids = gpb.map_to_per_ntype(local_g.ndata[dgl.NID])
+        inner = local_g.ndata['inner_node'].bool()
+        src, dst = local_g.edges()
+        edges = {}
+        for i, etype in enumerate(gpb.canonical_etypes):
+            mask = (local_g.edata[dgl.ETYPE] == i) & inner[dst]
+            edges[etype] = (nids[src[mask]], nids[dst[mask]])
+            all_edges[etype].append(edges[etype])
+        local_g = dgl.heterograph(edges, {ntype: g.num_nodes(ntype) for ntype in g.ntypes})
+        for i, ntype in enumerate(gpb.ntypes):
+            blocks.append((ntype, dgl.to_block(local_g, {ntype: nids[inner & (ntype_ids == i)]})))
+    all_edges = {etype: (th.cat([src for src, _ in edges]), th.cat([dst for _, dst in edges])) \
+                 for etype, edges in all_edges.items()}
+    part_ids = {ntype: gpb.nid2partid(th.arange(g.num_nodes(ntype)), ntype) \
+                for ntype in g.ntypes}
+
+    # Change the n1 nodes in partition 1 and an r0 edge from partition 1 to partition 0.
+    init_levels = {ntype: th.full((g.num_nodes(ntype),), 3, dtype=th.int32) \
+                   for ntype in g.ntypes}
+    changed = th.nonzero(part_ids['n1'] == 1, as_tuple=True)[0][:5]
+    init_levels['n1'][changed] = 0
+    src, dst = all_edges[('n0', 'r0', 'n1')]
+    cross = th.nonzero((part_ids['n0'][src] == 1) & (part_ids['n1'][dst] == 0),
+                       as_tuple=True)[0][0]
+    init_levels['n1'][dst[cross]] = th.clamp(init_levels['n1'][dst[cross]], max=1)
+    # The out-edges of the changed nodes reach the nodes in partition 0, but they are
+    # stored in partition 0.
+    src, dst = all_edges[('n1', 'r1', 'n1')]
+    out_dst = dst[th.isin(src, changed)]
+    assert th.sum(part_ids['n1'][out_dst] == 0) > 0
+
+    levels = {ntype: init_levels[ntype].clone() for ntype in g.ntypes}
+    expected = {ntype: init_levels[ntype].clone() for ntype in g.ntypes}
+    for level in range(2):
+        for ntype, block in blocks:
+            affected = find_affected_dst_nodes(block, levels, level)
+            affected = affected[levels[ntype][affected] > level + 1]
+            levels[ntype][affected] = level + 1
+        prev = {ntype: expected[ntype].clone() for ntype in g.ntypes}
+        for etype, (src, dst) in all_edges.items():
+            dst = dst[prev[etype[0]][src] == level]
+            dst = dst[expected[etype[2]][dst] > level + 1]
+            expected[etype[2]][dst] = level + 1
+    assert th.sum((levels['n1'] == 1) & (part_ids['n1'] == 0)) > 1
+    for ntype in g.ntypes:
+        assert_equal(levels[ntype].numpy(), expected[ntype].numpy())
+
+def test_double_buffer_inference():
+    # initialize the torch distributed environment
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23456',
+                                      rank=0,
+                                      world_size=1)
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        # get the test dummy distributed graph
+        _, part_config = generate_dummy_dist_graph(tmpdirname)
+        np_data = GSgnnNodeTrainData(graph_name='dummy', part_config=part_config,
+                                     train_ntypes=['n1'], label_field='label',
+                                     node_feat_field='feat')
+    g = np_data.g
+    model = create_rgcn_node_model(g)
+    embs = do_full_graph_inference(model, np_data)
+
+    kvstore = dgl.distributed.kvstore.get_kvstore()
+    num_tensors = len(kvstore.data_name_list())
+    db_embs = do_full_graph_inference(model, np_data, double_buffer=True)
+    # Only the buffer of the final embeddings is still allocated.
+    assert len(kvstore.data_name_list()) == num_tensors + len(g.ntypes)
+    for ntype in g.ntypes:
+        num_nodes = g.number_of_nodes(ntype)
+        assert_almost_equal(db_embs[ntype][0:num_nodes].numpy(),
+                            embs[ntype][0:num_nodes].numpy(), decimal=5)
+    del db_embs
+    assert len(kvstore.data_name_list()) == num_tensors
+    th.distributed.destroy_process_group()
+    dgl.distributed.kvstore.close_kvstore()
+
+def test_reuse_blocks_inference():
+    # initialize the torch distributed environment
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23456',
+                                      rank=0,
+                                      world_size=1)
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        # get the test dummy distributed graph
+        _, part_config = generate_dummy_dist_graph(tmpdirname)
+        np_data = GSgnnNodeTrainData(graph_name='dummy', part_config=part_config,
+                                     train_ntypes=['n1'], label_field='label',
+                                     node_feat_field='feat')
+    g = np_data.g
+    model = create_rgcn_node_model(g)
+    embs = do_full_graph_inference(model, np_data)
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        for block_cache_path in [None, tmpdirname]:
+            for double_buffer in [False, True]:
+                reuse_embs = do_full_graph_inference(model, np_data,
+                                                     double_buffer=double_buffer,
+                                                     reuse_blocks=True,
+                                                     block_cache_path=block_cache_path)
+                for ntype in g.ntypes:
+                    num_nodes = g.number_of_nodes(ntype)
+                    assert_almost_equal(reuse_embs[ntype][0:num_nodes].numpy(),
+                                        embs[ntype][0:num_nodes].numpy(), decimal=5)
+        # The saved blocks are removed after the inference.
+        assert len(os.listdir(tmpdirname)) == 0
+
+    # The later layers of scoped inference replay the blocks of the first layer.
+    target_nodes = {'n1': th.arange(10)}
+    scoped_embs = do_full_graph_inference(model, np_data, target_nodes=target_nodes)
+    reuse_embs = do_full_graph_inference(model, np_data, target_nodes=target_nodes,
+                                         reuse_blocks=True)
+    assert_almost_equal(reuse_embs['n1'][0:10].numpy(), scoped_embs['n1'][0:10].numpy(),
+                        decimal=5)
+    assert_almost_equal(reuse_embs['n1'][0:10].numpy(), embs['n1'][0:10].numpy(), decimal=5)
+    th.distributed.destroy_process_group()
+    dgl.distributed.kvstore.close_kvstore()
+
+def test_filter_block_dst():
+    g = dgl.heterograph({
+        ('n0', 'r0', 'n1'): (th.randint(100, (500,)), th.randint(100, (500,))),
+        ('n1', 'r1', 'n1'): (th.randint(100, (500,)), th.randint(100, (500,))),
+    })
+    seeds = {'n0': th.arange(50), 'n1': th.arange(50)}
+    frontier = dgl.in_subgraph(g, seeds)
+    block = dgl.to_block(frontier, seeds)
+    for etype in block.canonical_etypes:
+        block.edges[etype].data[dgl.EID] = frontier.edges[etype].data[dgl.EID][
+            block.edges[etype].data[dgl.EID]]
+    dst_mask = {'n0': th.zeros((50,), dtype=th.bool), 'n1': th.arange(50) % 3 == 0}
+    new_block = _filter_block_dst(block, dst_mask)
+    assert new_block.num_dst_nodes('n0') == 0
+    assert_equal(new_block.dstnodes['n1'].data[dgl.NID].numpy(), np.arange(0, 50, 3))
+    for etype in g.canonical_etypes:
+        src, dst = new_block.edges(etype=etype)
+        src = new_block.srcnodes[etype[0]].data[dgl.NID][src]
+        dst = new_block.dstnodes[etype[2]].data[dgl.NID][dst]
+        eids = new_block.edges[etype].data[dgl.EID]
+        # The block keeps all in-edges of the kept destination nodes with their edge IDs.
+        g_src, g_dst = g.find_edges(eids, etype=etype)
+        assert_equal(src.numpy(), g_src.numpy())
+        assert_equal(dst.numpy(), g_dst.numpy())
+        g_eids = g.in_edges(th.arange(0, 50, 3), form='eid', etype=etype)
+        assert_equal(np.sort(eids.numpy()), np.sort(g_eids.numpy()))
+
+def test_reuse_blocks_node_infer():
+    # initialize the torch distributed environment
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23456',
+                                      rank=0,
+                                      world_size=1)
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        # get the test dummy distributed graph
+        _, part_config = generate_dummy_dist_graph(tmpdirname)
+        np_data = GSgnnNodeInferData(graph_name='dummy', part_config=part_config,
+                                     eval_ntypes=['n1'], label_field='label',
+                                     node_feat_field='feat')
+    g = np_data.g
+    model = create_rgcn_node_model(g)
+    loader = GSgnnNodeDataLoader(np_data, np_data.test_idxs, fanout=[],
+                                 batch_size=10, device="cuda:0", train_task=False)
+    infer = GSgnnNodePredictionInfer(model, 0)
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        # The embeddings aren't saved, so the inference is scoped to the test nodes.
+        infer.infer(loader, None, os.path.join(tmpdirname, "pred"))
+        pred = th.load(os.path.join(tmpdirname, "pred", "predict-0.pt"))
+        infer.infer(loader, None, os.path.join(tmpdirname, "reuse_pred"), reuse_blocks=True)
+        reuse_pred = th.load(os.path.join(tmpdirname, "reuse_pred", "predict-0.pt"))
+    assert_equal(reuse_pred.numpy(), pred.numpy())
+    th.distributed.destroy_process_group()
+    dgl.distributed.kvstore.close_kvstore()
+
+def test_half_precision_inference():
+    # initialize the torch distributed environment
+    th.distributed.init_process_group(backend='gloo',
+                                      init_method='tcp://127.0.0.1:23456',
+                                      rank=0,
+                                      world_size=1)
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        # get the test dummy distributed graph
+        _, part_config = generate_dummy_dist_graph(tmpdirname)
+        ep_data = GSgnnEdgeTrainData(graph_name='dummy', part_config=part_config,
+                                     train_etypes=[('n0', 'r1', 'n1')], label_field='label',
+                                     node_feat_field='feat')
+    g = ep_data.g
+    model = create_rgcn_node_model(g)
+    edge_model = create_rgcn_edge_model(g)
+    embs = do_full_graph_inference(model, ep_data)
+    num_nodes = g.number_of_nodes('n1')
+    node_loader = GSgnnNodeDataLoader(ep_data, {'n1': th.arange(num_nodes)}, fanout=[],
+                                      batch_size=10, device="cuda:0", train_task=False)
+    edge_loader = GSgnnEdgeDataLoader(ep_data, {('n0', 'r1', 'n1'): th.arange(10)}, fanout=[],
+                                      batch_size=10, device="cuda:0", train_task=False,
+                                      remove_target_edge_type=False)
+    node_pred = node_mini_batch_predict(model, embs, node_loader)
+    edge_pred = edge_mini_batch_predict(edge_model, embs, edge_loader)
+    for dtype in [th.float16, th.bfloat16]:
+        for double_buffer in [False, True]:
+            half_embs = do_full_graph_inference(model, ep_data, double_buffer=double_buffer,
+                                                emb_dtype=dtype)
+            assert half_embs['n1'].dtype == dtype
+            assert_almost_equal(half_embs['n1'][0:num_nodes].float().numpy(),
+                                embs['n1'][0:num_nodes].numpy(), decimal=1)
+            # The decoders compute on the half-precision embeddings in float32.
+            pred = node_mini_batch_predict(model, half_embs, node_loader)
+            assert pred.shape == node_pred.shape and pred.dtype == node_pred.dtype
+            pred = edge_mini_batch_predict(edge_model, half_embs, edge_loader)
+            assert pred.shape == edge_pred.shape and pred.dtype == edge_pred.dtype
+    th.distributed.destroy_process_group()
+    dgl.distributed.kvstore.close_kvstore()
+
 def create_rgcn_edge_model(g):
     model = GSgnnEdgeModel(alpha_l2norm=0)
 
@@ -419,6 +776,14 @@ if __name__ == '__main__':
     test_rgcn_edge_prediction()
     test_rgcn_node_prediction()
     test_rgat_node_prediction()
+    test_scoped_inference()
+    test_incremental_inference()
+    test_affected_nodes_multi_partitions()
+    test_double_buffer_inference()
+    test_reuse_blocks_inference()
+    test_filter_block_dst()
+    test_reuse_blocks_node_infer()
+    test_half_precision_inference()
     test_edge_classification()
     test_edge_regression()
     test_node_classification()
@@ -15,11 +15,12 @@
 """
 import torch as th
 
-from transformers import AutoTokenizer
+from transformers import AutoTokenizer, BertConfig, BertModel
 
 from graphstorm.model.lm_model import init_lm_model
 from graphstorm.model.lm_model import BUILTIN_HF_BERT
 from graphstorm.model.lm_model import TOKEN_IDX, ATT_MASK_IDX, TOKEN_TID_IDX, VALID_LEN
+from graphstorm.model.lm_model.hf_bert import HFBertWrapper
 
 from numpy.testing import assert_almost_equal
 
@@ -152,7 +153,29 @@ def test_hfbert_wrapper_profile():
     assert prof_static_len > 0
     assert prof_static_flops > 0
 
+@pytest.mark.parametrize("token_dtype", [th.int16, th.int32])
+def test_hfbert_wrapper_token_dtype(token_dtype):
+    # GConstruct can store the token IDs in int16 or int32.
+    th.manual_seed(0)
+    config = BertConfig(vocab_size=100, hidden_size=16, num_hidden_layers=1,
+                        num_attention_heads=2, intermediate_size=32)
+    lm_model = HFBertWrapper(BertModel(config), num_train=0)
+    lm_model.eval()
+
+    input_ids = th.randint(100, (10, 8))
+    token_type_ids = th.randint(2, (10, 8))
+    valid_len = th.randint(1, 9, (10,))
+    emb = lm_model(["n1"], {"n1": {TOKEN_IDX: input_ids,
+                                   VALID_LEN: valid_len,
+                                   TOKEN_TID_IDX: token_type_ids}})
+    emb1 = lm_model(["n1"], {"n1": {TOKEN_IDX: input_ids.to(token_dtype),
+                                    VALID_LEN: valid_len.to(token_dtype),
+                                    TOKEN_TID_IDX: token_type_ids.to(token_dtype)}})
+    assert_almost_equal(emb1["n1"].detach().numpy(), emb["n1"].detach().numpy(), decimal=5)
+
 if __name__ == '__main__':
+    test_hfbert_wrapper_token_dtype(th.int16)
+    test_hfbert_wrapper_token_dtype(th.int32)
     test_hfbert_wrapper(0, ["n1", "n2", "n3"], False)
     test_hfbert_wrapper(10, ["n1", "n2", "n3"], False)
     test_hfbert_wrapper(-1, ["n1", "n2", "n3"], False)
@@ -71,6 +71,18 @@ def test_save_embeddings():
         assert np.all(type0_random_emb.dist_tensor.numpy() == feats_type0.numpy())
         assert np.all(type1_random_emb.dist_tensor.numpy() == feats_type1.numpy())
 
+def test_save_embeddings_dtype():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        random_emb = th.rand((103, 12))
+        emb = {"type0": LazyDistTensor(random_emb, th.arange(103))}
+        for i in range(4):
+            save_embeddings(tmpdirname, emb, i, 4, dtype=th.float16)
+        feats = [th.load(os.path.join(tmpdirname, "type0_emb.part{}.bin".format(i)),
+                         weights_only=True) for i in range(4)]
+        feats = th.cat(feats, dim=0)
+        assert feats.dtype == th.float16
+        assert np.all(random_emb.half().numpy() == feats.numpy())
+
 def test_remove_saved_models():
     import tempfile
     import os
@@ -156,5 +168,6 @@ def test_get_feat_size():
 if __name__ == '__main__':
     test_get_feat_size()
     test_save_embeddings()
+    test_save_embeddings_dtype()
     test_remove_saved_models()
     test_topklist()
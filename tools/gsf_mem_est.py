@@ -28,6 +28,8 @@ if __name__ == "__main__":
     parser.add_argument('--num_hidden', type=int, help='The number of hidden dimensions.')
     parser.add_argument('--num_layers', type=int, help='The number of GNN layers.')
     parser.add_argument('--graph_name', type=str, help='The graph name.')
+    parser.add_argument('--double_buffer', type=lambda x: (str(x).lower() in ['true', '1']),
+            default=False, help='Indicate whether the GNN layers reuse two buffers of embeddings in inference.')
     args = parser.parse_args()
 
     assert args.is_train is not None
@@ -39,5 +41,6 @@ if __name__ == "__main__":
         assert args.num_hidden is not None
         assert args.num_layers is not None
         assert args.graph_name is not None
-        peak_mem, shared_mem = estimate_mem_infer(args.root_path, args.graph_name, args.num_hidden, args.num_layers)
+        peak_mem, shared_mem = estimate_mem_infer(args.root_path, args.graph_name, args.num_hidden, args.num_layers,
+                                                  args.double_buffer)
         print('We need {:.3f} GB memory to run inference on the graph data and {:.3f} GB shared memory'.format(peak_mem, shared_mem))
@@ -26,6 +26,9 @@ from graphstorm.dataloading import GSgnnEdgeTrainData
 from graphstorm.dataloading import GSgnnLinkPredictionDataLoader
 from graphstorm.dataloading import GSgnnLPJointNegDataLoader
 from graphstorm.dataloading import GSgnnLPLocalUniformNegDataLoader
+from graphstorm.dataloading import GSgnnLPLocalDegreeNegDataLoader
+from graphstorm.dataloading import GSgnnLPJointLocalDegreeNegDataLoader
+from graphstorm.dataloading import GSgnnLPInBatchNegDataLoader
 from graphstorm.dataloading import GSgnnAllEtypeLPJointNegDataLoader
 from graphstorm.dataloading import GSgnnAllEtypeLinkPredictionDataLoader
 from graphstorm.dataloading import GSgnnLinkPredictionTestDataLoader
@@ -35,6 +38,9 @@ from graphstorm.dataloading import BUILTIN_LP_JOINT_NEG_SAMPLER
 from graphstorm.dataloading import BUILTIN_LP_LOCALUNIFORM_NEG_SAMPLER
 from graphstorm.dataloading import BUILTIN_LP_ALL_ETYPE_UNIFORM_NEG_SAMPLER
 from graphstorm.dataloading import BUILTIN_LP_ALL_ETYPE_JOINT_NEG_SAMPLER
+from graphstorm.dataloading import BUILTIN_LP_LOCALDEGREE_NEG_SAMPLER
+from graphstorm.dataloading import BUILTIN_LP_JOINT_LOCALDEGREE_NEG_SAMPLER
+from graphstorm.dataloading import BUILTIN_LP_INBATCH_NEG_SAMPLER
 from graphstorm.eval import GSgnnMrrLPEvaluator
 from graphstorm.model.utils import save_embeddings
 from graphstorm.model import do_full_graph_inference
@@ -42,12 +48,18 @@ from graphstorm.model import do_full_graph_inference
 def main(args):
     config = GSConfig(args)
 
-    gs.initialize(ip_config=config.ip_config, backend=config.backend)
+    gs.initialize(ip_config=config.ip_config, backend=config.backend,
+                  num_samplers=config.num_samplers)
     train_data = GSgnnEdgeTrainData(config.graph_name,
                                     config.part_config,
                                     train_etypes=config.train_etype,
                                     eval_etypes=config.eval_etype,
-                                    node_feat_field=config.feat_name)
+                                    node_feat_field=config.feat_name,
+                                    cache_split=config.cache_split)
+    if config.fuse_node_feats:
+        train_data.fuse_node_feats(config.node_feat_dtype)
+    if config.feat_cache_size > 0:
+        train_data.setup_feat_cache(config.feat_cache_size, config.feat_cache_policy)
     model = gs.create_builtin_lp_model(train_data.g, config, train_task=True)
     trainer = GSgnnLinkPredictionTrainer(model, gs.get_rank(),
                                          topk_model_to_save=config.topk_model_to_save)
@@ -83,12 +95,19 @@ def main(args):
         dataloader_cls = GSgnnAllEtypeLinkPredictionDataLoader
     elif config.negative_sampler == BUILTIN_LP_ALL_ETYPE_JOINT_NEG_SAMPLER:
         dataloader_cls = GSgnnAllEtypeLPJointNegDataLoader
+    elif config.negative_sampler == BUILTIN_LP_LOCALDEGREE_NEG_SAMPLER:
+        dataloader_cls = GSgnnLPLocalDegreeNegDataLoader
+    elif config.negative_sampler == BUILTIN_LP_JOINT_LOCALDEGREE_NEG_SAMPLER:
+        dataloader_cls = GSgnnLPJointLocalDegreeNegDataLoader
+    elif config.negative_sampler == BUILTIN_LP_INBATCH_NEG_SAMPLER:
+        dataloader_cls = GSgnnLPInBatchNegDataLoader
     else:
         raise Exception('Unknown negative sampler')
     device = 'cuda:%d' % trainer.dev_id
     dataloader = dataloader_cls(train_data, train_data.train_idxs, [],
                                 config.batch_size, config.num_negative_edges, device,
-                                train_task=True)
+                                train_task=True,
+                                num_prefetch_batches=config.num_prefetch_batches)
 
     # TODO(zhengda) let's use full-graph inference for now.
     if config.test_negative_sampler == BUILTIN_LP_UNIFORM_NEG_SAMPLER:
@@ -99,10 +118,15 @@ def main(args):
         raise Exception('Unknown test negative sampler.'
             'Supported test negative samplers include '
             f'[{BUILTIN_LP_UNIFORM_NEG_SAMPLER}, {BUILTIN_LP_JOINT_NEG_SAMPLER}]')
+    cache_path = config.eval_negative_cache_path
     val_dataloader = test_dataloader_cls(train_data, train_data.val_idxs,
-        config.eval_batch_size, config.num_negative_edges_eval)
+        config.eval_batch_size, config.num_negative_edges_eval,
+        fixed_negatives=config.fixed_eval_negatives,
+        negative_cache_path=None if cache_path is None else os.path.join(cache_path, "val"))
     test_dataloader = test_dataloader_cls(train_data, train_data.test_idxs,
-        config.eval_batch_size, config.num_negative_edges_eval)
+        config.eval_batch_size, config.num_negative_edges_eval,
+        fixed_negatives=config.fixed_eval_negatives,
+        negative_cache_path=None if cache_path is None else os.path.join(cache_path, "test"))
 
     # Preparing input layer for training or inference.
     # The input layer can pre-compute node features in the preparing step if needed.
@@ -134,9 +158,13 @@ def main(args):
         model.prepare_input_encoder(train_data)
         # TODO(zhengda) we may not want to only use training edges to generate GNN embeddings.
         embeddings = do_full_graph_inference(model, train_data,
-                                             edge_mask="train_mask", task_tracker=tracker)
+                                             edge_mask="train_mask", task_tracker=tracker,
+                                             double_buffer=config.double_buffer_infer,
+                                             reuse_blocks=config.reuse_infer_blocks,
+                                             block_cache_path=config.infer_block_cache_path,
+                                             emb_dtype=config.emb_dtype)
         save_embeddings(config.save_embed_path, embeddings, gs.get_rank(),
-                        th.distributed.get_world_size())
+                        th.distributed.get_world_size(), dtype=config.emb_dtype)
 
 def generate_parser():
     parser = get_argument_parser()
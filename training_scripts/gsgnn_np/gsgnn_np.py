@@ -50,12 +50,18 @@ def get_evaluator(config):
 def main(args):
     config = GSConfig(args)
 
-    gs.initialize(ip_config=config.ip_config, backend=config.backend)
+    gs.initialize(ip_config=config.ip_config, backend=config.backend,
+                  num_samplers=config.num_samplers)
     train_data = GSgnnNodeTrainData(config.graph_name,
                                     config.part_config,
                                     train_ntypes=config.predict_ntype,
                                     node_feat_field=config.feat_name,
-                                    label_field=config.label_field)
+                                    label_field=config.label_field,
+                                    cache_split=config.cache_split)
+    if config.fuse_node_feats:
+        train_data.fuse_node_feats(config.node_feat_dtype)
+    if config.feat_cache_size > 0:
+        train_data.setup_feat_cache(config.feat_cache_size, config.feat_cache_policy)
     model = gs.create_builtin_node_gnn_model(train_data.g, config, train_task=True)
     trainer = GSgnnNodePredictionTrainer(model, gs.get_rank(),
                                          topk_model_to_save=config.topk_model_to_save)
@@ -74,7 +80,12 @@ def main(args):
     trainer.setup_task_tracker(tracker)
     device = 'cuda:%d' % trainer.dev_id
     dataloader = GSgnnNodeDataLoader(train_data, train_data.train_idxs, fanout=config.fanout,
-                                     batch_size=config.batch_size, device=device, train_task=True)
+                                     batch_size=config.batch_size, device=device, train_task=True,
+                                     num_prefetch_batches=config.num_prefetch_batches)
+    if config.sample_cache_variants > 0:
+        dataloader.setup_sample_cache(config.sample_cache_variants,
+                                      config.sample_cache_refresh,
+                                      config.sample_cache_path)
     val_dataloader = None
     test_dataloader = None
     # we don't need fanout for full-graph inference
@@ -115,9 +126,13 @@ def main(args):
         # The input layer can pre-compute node features in the preparing step if needed.
         # For example pre-compute all BERT embeddings
         model.prepare_input_encoder(train_data)
-        embeddings = do_full_graph_inference(model, train_data, task_tracker=tracker)
+        embeddings = do_full_graph_inference(model, train_data, task_tracker=tracker,
+                                             double_buffer=config.double_buffer_infer,
+                                             reuse_blocks=config.reuse_infer_blocks,
+                                             block_cache_path=config.infer_block_cache_path,
+                                             emb_dtype=config.emb_dtype)
         save_embeddings(config.save_embed_path, embeddings, gs.get_rank(),
-                        th.distributed.get_world_size())
+                        th.distributed.get_world_size(), dtype=config.emb_dtype)
 
 def generate_parser():
     parser = get_argument_parser()